@@ -0,0 +1,10 @@
+"""
+Package contenant les briques du cache de recherche.
+- ttl_policy.py : TTL adaptatif par jeu (volatilité et popularité)
+- popularity.py : Jeux les plus recherchés (count-min sketch + top-K), agrégés via Redis
+- codec.py : Payload compressé (zlib/zstd) des résultats en cache, décodage différé
+- tinylfu.py : Cache mémoire L1 borné en octets, admission W-TinyLFU
+- disk.py : Niveau de cache local persistant (SQLite WAL, LRU borné en octets)
+- invalidation.py : Invalidation des caches locaux de tous les workers (Redis pub/sub)
+- singleflight.py : Un seul rafraîchissement par clé pour toute la flotte (lease Redis)
+"""
@@ -0,0 +1,196 @@
+"""
+Encodage binaire compressé des résultats mis en cache.
+
+Un résultat de 100 vidéos stocké en documents imbriqués répète chaque nom de
+champ 100 fois et coûte une allocation de dict par vidéo au décodage BSON. Le
+codec stocke les vidéos sous forme de lignes (une liste de valeurs par vidéo,
+noms de champs écrits une seule fois) sérialisées en JSON compact puis
+compressées. Les métadonnées (jeu, pagination, snapshot) restent des champs
+MongoDB ordinaires, lisibles et modifiables (`$set`) sans décompresser.
+
+zstd est utilisé si le paquet `zstandard` est installé, sinon zlib (stdlib).
+Chaque document porte son encodage : les documents imbriqués existants et ceux
+écrits avec un autre algorithme restent lisibles.
+"""
+import json
+import logging
+import zlib
+from collections.abc import Sequence
+from dataclasses import fields
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from backend.app.models.records import GameRecord, SearchRecord, VideoRecord
+
+try:
+    import zstandard
+except ImportError:  # Dépendance optionnelle
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Version du format des lignes (champ "encoding" du document : "<algo>+rows1")
+ROWS_FORMAT = "rows1"
+COMPRESSIONS = ("zlib", "zstd")
+
+_VIDEO_FIELDS = tuple(field.name for field in fields(VideoRecord))
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_CREATED_AT = _VIDEO_FIELDS.index("created_at")
+
+
+def _to_micros(moment: datetime) -> int:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return (moment - _EPOCH) // timedelta(microseconds=1)
+
+
+def _compress(data: bytes, compression: str, level: int) -> bytes:
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return zlib.compress(data, level)
+
+
+def _decompress(data: bytes, compression: str) -> bytes:
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd payload but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if compression == "zlib":
+        return zlib.decompress(data)
+    raise ValueError(f"Unknown cache payload compression: {compression}")
+
+
+def encode_videos(videos: List[VideoRecord], compression: str = "zlib", level: int = 6) -> bytes:
+    """Sérialise des vidéos en lignes JSON compactes, puis les compresse."""
+    rows = []
+    for video in videos:
+        row = [getattr(video, name) for name in _VIDEO_FIELDS]
+        if row[_CREATED_AT] is not None:
+            row[_CREATED_AT] = _to_micros(row[_CREATED_AT])
+        rows.append(row)
+    data = json.dumps({"fields": _VIDEO_FIELDS, "rows": rows}, separators=(",", ":"))
+    return _compress(data.encode(), compression, level)
+
+
+def decode_videos(payload: bytes, encoding: str) -> List[VideoRecord]:
+    """Inverse de `encode_videos` ; `encoding` est celui enregistré avec le payload."""
+    compression, _, rows_format = encoding.partition("+")
+    if rows_format != ROWS_FORMAT:
+        raise ValueError(f"Unknown cache payload format: {encoding}")
+    data = json.loads(_decompress(payload, compression))
+    names = tuple(data["fields"])
+    created_at = names.index("created_at") if "created_at" in names else None
+    videos = []
+    for row in data["rows"]:
+        if created_at is not None and row[created_at] is not None:
+            row[created_at] = _EPOCH + timedelta(microseconds=row[created_at])
+        if names == _VIDEO_FIELDS:
+            videos.append(VideoRecord(*row))
+        else:
+            # Payload écrit par une version où les champs différaient
+            videos.append(VideoRecord.from_document(dict(zip(names, row))))
+    return videos
+
+
+class LazyVideos(Sequence):
+    """
+    Liste de vidéos décompressée au premier accès à son contenu.
+
+    `len()` est connu sans décoder. Un segment du cache lu mais jamais servi
+    (archives quand les streams ne sont pas épuisés) n'est donc jamais décodé.
+    En lecture seule : les résultats à étendre sont recopiés avec `list()`.
+    """
+
+    __slots__ = ("_payload", "_encoding", "_count", "_videos")
+
+    def __init__(self, payload: bytes, encoding: str, count: int):
+        self._payload = payload
+        self._encoding = encoding
+        self._count = count
+        self._videos: Optional[List[VideoRecord]] = None
+
+    @property
+    def is_decoded(self) -> bool:
+        return self._videos is not None
+
+    def _decoded(self) -> List[VideoRecord]:
+        if self._videos is None:
+            self._videos = decode_videos(self._payload, self._encoding)
+            self._payload = None
+        return self._videos
+
+    def __len__(self) -> int:
+        return self._count if self._videos is None else len(self._videos)
+
+    def __getitem__(self, index):
+        return self._decoded()[index]
+
+    def __iter__(self):
+        return iter(self._decoded())
+
+    def __repr__(self) -> str:
+        if self._videos is None:
+            return f"LazyVideos(<{self._count} encoded>)"
+        return f"LazyVideos({self._videos!r})"
+
+
+class PayloadCodec:
+    """Convertit un SearchRecord en document MongoDB à payload compressé (relu par `decode_result`)."""
+
+    def __init__(self, compression: str = "zlib", level: Optional[int] = None):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown cache payload compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed, falling back to zlib for cached payloads")
+            compression = "zlib"
+        self.compression = compression
+        self.level = level if level is not None else (3 if compression == "zstd" else 6)
+        self.encoding = f"{compression}+{ROWS_FORMAT}"
+
+    def encode(self, result: SearchRecord) -> Dict[str, Any]:
+        videos = result.videos
+        if isinstance(videos, LazyVideos) and not videos.is_decoded and videos._encoding == self.encoding:
+            # Relu du cache et jamais décodé : le payload est réutilisé tel quel
+            payload = videos._payload
+        else:
+            payload = encode_videos(list(videos), self.compression, self.level)
+        return {
+            "game_name": result.game_name,
+            "game": result.game.to_document() if result.game else None,
+            "payload": payload,
+            "encoding": self.encoding,
+            "total_count": result.total_count,
+            "last_updated": result.last_updated,
+            "pagination": result.pagination,
+            "snapshot_id": result.snapshot_id
+        }
+
+
+def build_codec(compression: str) -> Optional[PayloadCodec]:
+    """Codec correspondant au réglage CACHE_COMPRESSION ; None pour "none" (documents imbriqués)."""
+    if not compression or compression == "none":
+        return None
+    return PayloadCodec(compression)
+
+
+def decode_result(doc: Dict[str, Any], lazy: bool = False) -> SearchRecord:
+    """
+    Décode un résultat stocké, compressé ou en documents imbriqués.
+    Avec `lazy`, les vidéos compressées ne sont décodées qu'au premier accès.
+    """
+    if "payload" not in doc:
+        return SearchRecord.from_document(doc)
+    payload = bytes(doc["payload"])
+    if lazy:
+        videos = LazyVideos(payload, doc["encoding"], doc.get("total_count", 0))
+    else:
+        videos = decode_videos(payload, doc["encoding"])
+    game = doc.get("game")
+    return SearchRecord(
+        game_name=doc["game_name"],
+        game=GameRecord.from_document(game) if game else None,
+        videos=videos,
+        last_updated=doc["last_updated"],
+        pagination=doc.get("pagination") or {"cursor": None},
+        snapshot_id=doc.get("snapshot_id")
+    )
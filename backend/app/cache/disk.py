@@ -0,0 +1,307 @@
+"""
+Niveau de cache local persistant (SQLite en mode WAL), entre la mémoire et MongoDB.
+
+Le fichier survit aux redémarrages et aux déploiements : un worker relancé sert
+ses clés chaudes sans repasser par MongoDB ni Helix. Les pages du fichier sont
+mappées en mémoire (`PRAGMA mmap_size`), et `open()` relit les entrées les plus
+récemment utilisées pour les rendre résidentes avant le premier trafic.
+
+Plusieurs workers d'un même hôte peuvent partager le fichier : le mode WAL
+autorise des lectures concurrentes d'une écriture. La taille est bornée en
+octets, avec éviction des entrées les moins récemment utilisées (LRU).
+
+Les accès sont synchrones : sur un fichier local en WAL, une lecture ou une
+écriture d'une entrée reste sous la milliseconde. Un autre worker peut toutefois
+tenir le verrou d'écriture (écriture, éviction) : on ne l'attend que
+`BUSY_TIMEOUT` secondes, puis l'accès est abandonné comme un miss ou une
+écriture ignorée, plutôt que de bloquer la boucle d'événements.
+"""
+import logging
+import os
+import sqlite3
+import time
+from typing import List, Optional, Tuple
+
+from backend.app.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    version INTEGER,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at);
+"""
+
+
+class DiskCache:
+    """
+    Cache clé/valeur (octets) avec TTL, borné en octets, stocké dans un fichier SQLite.
+
+    Tant que `open()` n'a pas été appelé, le cache est désactivé : `get` rend None
+    et les écritures sont ignorées.
+    """
+
+    # Fraction de max_bytes visée après une éviction, pour ne pas évincer à chaque écriture
+    EVICTION_TARGET = 0.9
+    # Attente max (s) du verrou d'un autre worker, une fois le fichier ouvert
+    BUSY_TIMEOUT = 0.05
+
+    def __init__(self):
+        self.path: Optional[str] = None
+        self.max_bytes = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._bytes = 0  # Estimation locale, recalculée à chaque éviction
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.warmed = 0
+        self.busy = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self._db is not None
+
+    def open(self, path: str, max_bytes: int, warm_items: int = 0) -> bool:
+        """
+        Ouvre (ou crée) le fichier, purge les entrées expirées puis précharge les
+        `warm_items` entrées les plus récemment utilisées.
+        Returns False si le fichier ne peut pas être ouvert (cache désactivé).
+        """
+        if self._db is not None:
+            return True
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(f"PRAGMA mmap_size={int(max_bytes)}")
+            db.executescript(_SCHEMA)
+            db.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+            self._bytes = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            # Au démarrage on attend le verrou ; ensuite, un accès contendu est abandonné
+            db.execute(f"PRAGMA busy_timeout={int(self.BUSY_TIMEOUT * 1000)}")
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Disk cache unavailable at {path} ({str(e)}), tier disabled")
+            return False
+        self._db = db
+        self.path = path
+        self.max_bytes = max_bytes
+        self.warmed = len(self.hot_entries(warm_items)) if warm_items else 0
+        logger.info(f"Disk cache opened at {path} ({self._bytes} bytes, {self.warmed} entries warmed)")
+        return True
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+            logger.info("Disk cache closed")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Valeur d'une clé non expirée, ou None. Marque la clé comme récemment utilisée."""
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[bytes, float]]:
+        """(valeur, expiration en secondes epoch) d'une clé non expirée, ou None."""
+        if self._db is None:
+            return None
+        now = time.time()
+        try:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._failed(f"read failed for {key}", e)
+            self.misses += 1
+            return None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            self._db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            # La valeur est lue : seul l'ordre LRU n'est pas mis à jour
+            self._failed(f"touch failed for {key}", e)
+        return row
+
+    def set(self, key: str, value: bytes, ttl: float, version: Optional[int] = None) -> bool:
+        """
+        Écrit une entrée expirant après `ttl` secondes.
+        Avec `version`, une entrée de version plus récente n'est pas écrasée.
+        Returns True si l'entrée a été écrite.
+        """
+        if self._db is None:
+            return False
+        now = time.time()
+        try:
+            # Taille de la valeur remplacée, pour que `_bytes` ne la compte pas deux fois
+            previous = self._size_of(key)
+            cursor = self._db.execute(
+                """
+                INSERT INTO entries (key, value, size, version, expires_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    value = excluded.value, size = excluded.size, version = excluded.version,
+                    expires_at = excluded.expires_at, last_access = excluded.last_access
+                WHERE excluded.version IS NULL OR entries.version IS NULL
+                    OR entries.version <= excluded.version
+                """,
+                (key, value, len(value), version, now + ttl, now)
+            )
+        except sqlite3.Error as e:
+            self._failed(f"write failed for {key}", e)
+            return False
+        if cursor.rowcount == 0:
+            return False
+        self.writes += 1
+        self._grew(len(value) - previous)
+        return True
+
+    def replace_value(self, key: str, value: bytes) -> bool:
+        """Remplace la valeur d'une entrée existante sans changer son expiration ni sa version."""
+        if self._db is None:
+            return False
+        try:
+            previous = self._size_of(key)
+            cursor = self._db.execute(
+                "UPDATE entries SET value = ?, size = ? WHERE key = ?", (value, len(value), key)
+            )
+        except sqlite3.Error as e:
+            self._failed(f"write failed for {key}", e)
+            return False
+        if cursor.rowcount == 0:
+            return False
+        self._grew(len(value) - previous)
+        return True
+
+    def _size_of(self, key: str) -> int:
+        """Taille stockée de `key` (0 si absente)."""
+        row = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def _grew(self, delta: int) -> None:
+        """Reporte une variation de taille sur `_bytes`, et évince au-delà de `max_bytes`."""
+        self._bytes = max(0, self._bytes + delta)
+        if self._bytes > self.max_bytes:
+            self._evict()
+
+    def delete(self, key: str, below_version: Optional[int] = None) -> bool:
+        """Supprime une entrée ; avec `below_version`, seulement si sa version est plus ancienne."""
+        if self._db is None:
+            return False
+        try:
+            if below_version is None:
+                rows = self._db.execute("DELETE FROM entries WHERE key = ? RETURNING size", (key,)).fetchall()
+            else:
+                rows = self._db.execute(
+                    "DELETE FROM entries WHERE key = ? AND (version IS NULL OR version < ?) RETURNING size",
+                    (key, below_version)
+                ).fetchall()
+        except sqlite3.Error as e:
+            self._failed(f"delete failed for {key}", e)
+            return False
+        self._grew(-sum(size for size, in rows))
+        return bool(rows)
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Supprime les clés commençant par `prefix`. Returns the number of entries deleted."""
+        if self._db is None:
+            return 0
+        try:
+            rows = self._db.execute(
+                "DELETE FROM entries WHERE substr(key, 1, ?) = ? RETURNING size", (len(prefix), prefix)
+            ).fetchall()
+        except sqlite3.Error as e:
+            self._failed(f"delete failed for {prefix}", e)
+            return 0
+        self._grew(-sum(size for size, in rows))
+        return len(rows)
+
+    def clear(self) -> None:
+        if self._db is not None:
+            try:
+                self._db.execute("DELETE FROM entries")
+            except sqlite3.Error as e:
+                self._failed("clear failed", e)
+                return
+            self._bytes = 0
+
+    def hot_entries(self, limit: int) -> List[Tuple[str, bytes, float]]:
+        """Les `limit` entrées non expirées les plus récemment utilisées : (clé, valeur, expiration)."""
+        if self._db is None or limit <= 0:
+            return []
+        try:
+            return self._db.execute(
+                "SELECT key, value, expires_at FROM entries WHERE expires_at > ? "
+                "ORDER BY last_access DESC LIMIT ?",
+                (time.time(), limit)
+            ).fetchall()
+        except sqlite3.Error as e:
+            self._failed("warm-up failed", e)
+            return []
+
+    def _evict(self) -> None:
+        """Supprime les entrées expirées puis les moins récemment utilisées jusqu'à la cible."""
+        try:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+            # D'autres workers écrivent peut-être dans le même fichier : on recompte
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            excess = total - int(self.max_bytes * self.EVICTION_TARGET)
+            if excess > 0:
+                victims, freed = [], 0
+                for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY last_access"):
+                    victims.append((key,))
+                    freed += size
+                    if freed >= excess:
+                        break
+                self._db.executemany("DELETE FROM entries WHERE key = ?", victims)
+                self.evictions += len(victims)
+                total -= freed
+            self._db.execute("COMMIT")
+            self._bytes = total
+        except sqlite3.Error as e:
+            self._failed("eviction failed", e)
+            if self._db.in_transaction:
+                self._db.execute("ROLLBACK")
+
+    def _failed(self, action: str, error: sqlite3.Error) -> None:
+        """Journalise un accès en échec ; un fichier verrouillé par un autre worker n'est qu'un accès sauté."""
+        if isinstance(error, sqlite3.OperationalError) and "locked" in str(error):
+            self.busy += 1
+            logger.debug(f"Disk cache {action}: file busy, skipped")
+        else:
+            logger.error(f"Disk cache {action}: {str(error)}")
+
+    def stats(self) -> dict:
+        """Compteurs du cache disque, pour l'endpoint de métriques."""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.is_open,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "warmed": self.warmed,
+            "busy": self.busy,
+        }
+
+
+# Instance globale, ouverte au démarrage si DISK_CACHE_PATH est configuré
+disk_cache = DiskCache()
+
+metrics.register("disk_cache", disk_cache.stats)
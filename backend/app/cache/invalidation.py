@@ -0,0 +1,236 @@
+"""
+Invalidation des caches locaux (mémoire et disque) de tous les workers via Redis pub/sub.
+
+Chaque worker a son propre cache L1 : une invalidation ou un rafraîchissement
+traité par un worker est publié sur un canal Redis, et chaque worker l'applique
+à ses caches dès réception. Sans Redis, les messages sont appliqués localement
+uniquement (un seul worker).
+
+Les messages sont versionnés, donc idempotents :
+- un rafraîchissement porte la génération du nouveau segment : seules les copies
+  plus anciennes sont retirées ;
+- une invalidation (jeu ou tout le cache) porte la génération de l'instant où
+  elle a eu lieu : les copies lues avant sont retirées.
+Chaque worker retient la dernière version reçue par clé : un segment plus ancien,
+relu plus tard depuis MongoDB (écriture différée pas encore flushée), n'est pas
+remis en cache. Un message dupliqué ou reçu en retard n'a donc aucun effet.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from backend.app.cache.disk import DiskCache, disk_cache
+from backend.app.cache.tinylfu import TinyLFUCache, memory_cache
+from backend.app.locks import WORKER_ID
+from backend.app.metrics import metrics
+from backend.app.services.twitch.keys import normalize_query
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache:invalidation"
+
+
+def disk_key(key: Tuple[str, Optional[str], str]) -> str:
+    """Clé du niveau disque pour une clé de segment (jeu, langue, segment)."""
+    game_name, language, segment = key
+    return f"search_cache\t{game_name}\t{language or ''}\t{segment}"
+
+
+def _now_generation() -> int:
+    return time.time_ns() // 1000
+
+
+class InvalidationBus:
+    """
+    Publie les invalidations de segments et les applique aux caches locaux.
+
+    `max_versions` borne le nombre de versions retenues par clé et par jeu ;
+    les plus anciennes sont oubliées en premier.
+    """
+
+    def __init__(
+        self,
+        memory: Optional[TinyLFUCache] = None,
+        disk: Optional[DiskCache] = None,
+        max_versions: int = 10_000
+    ):
+        self.memory = memory
+        self.disk = disk
+        self.max_versions = max_versions
+        self.client = None
+        self._task: Optional[asyncio.Task] = None
+        self._pubsub = None
+        self._epoch = 0  # Dernier vidage complet
+        self._games: "OrderedDict[str, int]" = OrderedDict()
+        self._segments: "OrderedDict[tuple, int]" = OrderedDict()
+        self._waiters: Dict[tuple, asyncio.Event] = {}
+        self.published = 0
+        self.received = 0
+        self.applied = 0
+        self.ignored = 0
+
+    @property
+    def is_distributed(self) -> bool:
+        return self._task is not None
+
+    async def start(self, client) -> None:
+        """S'abonne au canal ; sans client Redis, le bus reste local."""
+        if client is None or self._task:
+            return
+        self.client = client
+        self._pubsub = client.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(CHANNEL)
+        self._task = asyncio.create_task(self._listen())
+        logger.info("Cache invalidation bus subscribed")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.unsubscribe(CHANNEL)
+                await self._pubsub.aclose()
+            except Exception as e:
+                logger.warning(f"[Invalidation] Error closing subscription: {str(e)}")
+            self._pubsub = None
+        self.client = None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"[Invalidation] Subscription error: {str(e)}")
+                await asyncio.sleep(1.0)
+                continue
+            if message is None or message.get("type") != "message":
+                continue
+            self.received += 1
+            try:
+                event = json.loads(message["data"])
+            except (TypeError, ValueError):
+                logger.warning("[Invalidation] Ignoring malformed message")
+                continue
+            if event.get("origin") != WORKER_ID:
+                self.apply(event)
+
+    async def wait_for(self, key: tuple, timeout: float) -> bool:
+        """Attend le prochain rafraîchissement du segment `key`. Returns False après `timeout` secondes."""
+        event = self._waiters.get(key)
+        if event is None:
+            event = self._waiters[key] = asyncio.Event()
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            if self._waiters.get(key) is event and not event.is_set():
+                del self._waiters[key]
+
+    async def segment_refreshed(self, key: tuple, generation: int) -> None:
+        """Un segment a été réécrit avec la génération `generation`."""
+        await self._publish({"kind": "segment", "key": list(key), "version": generation})
+
+    async def invalidate_game(self, game_name: str) -> None:
+        await self._publish({"kind": "game", "game": normalize_query(game_name), "version": _now_generation()})
+
+    async def invalidate_all(self) -> None:
+        await self._publish({"kind": "all", "version": _now_generation()})
+
+    async def _publish(self, event: dict) -> None:
+        # Appliqué localement d'abord : c'est aussi le repli sans Redis
+        self.apply(event)
+        if self.client is None:
+            return
+        try:
+            await self.client.publish(CHANNEL, json.dumps({**event, "origin": WORKER_ID}))
+            self.published += 1
+        except Exception as e:
+            logger.warning(f"[Invalidation] Publish failed, other workers keep their caches: {str(e)}")
+
+    def apply(self, event: dict) -> None:
+        """Applique un message aux caches locaux. Idempotent."""
+        kind, version = event.get("kind"), event.get("version", 0)
+        if kind == "segment":
+            key = tuple(event["key"])
+            waiter = self._waiters.pop(key, None)
+            if waiter is not None:
+                waiter.set()
+            if not self._record_version(self._segments, key, version):
+                return
+            if self.memory is not None:
+                cached = self.memory.peek(key)
+                if cached is not None and cached.generation < version:
+                    self.memory.delete(key)
+            if self.disk is not None:
+                self.disk.delete(disk_key(key), below_version=version)
+        elif kind == "game":
+            game_name = event["game"]
+            if not self._record_version(self._games, game_name, version):
+                return
+            self._drop(lambda key: key[0] == game_name, version)
+            if self.disk is not None:
+                self.disk.delete_prefix(f"search_cache\t{game_name}\t")
+        elif kind == "all":
+            if version <= self._epoch:
+                self.ignored += 1
+                return
+            self._epoch = version
+            self._drop(lambda key: True, version)
+            if self.disk is not None:
+                self.disk.delete_prefix("search_cache\t")
+        else:
+            self.ignored += 1
+            return
+        self.applied += 1
+
+    def _record_version(self, versions: OrderedDict, name: Any, version: int) -> bool:
+        """Retient la version de `name`. Returns False si une version égale ou plus récente est connue."""
+        if versions.get(name, -1) >= version:
+            self.ignored += 1
+            return False
+        versions[name] = version
+        versions.move_to_end(name)
+        while len(versions) > self.max_versions:
+            versions.popitem(last=False)
+        return True
+
+    def _drop(self, matches, version: int) -> None:
+        if self.memory is None:
+            return
+        for key in self.memory.keys():
+            cached = self.memory.peek(key)
+            if matches(key) and cached is not None and cached.generation < version:
+                self.memory.delete(key)
+
+    def is_stale(self, key: tuple, generation: int) -> bool:
+        """True si un segment de cette génération a été invalidé ou remplacé depuis."""
+        floor = max(self._epoch, self._games.get(key[0], 0), self._segments.get(key, 0))
+        return generation < floor
+
+    def stats(self) -> dict:
+        """Compteurs du bus, pour l'endpoint de métriques."""
+        return {
+            "scope": "redis" if self.is_distributed else "local",
+            "published": self.published,
+            "received": self.received,
+            "applied": self.applied,
+            "ignored": self.ignored,
+        }
+
+
+# Instance globale, branchée sur les caches locaux du worker
+invalidation_bus = InvalidationBus(memory_cache, disk_cache)
+
+metrics.register("invalidation", invalidation_bus.stats)
@@ -0,0 +1,177 @@
+import hashlib
+import heapq
+import json
+import logging
+import math
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from backend.app.config import settings
+from backend.app.locks import WORKER_ID
+from backend.app.metrics import metrics
+from backend.app.services.twitch.keys import normalize_query
+
+logger = logging.getLogger(__name__)
+
+# Clés Redis : une entrée par worker, agrégées à chaque synchronisation
+_REDIS_PREFIX = "popularity:worker:"
+
+
+class CountMinSketch:
+    """
+    Count-min sketch à compteurs flottants (pour pouvoir décroître).
+
+    Les index sont dérivés d'un hash blake2b (double hashing), stable d'un
+    processus à l'autre : les sketches de plusieurs workers s'additionnent.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.rows = [array("f", bytes(4 * width)) for _ in range(depth)]
+
+    def _indexes(self, key: str) -> List[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, key: str, count: float = 1.0) -> float:
+        """Ajoute `count` à `key`. Returns the new estimate."""
+        estimate = math.inf
+        for row, index in zip(self.rows, self._indexes(key)):
+            row[index] += count
+            estimate = min(estimate, row[index])
+        return estimate
+
+    def estimate(self, key: str) -> float:
+        return min(row[index] for row, index in zip(self.rows, self._indexes(key)))
+
+    def decay(self, factor: float) -> None:
+        for i, row in enumerate(self.rows):
+            self.rows[i] = array("f", (value * factor for value in row))
+
+    def merge(self, other: "CountMinSketch") -> None:
+        for row, other_row in zip(self.rows, other.rows):
+            for i, value in enumerate(other_row):
+                if value:
+                    row[i] += value
+
+    def to_bytes(self) -> bytes:
+        return b"".join(row.tobytes() for row in self.rows)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, width: int, depth: int) -> Optional["CountMinSketch"]:
+        """Returns None si `data` ne correspond pas aux dimensions attendues."""
+        if len(data) != 4 * width * depth:
+            return None
+        sketch = cls(width, depth)
+        for i in range(depth):
+            sketch.rows[i] = array("f")
+            sketch.rows[i].frombytes(data[4 * width * i:4 * width * (i + 1)])
+        return sketch
+
+
+class PopularityTracker:
+    """
+    Suivi en mémoire des jeux les plus recherchés (heavy hitters).
+
+    Un count-min sketch estime la fréquence de chaque recherche normalisée et un
+    top-K en garde les `k` plus fréquentes. Les compteurs décroissent avec une
+    demi-vie de `half_life` secondes. `sync()` publie l'état local dans Redis et
+    agrège celui des autres workers : `top()` renvoie alors le classement global.
+    """
+
+    def __init__(
+        self,
+        k: int = 50,
+        width: int = 2048,
+        depth: int = 4,
+        half_life: float = 3600.0,
+        decay_interval: float = 60.0
+    ):
+        self.k = k
+        self.half_life = half_life
+        self.decay_interval = decay_interval
+        self.sketch = CountMinSketch(width, depth)
+        self._top: Dict[str, float] = {}
+        self._decayed_at = time.monotonic()
+        self._global_top: Optional[List[Tuple[str, float]]] = None
+        self.worker_id = WORKER_ID
+
+    def record(self, game_name: str, now: Optional[float] = None) -> None:
+        """Comptabilise une recherche de `game_name`."""
+        self._maybe_decay(time.monotonic() if now is None else now)
+        key = normalize_query(game_name)
+        if not key:
+            return
+        estimate = self.sketch.add(key)
+        if key in self._top or len(self._top) < self.k:
+            self._top[key] = estimate
+            return
+        weakest = min(self._top, key=self._top.get)
+        if estimate > self._top[weakest]:
+            del self._top[weakest]
+            self._top[key] = estimate
+
+    def _maybe_decay(self, now: float) -> None:
+        elapsed = now - self._decayed_at
+        if elapsed < self.decay_interval:
+            return
+        factor = 0.5 ** (elapsed / self.half_life)
+        self.sketch.decay(factor)
+        self._top = {key: value * factor for key, value in self._top.items()}
+        self._decayed_at = now
+
+    def top(self, k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Les `k` recherches les plus fréquentes (globales si synchronisé), décroissantes."""
+        k = k or self.k
+        ranking = self._global_top if self._global_top is not None else self._top.items()
+        return heapq.nlargest(k, ranking, key=lambda item: item[1])
+
+    async def sync(self, client, ttl: int = 300) -> None:
+        """
+        Publie le sketch et les candidats locaux dans Redis, puis agrège ceux de
+        tous les workers vivants. Sans Redis, le classement reste local.
+        """
+        if client is None:
+            self._global_top = None
+            return
+        self._maybe_decay(time.monotonic())
+        key = f"{_REDIS_PREFIX}{self.worker_id}"
+        await client.hset(key, mapping={
+            "sketch": self.sketch.to_bytes(),
+            "top": json.dumps(list(self._top)),
+        })
+        await client.expire(key, ttl)
+
+        merged = CountMinSketch(self.sketch.width, self.sketch.depth)
+        candidates = set()
+        async for worker_key in client.scan_iter(match=f"{_REDIS_PREFIX}*"):
+            entry = await client.hgetall(worker_key)
+            sketch = CountMinSketch.from_bytes(
+                entry.get(b"sketch", b""), self.sketch.width, self.sketch.depth
+            )
+            if sketch is None:
+                logger.warning(f"[Popularity] Ignoring incompatible sketch from {worker_key!r}")
+                continue
+            merged.merge(sketch)
+            candidates.update(json.loads(entry.get(b"top", b"[]")))
+        self._global_top = [(candidate, merged.estimate(candidate)) for candidate in candidates]
+
+    def stats(self) -> dict:
+        """Classement courant, pour l'endpoint de métriques."""
+        return {
+            "scope": "global" if self._global_top is not None else "local",
+            "top": [{"game": key, "score": round(score, 2)} for key, score in self.top(10)],
+        }
+
+
+# Instance globale
+popularity_tracker = PopularityTracker(
+    k=settings.POPULARITY_TRACKED,
+    half_life=settings.POPULARITY_HALF_LIFE
+)
+
+metrics.register("popularity", popularity_tracker.stats)
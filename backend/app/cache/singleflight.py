@@ -0,0 +1,179 @@
+"""
+Rafraîchissement unique d'une clé du cache à l'échelle de la flotte (single-flight).
+
+Quand une clé chaude expire, chaque worker qui la manque irait chercher la même
+page Helix. Ici :
+
+- dans un processus, les appels concurrents pour une clé partagent le même
+  rafraîchissement ;
+- entre processus, un lease Redis court (`refresh:<clé>`) désigne le seul
+  worker qui interroge Helix. Les autres servent la version expirée s'il en
+  reste une, sinon attendent la notification de rafraîchissement (bus
+  d'invalidation) puis relisent le cache. Passé `wait_timeout`, ils
+  rafraîchissent eux-mêmes : un leader bloqué ne bloque pas la flotte.
+
+Sans Redis, seule la coalescence locale s'applique.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from backend.app.cache.invalidation import InvalidationBus, invalidation_bus
+from backend.app.config import settings
+from backend.app.locks import WORKER_ID, RedisLease
+from backend.app.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+Loader = Callable[[], Awaitable[Any]]
+
+
+class SingleFlight:
+    """
+    `lease_ttl` : durée du lease de rafraîchissement (doit couvrir un appel Helix).
+    `wait_timeout` : attente max d'un worker non leader avant de rafraîchir lui-même.
+    `poll_interval` : intervalle de relecture du cache pendant l'attente (écritures différées).
+    """
+
+    def __init__(
+        self,
+        lease_ttl: float = 10.0,
+        wait_timeout: float = 5.0,
+        poll_interval: float = 0.1,
+        notifier: Optional[InvalidationBus] = None,
+        client_provider=None
+    ):
+        self.lease_ttl = lease_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.notifier = notifier
+        self._client_provider = client_provider or _default_client
+        self._lease: Optional[RedisLease] = None
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        self.leader = 0
+        self.coalesced = 0
+        self.followers = 0
+        self.stale_served = 0
+        self.timeouts = 0
+
+    def _get_lease(self) -> Optional[RedisLease]:
+        client = self._client_provider()
+        if client is None:
+            self._lease = None
+        elif self._lease is None or self._lease.client is not client:
+            self._lease = RedisLease(client, prefix="refresh:")
+        return self._lease
+
+    async def run(
+        self,
+        key: str,
+        fetch: Loader,
+        reload: Loader,
+        stale: Optional[Loader] = None,
+        notify_key: Optional[Hashable] = None
+    ) -> Any:
+        """
+        Rafraîchit `key` via `fetch` si ce worker obtient le lease.
+
+        Sinon : `stale()` si elle renvoie une valeur, ou bien `reload()` (relecture
+        du cache) après la notification `notify_key`. Les appels concurrents du
+        même processus reçoivent le même résultat : il ne doit pas être modifié.
+        """
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(flight)
+
+        flight = self._flights[key] = asyncio.get_running_loop().create_future()
+        try:
+            value = await self._run(key, fetch, reload, stale, notify_key)
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except Exception as e:
+            flight.set_exception(e)
+            # Personne n'attend forcément ce futur : évite l'avertissement "never retrieved"
+            flight.exception()
+            raise
+        else:
+            flight.set_result(value)
+            return value
+        finally:
+            del self._flights[key]
+
+    async def _run(
+        self,
+        key: str,
+        fetch: Loader,
+        reload: Loader,
+        stale: Optional[Loader],
+        notify_key: Optional[Hashable]
+    ) -> Any:
+        lease = self._get_lease()
+        if lease is None:
+            return await fetch()
+        try:
+            acquired = await lease.acquire(key, WORKER_ID, self.lease_ttl)
+        except Exception as e:
+            logger.warning(f"[SingleFlight] Refresh lock unavailable for {key}: {str(e)}")
+            return await fetch()
+
+        if acquired:
+            self.leader += 1
+            try:
+                return await fetch()
+            finally:
+                try:
+                    await lease.release(key, WORKER_ID)
+                except Exception as e:
+                    logger.warning(f"[SingleFlight] Could not release refresh lock {key}: {str(e)}")
+
+        # Un autre worker rafraîchit la clé
+        self.followers += 1
+        if stale is not None:
+            value = await stale()
+            if value is not None:
+                self.stale_served += 1
+                return value
+
+        deadline = time.monotonic() + self.wait_timeout
+        if self.notifier is not None and notify_key is not None:
+            await self.notifier.wait_for(notify_key, self.wait_timeout)
+        while True:
+            value = await reload()
+            if value is not None:
+                return value
+            if time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(self.poll_interval)
+
+        self.timeouts += 1
+        logger.info(f"[SingleFlight] No refresh seen for {key} after {self.wait_timeout}s, fetching")
+        return await fetch()
+
+    def stats(self) -> dict:
+        """Compteurs du single-flight, pour l'endpoint de métriques."""
+        return {
+            "in_flight": len(self._flights),
+            "leader": self.leader,
+            "coalesced": self.coalesced,
+            "followers": self.followers,
+            "stale_served": self.stale_served,
+            "timeouts": self.timeouts,
+        }
+
+
+def _default_client():
+    from backend.app.redis_client import redis_manager
+    return redis_manager.get_client()
+
+
+# Instance globale : les rafraîchissements sont notifiés par le bus d'invalidation
+refresh_flight = SingleFlight(
+    lease_ttl=settings.REFRESH_LOCK_TTL,
+    wait_timeout=settings.REFRESH_WAIT_TIMEOUT,
+    notifier=invalidation_bus
+)
+
+metrics.register("single_flight", refresh_flight.stats)
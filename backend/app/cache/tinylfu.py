@@ -0,0 +1,290 @@
+"""
+Cache mémoire (L1) borné en octets, avec admission W-TinyLFU et TTL par entrée.
+
+Un `TTLCache` borné en nombre d'entrées admet tout : une rafale de recherches
+uniques (noms de jeux tapés une seule fois) chasse les entrées chaudes. Ici :
+
+- une petite fenêtre LRU (1 % du budget) absorbe les nouvelles entrées ;
+- l'entrée qui sort de la fenêtre n'entre dans la zone principale (SLRU :
+  probation + protégée) que si sa fréquence estimée dépasse celle de la
+  victime qu'elle remplacerait ;
+- les fréquences viennent d'un sketch à compteurs 4 bits, divisés par deux
+  tous les `10 × width` accès pour oublier les anciennes popularités.
+
+La taille d'une entrée est estimée par la fonction `sizeof` fournie : le
+budget porte sur les octets, pas sur le nombre d'entrées.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterator, List, Optional, Tuple
+
+from backend.app.config import settings
+from backend.app.metrics import metrics
+
+
+class FrequencySketch:
+    """
+    Count-min sketch à compteurs saturants (0-15), vieilli par division par deux.
+
+    Les index viennent de `hash()` : le sketch est local au processus (contrairement
+    à celui de `popularity`, qui est partagé entre workers).
+    """
+
+    MAX_COUNT = 15
+
+    def __init__(self, width: int = 4096, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.rows = [bytearray(width) for _ in range(depth)]
+        self.sample_size = 10 * width
+        self.additions = 0
+
+    def _indexes(self, key: Hashable) -> Iterator[int]:
+        h = hash(key)
+        h2 = (h >> 17) | 1
+        return ((h + i * h2) % self.width for i in range(self.depth))
+
+    def increment(self, key: Hashable) -> None:
+        added = False
+        for row, index in zip(self.rows, self._indexes(key)):
+            if row[index] < self.MAX_COUNT:
+                row[index] += 1
+                added = True
+        if added:
+            self.additions += 1
+            if self.additions >= self.sample_size:
+                self.reset()
+
+    def frequency(self, key: Hashable) -> int:
+        return min(row[index] for row, index in zip(self.rows, self._indexes(key)))
+
+    def reset(self) -> None:
+        """Divise tous les compteurs par deux."""
+        self.rows = [bytearray(value >> 1 for value in row) for row in self.rows]
+        self.additions //= 2
+
+
+class _Entry:
+    __slots__ = ("value", "size", "expires_at", "region")
+
+    def __init__(self, value: Any, size: int, expires_at: float, region: str):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.region = region
+
+
+_WINDOW, _PROBATION, _PROTECTED = "window", "probation", "protected"
+
+
+class TinyLFUCache:
+    """
+    Cache clé/valeur en mémoire, borné à `max_bytes` octets estimés.
+
+    `window_share` : part du budget réservée à la fenêtre LRU d'admission.
+    `protected_share` : part de la zone principale réservée aux entrées relues.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        sizeof: Callable[[Any], int] = lambda value: 1,
+        window_share: float = 0.01,
+        protected_share: float = 0.8,
+        sketch_width: int = 4096
+    ):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.window_bytes = max(1, int(max_bytes * window_share))
+        self.main_bytes = max_bytes - self.window_bytes
+        self.protected_bytes = int(self.main_bytes * protected_share)
+        self.sketch = FrequencySketch(sketch_width)
+        self._regions = {_WINDOW: OrderedDict(), _PROBATION: OrderedDict(), _PROTECTED: OrderedDict()}
+        self._bytes = {_WINDOW: 0, _PROBATION: 0, _PROTECTED: 0}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejections = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return sum(len(region) for region in self._regions.values())
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.peek(key) is not None
+
+    @property
+    def bytes_used(self) -> int:
+        return sum(self._bytes.values())
+
+    def _find(self, key: Hashable) -> Optional[_Entry]:
+        for region in self._regions.values():
+            entry = region.get(key)
+            if entry is not None:
+                return entry
+        return None
+
+    def _live(self, key: Hashable, now: float) -> Optional[_Entry]:
+        """Entrée non expirée de `key` ; une entrée expirée est retirée."""
+        entry = self._find(key)
+        if entry is not None and entry.expires_at <= now:
+            self._remove(key, entry)
+            self.expirations += 1
+            return None
+        return entry
+
+    def peek(self, key: Hashable) -> Any:
+        """Valeur de `key` sans la compter comme un accès, ou None."""
+        entry = self._live(key, time.monotonic())
+        return entry.value if entry else None
+
+    def get(self, key: Hashable) -> Any:
+        """Valeur de `key`, ou None si absente ou expirée."""
+        self.sketch.increment(key)
+        entry = self._live(key, time.monotonic())
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if entry.region == _PROBATION:
+            # Relue en probation : promue dans la zone protégée
+            self._move(key, entry, _PROTECTED)
+            self._demote_protected()
+        else:
+            self._regions[entry.region].move_to_end(key)
+        return entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> bool:
+        """
+        Ajoute ou remplace `key`, expirant après `ttl` secondes.
+        Returns False si la valeur dépasse à elle seule le budget.
+        """
+        size = self.sizeof(value)
+        if ttl <= 0 or size > self.main_bytes:
+            self.delete(key)
+            return False
+        expires_at = time.monotonic() + ttl
+        entry = self._find(key)
+        if entry is not None:
+            self._bytes[entry.region] += size - entry.size
+            entry.value, entry.size, entry.expires_at = value, size, expires_at
+            self._regions[entry.region].move_to_end(key)
+            if entry.region == _PROTECTED:
+                self._demote_protected()
+        else:
+            self.sketch.increment(key)
+            self._regions[_WINDOW][key] = _Entry(value, size, expires_at, _WINDOW)
+            self._bytes[_WINDOW] += size
+        self._evict_window()
+        self._evict_main()
+        return True
+
+    def update(self, key: Hashable, value: Any) -> bool:
+        """Remplace la valeur d'une entrée présente, sans changer son expiration."""
+        entry = self._live(key, time.monotonic())
+        if entry is None:
+            return False
+        size = self.sizeof(value)
+        self._bytes[entry.region] += size - entry.size
+        entry.value, entry.size = value, size
+        self._evict_main()
+        return True
+
+    def delete(self, key: Hashable) -> bool:
+        entry = self._find(key)
+        if entry is None:
+            return False
+        self._remove(key, entry)
+        return True
+
+    def clear(self) -> None:
+        for name, region in self._regions.items():
+            region.clear()
+            self._bytes[name] = 0
+
+    def keys(self) -> List[Hashable]:
+        return [key for region in self._regions.values() for key in region]
+
+    def _remove(self, key: Hashable, entry: _Entry) -> None:
+        del self._regions[entry.region][key]
+        self._bytes[entry.region] -= entry.size
+
+    def _move(self, key: Hashable, entry: _Entry, region: str) -> None:
+        self._remove(key, entry)
+        entry.region = region
+        self._regions[region][key] = entry
+        self._bytes[region] += entry.size
+
+    def _demote_protected(self) -> None:
+        """Renvoie en probation les entrées protégées les plus anciennes au-delà de leur part."""
+        protected = self._regions[_PROTECTED]
+        while self._bytes[_PROTECTED] > self.protected_bytes and len(protected) > 1:
+            key, entry = next(iter(protected.items()))
+            self._move(key, entry, _PROBATION)
+
+    def _evict_window(self) -> None:
+        """Fait sortir les plus anciennes entrées de la fenêtre, candidates à la zone principale."""
+        window = self._regions[_WINDOW]
+        while self._bytes[_WINDOW] > self.window_bytes and window:
+            key, candidate = next(iter(window.items()))
+            if self._admit(key, candidate):
+                self._move(key, candidate, _PROBATION)
+            else:
+                self._remove(key, candidate)
+                self.rejections += 1
+
+    def _admit(self, key: Hashable, candidate: _Entry) -> bool:
+        """Le candidat n'entre que s'il est plus fréquent que les victimes qu'il évincerait."""
+        needed = self._bytes[_PROBATION] + self._bytes[_PROTECTED] + candidate.size - self.main_bytes
+        if needed <= 0:
+            return True
+        frequency = self.sketch.frequency(key)
+        freed = 0
+        for victim_key, victim in self._victims():
+            if victim.expires_at > time.monotonic() and self.sketch.frequency(victim_key) >= frequency:
+                return False
+            freed += victim.size
+            if freed >= needed:
+                return True
+        return False
+
+    def _victims(self) -> Iterator[Tuple[Hashable, _Entry]]:
+        """Ordre d'éviction de la zone principale : probation puis protégée, du moins récent au plus récent."""
+        yield from list(self._regions[_PROBATION].items())
+        yield from list(self._regions[_PROTECTED].items())
+
+    def _evict_main(self) -> None:
+        for key, victim in self._victims():
+            if self._bytes[_PROBATION] + self._bytes[_PROTECTED] <= self.main_bytes:
+                break
+            self._remove(key, victim)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        """Compteurs du cache, pour l'endpoint de métriques."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "bytes": self.bytes_used,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "rejections": self.rejections,
+            "expirations": self.expirations,
+        }
+
+
+def estimate_record_size(record: Any) -> int:
+    """
+    Taille mémoire estimée d'un SearchRecord : ~1 Kio par vidéo une fois décodée
+    (objets, chaînes et URLs), plus l'enveloppe du résultat.
+    """
+    return 1024 + 1024 * len(record.videos)
+
+
+# Cache L1 des segments de recherche, propre à chaque worker
+memory_cache = TinyLFUCache(settings.MEMORY_CACHE_MAX_BYTES, sizeof=estimate_record_size)
+
+metrics.register("memory_cache", memory_cache.stats)
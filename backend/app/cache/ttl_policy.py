@@ -0,0 +1,165 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from backend.app.config import settings
+from backend.app.metrics import metrics
+from backend.app.models.records import VideoRecord
+
+
+class _KeyState:
+    __slots__ = ("volatility", "rate", "last_request", "views", "ttl")
+
+    def __init__(self, ttl: int):
+        self.volatility: Optional[float] = None
+        self.rate = 0.0  # Requêtes par seconde, moyenne à décroissance exponentielle
+        self.last_request: Optional[float] = None
+        self.views: Dict[str, int] = {}
+        self.ttl = ttl
+
+
+class AdaptiveTTLPolicy:
+    """
+    TTL de cache par clé, ajusté selon la volatilité et la popularité observées.
+
+    La volatilité est une moyenne mobile de l'écart entre deux rafraîchissements
+    successifs (vidéos apparues/disparues et variation des vues). La popularité est
+    un taux de requêtes lissé sur `rate_window` secondes. Une clé volatile et
+    demandée tend vers `min_ttl`, une clé stable ou délaissée vers `max_ttl`
+    (interpolation géométrique). Les clés inconnues reçoivent `default_ttl`.
+    """
+
+    # Poids de la dernière observation dans la moyenne mobile de volatilité
+    ALPHA = 0.3
+
+    def __init__(
+        self,
+        default_ttl: int,
+        min_ttl: int,
+        max_ttl: int,
+        max_keys: int = 1000,
+        rate_window: float = 300.0,
+        popular_rate: float = 1 / 60
+    ):
+        self.default_ttl = default_ttl
+        self.min_ttl = min_ttl
+        self.max_ttl = max(min_ttl, max_ttl)
+        self.max_keys = max_keys
+        self.rate_window = rate_window
+        # Taux (req/s) à partir duquel une clé compte pour moitié comme populaire
+        self.popular_rate = popular_rate
+        self._keys: "OrderedDict[str, _KeyState]" = OrderedDict()
+
+    def _state(self, key: str) -> _KeyState:
+        state = self._keys.get(key)
+        if state is None:
+            state = self._keys[key] = _KeyState(self.default_ttl)
+            if len(self._keys) > self.max_keys:
+                self._keys.popitem(last=False)
+        else:
+            self._keys.move_to_end(key)
+        return state
+
+    def record_request(self, key: str, now: Optional[float] = None) -> None:
+        """Comptabilise une requête sur `key` (hit ou miss)."""
+        now = time.monotonic() if now is None else now
+        state = self._state(key)
+        if state.last_request is not None:
+            state.rate *= math.exp(-(now - state.last_request) / self.rate_window)
+        state.rate += 1 / self.rate_window
+        state.last_request = now
+
+    def observe(self, key: str, videos: Iterable[VideoRecord]) -> int:
+        """
+        Enregistre le contenu fraîchement lu pour `key` et recalcule son TTL.
+        Returns the TTL (seconds) to apply to this refresh.
+        """
+        state = self._state(key)
+        views = {video.id: video.view_count or 0 for video in videos}
+        if state.views:
+            change = self._change(state.views, views)
+            state.volatility = change if state.volatility is None else (
+                self.ALPHA * change + (1 - self.ALPHA) * state.volatility
+            )
+        state.views = views
+        state.ttl = self._ttl(state)
+        return state.ttl
+
+    @staticmethod
+    def _change(previous: Dict[str, int], current: Dict[str, int]) -> float:
+        """Écart entre deux rafraîchissements, dans [0, 1]."""
+        union = previous.keys() | current.keys()
+        shared = previous.keys() & current.keys()
+        churn = 1 - len(shared) / len(union) if union else 0.0
+        if not shared:
+            return churn
+        drift = sum(
+            min(1.0, abs(current[video_id] - previous[video_id]) / max(previous[video_id], 1))
+            for video_id in shared
+        ) / len(shared)
+        return (churn + drift) / 2
+
+    def _ttl(self, state: _KeyState) -> int:
+        if state.volatility is None:
+            return self.default_ttl
+        popularity = state.rate / (state.rate + self.popular_rate)
+        score = state.volatility * (0.5 + 0.5 * popularity)
+        return round(self.min_ttl * (self.max_ttl / self.min_ttl) ** (1 - score))
+
+    def ttl_for(self, key: str) -> int:
+        """TTL courant de `key` (default_ttl si elle n'a jamais été observée)."""
+        state = self._keys.get(key)
+        return state.ttl if state else self.default_ttl
+
+    def stats(self) -> dict:
+        """Distribution des TTL courants, pour l'endpoint de métriques."""
+        ttls = sorted(state.ttl for state in self._keys.values())
+        return {
+            "keys": len(ttls),
+            "bounds": {"min": self.min_ttl, "max": self.max_ttl, "default": self.default_ttl},
+            "ttl": _summary(ttls),
+            "histogram": _histogram(ttls, self.min_ttl, self.max_ttl),
+        }
+
+
+def _summary(values: List[int]) -> dict:
+    if not values:
+        return {}
+    return {
+        "min": values[0],
+        "p50": values[len(values) // 2],
+        "p90": values[min(len(values) - 1, int(len(values) * 0.9))],
+        "max": values[-1],
+        "mean": round(sum(values) / len(values), 1),
+    }
+
+
+def _histogram(values: List[int], low: int, high: int, buckets: int = 6) -> List[Tuple[int, int]]:
+    """Histogramme à pas géométrique entre `low` et `high` : [(borne haute, effectif)]."""
+    edges = [round(low * (high / low) ** (i / buckets)) for i in range(1, buckets + 1)]
+    counts = [0] * buckets
+    for value in values:
+        index = next((i for i, edge in enumerate(edges) if value <= edge), buckets - 1)
+        counts[index] += 1
+    return list(zip(edges, counts))
+
+
+# Instances globales, une par segment du cache de recherche
+live_ttl_policy = AdaptiveTTLPolicy(
+    default_ttl=settings.CACHE_LIVE_TTL,
+    min_ttl=settings.CACHE_LIVE_TTL_MIN,
+    max_ttl=settings.CACHE_LIVE_TTL_MAX,
+    max_keys=settings.CACHE_MAX_SIZE
+)
+archive_ttl_policy = AdaptiveTTLPolicy(
+    default_ttl=settings.CACHE_ARCHIVE_TTL,
+    min_ttl=settings.CACHE_ARCHIVE_TTL_MIN,
+    max_ttl=settings.CACHE_ARCHIVE_TTL_MAX,
+    max_keys=settings.CACHE_MAX_SIZE
+)
+
+metrics.register("cache_ttl", lambda: {
+    "live": live_ttl_policy.stats(),
+    "archive": archive_ttl_policy.stats(),
+})
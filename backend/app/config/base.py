@@ -14,6 +14,10 @@ class Settings(BaseSettings):
     MONGODB_URL: str
     MONGODB_DB_NAME: str = "dbTwitch" # Default value
 
+    # Storage backend of the repositories
+    STORAGE_BACKEND: str = "mongodb" # "mongodb", "redis" (REDIS_URL), "sqlite" (STORAGE_PATH) ou "memory"
+    STORAGE_PATH: str = "data/streamzilla.db" # Fichier du backend "sqlite"
+
     # Redis settings
     REDIS_URL: str
 
@@ -29,6 +33,59 @@ class Settings(BaseSettings):
     # Cache settings
     CACHE_TTL: int = 3600 # 1 hour default
     CACHE_MAX_SIZE: int = 1000 # Default max size
+    CACHE_LIVE_TTL: int = 60 # TTL (s) du segment live (/streams) du cache de recherche
+    CACHE_ARCHIVE_TTL: int = 3600 # TTL (s) du segment archive (/videos)
+    # Bornes du TTL adaptatif par jeu (les TTL ci-dessus servent de valeur initiale)
+    CACHE_LIVE_TTL_MIN: int = 15
+    CACHE_LIVE_TTL_MAX: int = 600
+    CACHE_ARCHIVE_TTL_MIN: int = 900
+    CACHE_ARCHIVE_TTL_MAX: int = 21600
+    # Préchauffage du cache pour les jeux les plus recherchés
+    WARMING_ENABLED: bool = True
+    WARMING_INTERVAL: int = 15 # Secondes entre deux passes de préchauffage
+    WARMING_TOP_K: int = 20 # Nombre de jeux maintenus chauds
+    POPULARITY_TRACKED: int = 100 # Candidats suivis par le top-K de popularité
+    POPULARITY_HALF_LIFE: int = 3600 # Demi-vie (s) des compteurs de popularité
+    TOKEN_CLEANUP_INTERVAL: int = 3600 # Secondes entre deux purges des vieux tokens
+    SNAPSHOT_TTL: int = 900 # Durée de vie (s) des snapshots de pagination
+    SNAPSHOT_MAX_ITEMS: int = 2000 # Nombre max de vidéos accumulées dans un snapshot
+    PREFETCH_BUDGET_SHARE: float = 0.1 # Part du rate limit Helix réservée au préchargement
+    PREFETCH_MAX_TASKS: int = 8 # Préchargements simultanés max
+    # Rafraîchissement unique d'une clé du cache à l'échelle de la flotte
+    REFRESH_LOCK_TTL: float = 10.0 # Durée (s) du lease de rafraîchissement
+    REFRESH_WAIT_TIMEOUT: float = 5.0 # Attente max (s) d'un autre worker avant de rafraîchir soi-même
+    # Budget Helix partagé (Redis) : jetons pris par lease local et durée de validité (s)
+    HELIX_BUDGET_LEASE_SIZE: int = 5
+    HELIX_BUDGET_LEASE_TTL: float = 1.0
+    # Limite adaptative des appels Helix simultanés par worker (AIMD sur la latence)
+    HELIX_CONCURRENCY_INITIAL: int = 10
+    HELIX_CONCURRENCY_MIN: int = 2
+    HELIX_CONCURRENCY_MAX: int = 50
+    HELIX_INTERACTIVE_RESERVE: float = 0.2 # Part de la limite laissée libre par les appels de fond
+    SEARCH_DEADLINE: float = 8.0 # Durée max (s) des appels Helix d'une recherche ; au-delà, résultat partiel
+    CACHE_COMPRESSION: str = "zlib" # Stockage des résultats en cache : "zlib", "zstd" (paquet zstandard) ou "none"
+    MEMORY_CACHE_MAX_BYTES: int = 64 * 1024 * 1024 # Budget (octets estimés) du cache mémoire L1 par worker
+    # Niveau de cache local persistant (SQLite), conservé entre les redémarrages
+    DISK_CACHE_PATH: str = "" # Fichier du cache disque ; vide = désactivé
+    DISK_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    DISK_CACHE_WARM_ITEMS: int = 500 # Segments rechargés en mémoire au démarrage
+
+    # Limites des requêtes entrantes (429 par client, 503 si le worker est saturé)
+    RATE_LIMIT_CALLS: int = 30 # Requêtes autorisées par client (adresse IP) et par période
+    RATE_LIMIT_PERIOD: int = 60 # Durée (s) de la période
+    RATE_LIMIT_SHARED: bool = False # Buckets des clients dans Redis, communs à tous les workers
+    TRUSTED_PROXIES: list[str] = [] # Réseaux des proxys (nginx) dont on lit X-Real-IP / X-Forwarded-For
+    MAX_IN_FLIGHT: int = 64 # Requêtes traitées simultanément par worker
+    MAX_QUEUED: int = 64 # Requêtes en attente d'une place ; au-delà, 503 immédiat
+    QUEUE_TIMEOUT: float = 1.0 # Attente max (s) d'une place avant 503
+
+    # Ingestion settings (catalogue local alimenté en tâche de fond)
+    INGESTION_ENABLED: bool = False
+    INGESTION_INTERVAL: int = 300 # Secondes entre deux passes d'ingestion
+    INGESTION_TOP_GAMES: int = 20 # Nombre de jeux du /games/top à ingérer
+    INGESTION_MAX_PAGES: int = 5 # Pages Helix max par jeu et par type
+    INGESTION_BUDGET_SHARE: float = 0.25 # Part du rate limit Helix réservée à l'ingestion
+    CATALOG_FRESHNESS: int = 600 # Âge max (s) d'une entrée du catalogue servie en lecture
 
     # API_URL - Base URL of your backend API
     API_URL: str = "http://localhost:8000" # Default value
@@ -27,6 +27,9 @@ class TestSettings(Settings): # Inherit from base Settings
     CACHE_TTL: int = 60  # 1 minute, override for tests
     CACHE_MAX_SIZE: int = 10 # Smaller cache for tests
 
+    # Les tests enchaînent les requêtes depuis le même client
+    RATE_LIMIT_CALLS: int = 1000
+
     # API_URL - can be inherited or overridden if test server is different
     # API_URL: str = "http://localhost:8000" 
 
@@ -1,32 +1,48 @@
 import logging
 
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from motor.motor_asyncio import AsyncIOMotorClient
 
 from backend.app.config import settings
+from backend.app.storage import StorageBackend, open_store
+from backend.app.storage.mongo import MongoBackend
 
 logger = logging.getLogger(__name__)
 
 
 class MongoDB:
-    """Singleton-style MongoDB client manager with lifecycle methods."""
+    """
+    Singleton-style storage manager with lifecycle methods.
+
+    `db` is the `StorageBackend` of the repositories: MongoDB by default, or
+    the Redis, SQLite or memory backend selected by STORAGE_BACKEND (`client`
+    then stays None).
+    """
 
     def __init__(self):
         self.client: AsyncIOMotorClient | None = None
-        self.db: AsyncIOMotorDatabase | None = None
+        self.db: StorageBackend | None = None
 
     async def connect(self) -> None:
+        if settings.STORAGE_BACKEND != "mongodb":
+            self.db = await open_store(settings.STORAGE_BACKEND, path=settings.STORAGE_PATH, url=settings.REDIS_URL)
+            logger.info(f"Connected to {settings.STORAGE_BACKEND} storage")
+            return
         self.client = AsyncIOMotorClient(settings.MONGODB_URL)
-        self.db = self.client[settings.MONGODB_DB_NAME]
+        self.db = MongoBackend(self.client[settings.MONGODB_DB_NAME])
         logger.info(f"Connected to MongoDB: {settings.MONGODB_DB_NAME}")
 
     async def disconnect(self) -> None:
+        if self.db is not None:
+            await self.db.close()
+            self.db = None
         if self.client is not None:
             self.client.close()
             self.client = None
-            self.db = None
             logger.info("Disconnected from MongoDB")
+        else:
+            logger.info(f"Disconnected from {settings.STORAGE_BACKEND} storage")
 
-    def get_db(self) -> AsyncIOMotorDatabase:
+    def get_db(self) -> StorageBackend:
         if self.db is None:
             raise RuntimeError("MongoDB not connected. Call connect() first.")
         return self.db
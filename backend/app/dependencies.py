@@ -1,24 +1,35 @@
 from typing import Optional
 
 from fastapi import HTTPException, Header, status
-from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from backend.app.database import mongodb
 from backend.app.services.twitch_service import TwitchService
+from backend.app.storage import StorageBackend
 
 
-async def get_db() -> AsyncIOMotorDatabase:
-    """Return the shared MongoDB database handle."""
+async def get_db() -> StorageBackend:
+    """Return the shared storage backend."""
     return mongodb.get_db()
 
 
+# Instance partagée : les préchargements en tâche de fond survivent à la requête
+_twitch_service: Optional[TwitchService] = None
+
+
 async def get_twitch_service() -> TwitchService:
-    """Get Twitch service instance."""
-    service = TwitchService()
-    try:
-        yield service
-    finally:
-        await service.close()
+    """Get the shared Twitch service instance."""
+    global _twitch_service
+    if _twitch_service is None:
+        _twitch_service = TwitchService()
+    return _twitch_service
+
+
+async def close_twitch_service() -> None:
+    """Close the shared Twitch service (called on application shutdown)."""
+    global _twitch_service
+    if _twitch_service is not None:
+        await _twitch_service.close()
+        _twitch_service = None
 
 
 async def get_twitch_token(authorization: Optional[str] = Header(None)) -> str:
@@ -0,0 +1,111 @@
+"""
+Leases distribués : un seul détenteur à la fois pour un nom donné, avec expiration.
+
+Utilisés pour l'élection d'un leader par job planifié. Redis est préféré (une
+commande atomique via Lua) ; le backend de stockage sert de repli, puis un
+lease local au processus quand aucun des deux n'est disponible (un seul worker).
+"""
+import logging
+import os
+import socket
+import time
+from typing import Dict, Tuple
+
+from backend.app.storage.base import StorageError
+
+logger = logging.getLogger(__name__)
+
+# Identifiant de ce processus en tant que détenteur de lease
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Prend le lease s'il est libre, ou le prolonge si on le détient déjà
+_ACQUIRE_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if not current then
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+    return 1
+end
+if current == ARGV[1] then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class LocalLease:
+    """Lease en mémoire, valable pour un seul processus."""
+
+    def __init__(self):
+        self._leases: Dict[str, Tuple[str, float]] = {}
+
+    async def acquire(self, name: str, owner: str, ttl: float) -> bool:
+        now = time.monotonic()
+        current = self._leases.get(name)
+        if current and current[0] != owner and current[1] > now:
+            return False
+        self._leases[name] = (owner, now + ttl)
+        return True
+
+    async def release(self, name: str, owner: str) -> None:
+        if self._leases.get(name, (None,))[0] == owner:
+            del self._leases[name]
+
+
+class RedisLease:
+    """Lease porté par une clé Redis à expiration (SET NX PX)."""
+
+    def __init__(self, client, prefix: str = "lease:"):
+        self.client = client
+        self.prefix = prefix
+        self._acquire = client.register_script(_ACQUIRE_SCRIPT)
+        self._release = client.register_script(_RELEASE_SCRIPT)
+
+    async def acquire(self, name: str, owner: str, ttl: float) -> bool:
+        acquired = await self._acquire(keys=[self.prefix + name], args=[owner, int(ttl * 1000)])
+        return bool(acquired)
+
+    async def release(self, name: str, owner: str) -> None:
+        await self._release(keys=[self.prefix + name], args=[owner])
+
+
+class StorageLease:
+    """Lease porté par le backend de stockage (espace de noms "leases")."""
+
+    namespace = "leases"
+
+    def __init__(self, store):
+        self.store = store
+
+    async def acquire(self, name: str, owner: str, ttl: float) -> bool:
+        try:
+            return await self.store.claim(self.namespace, name, owner, ttl)
+        except StorageError as e:
+            logger.error(f"Storage error acquiring lease {name}: {str(e)}")
+            return False
+
+    async def release(self, name: str, owner: str) -> None:
+        try:
+            await self.store.release(self.namespace, name, owner)
+        except StorageError as e:
+            logger.error(f"Storage error releasing lease {name}: {str(e)}")
+
+
+def build_lease():
+    """Lease Redis si disponible, sinon le backend de stockage, sinon local."""
+    from backend.app.database import mongodb
+    from backend.app.redis_client import redis_manager
+
+    client = redis_manager.get_client()
+    if client is not None:
+        return RedisLease(client)
+    if mongodb.db is not None:
+        return StorageLease(mongodb.get_db())
+    return LocalLease()
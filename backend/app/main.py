@@ -8,11 +8,13 @@ from starlette.middleware.sessions import SessionMiddleware
 # Local imports
 from .routers.search import router as search_router
 from .routers.auth import router as auth_router
+from .routers.metrics import router as metrics_router
 from .config import settings
 from .cache_config import setup_cache
 from .scheduler import CacheScheduler
 from .config.logging_config import setup_logging
 from .middleware.logging import RequestLoggingMiddleware
+from .middleware.rate_limit import RateLimitMiddleware
 
 # Configuration des logs
 setup_logging()  # Utilise notre nouvelle configuration
@@ -29,9 +31,70 @@ async def lifespan(app: FastAPI):
     from .database import mongodb
     await mongodb.connect()
 
+    from .repositories.twitch_repository import TwitchRepository
+    await TwitchRepository(mongodb.get_db()).initialize()
+
+    # Niveau de cache disque : un worker redémarré sert ses clés chaudes sans MongoDB
+    from .cache.disk import disk_cache
+    from .cache.tinylfu import memory_cache
+    if settings.DISK_CACHE_PATH and disk_cache.open(
+        settings.DISK_CACHE_PATH,
+        max_bytes=settings.DISK_CACHE_MAX_BYTES
+    ):
+        # Les segments les plus récemment utilisés sont rechargés en mémoire
+        TwitchRepository(
+            mongodb.get_db(), disk_cache=disk_cache, memory_cache=memory_cache
+        ).warm_memory_cache(settings.DISK_CACHE_WARM_ITEMS)
+
+    # Écritures du cache et des jeux différées hors du chemin des requêtes
+    from .repositories.write_behind import write_behind
+    await write_behind.start(mongodb.get_db())
+
+    from .redis_client import redis_manager
+    await redis_manager.connect()
+
+    # Invalidations des caches locaux propagées à tous les workers
+    from .cache.invalidation import invalidation_bus
+    await invalidation_bus.start(redis_manager.get_client())
+
     await setup_cache()
 
-    scheduler = CacheScheduler(cache_ttl=3600)
+    from .locks import build_lease
+    from .repositories.token_repository import TokenRepository
+
+    scheduler = CacheScheduler(lease=build_lease())
+    # Purge des vieux tokens invalides
+    scheduler.add_job(
+        "token_cleanup",
+        TokenRepository(mongodb.get_db()).cleanup_old_tokens,
+        interval=settings.TOKEN_CLEANUP_INTERVAL
+    )
+
+    ingestion_service = None
+    if settings.INGESTION_ENABLED:
+        from .repositories.catalog_repository import CatalogRepository
+        from .services.ingestion_service import IngestionService
+        from .services.twitch_service import TwitchService
+
+        catalog_repository = CatalogRepository(mongodb.get_db())
+        await catalog_repository.initialize()
+        ingestion_service = IngestionService(TwitchService(), catalog_repository)
+        scheduler.add_job("ingestion", ingestion_service.run_once, interval=settings.INGESTION_INTERVAL)
+
+    if settings.WARMING_ENABLED:
+        from .dependencies import get_twitch_service
+        from .services.warming_service import CacheWarmingService
+
+        warming_service = CacheWarmingService(await get_twitch_service())
+        # Chaque worker publie sa popularité locale ; un seul préchauffe le cache
+        scheduler.add_job(
+            "popularity_sync",
+            warming_service.sync_popularity,
+            interval=settings.WARMING_INTERVAL,
+            leader_only=False
+        )
+        scheduler.add_job("cache_warming", warming_service.run_once, interval=settings.WARMING_INTERVAL)
+
     await scheduler.start()
 
     logger.info("Application started")
@@ -39,6 +102,15 @@ async def lifespan(app: FastAPI):
     # === Shutdown ===
     if scheduler:
         await scheduler.stop()
+    if ingestion_service:
+        await ingestion_service.close()
+    from .dependencies import close_twitch_service
+    await close_twitch_service()
+    # Vide la file d'écritures avant de fermer le stockage
+    await write_behind.stop()
+    disk_cache.close()
+    await invalidation_bus.stop()
+    await redis_manager.disconnect()
     await mongodb.disconnect()
     logger.info("Application stopped")
 
@@ -58,6 +130,9 @@ app = FastAPI(
     debug=settings.DEBUG
 )
 
+# Limitation des requêtes : ajoutée avant CORS pour que les 429/503 portent ses en-têtes
+app.add_middleware(RateLimitMiddleware)
+
 # Configuration CORS
 app.add_middleware(
     CORSMiddleware,
@@ -81,6 +156,7 @@ app.add_middleware(RequestLoggingMiddleware)
 # Include routers
 app.include_router(search_router)
 app.include_router(auth_router)
+app.include_router(metrics_router)
 
 @app.get("/")
 async def root():
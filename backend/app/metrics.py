@@ -0,0 +1,35 @@
+import logging
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsRegistry:
+    """
+    Registre des métriques exposées par GET /api/metrics.
+
+    Chaque composant enregistre un fournisseur qui renvoie un dict sérialisable ;
+    les fournisseurs sont évalués à chaque lecture, rien n'est recopié entre-temps.
+    """
+
+    def __init__(self):
+        self._providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def register(self, name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+        """Enregistre (ou remplace) le fournisseur de la section `name`."""
+        self._providers[name] = provider
+
+    def collect(self) -> Dict[str, Any]:
+        """Évalue tous les fournisseurs ; une section en erreur est signalée sans bloquer les autres."""
+        snapshot = {}
+        for name, provider in self._providers.items():
+            try:
+                snapshot[name] = provider()
+            except Exception as e:
+                logger.error(f"Error collecting metrics '{name}': {str(e)}")
+                snapshot[name] = {"error": str(e)}
+        return snapshot
+
+
+# Instance globale
+metrics = MetricsRegistry()
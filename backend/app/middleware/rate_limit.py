@@ -0,0 +1,304 @@
+"""
+Limitation des requêtes entrantes et délestage.
+
+Deux garde-fous, appliqués avant les routes :
+- un token bucket par client (`RATE_LIMIT_CALLS` requêtes par `RATE_LIMIT_PERIOD`
+  secondes) : un client ou un bot trop bavard reçoit un 429, sans consommer le
+  budget Helix de tout le monde ;
+- un plafond de requêtes en cours par worker (`MAX_IN_FLIGHT`), avec une file
+  d'attente bornée (`MAX_QUEUED`, `QUEUE_TIMEOUT`) : au-delà, un 503 immédiat
+  plutôt qu'une latence qui se dégrade pour tous.
+
+Les deux réponses portent un en-tête `Retry-After`.
+"""
+import asyncio
+import ipaddress
+import logging
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Iterable, List, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp
+
+from backend.app.config import settings
+from backend.app.metrics import metrics
+from backend.app.services.twitch.rate_budget import RedisTokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Sondes et métriques : jamais limitées, pour rester observables sous charge.
+# Comparés sans la barre oblique finale ("/api/metrics" comme "/api/metrics/").
+EXEMPT_PATHS = frozenset({"/api/health", "/api/metrics"})
+
+
+class ClientRateLimiter:
+    """
+    Token bucket par client : `calls` requêtes par fenêtre de `period` secondes.
+
+    En mémoire, les buckets des `max_clients` clients les plus récents sont
+    conservés (un client évincé repart avec un bucket plein). Avec `shared=True`,
+    le bucket d'un client est une clé Redis commune à tous les workers
+    (`RedisTokenBucket`, comme le budget Helix partagé) ; sans Redis, on retombe
+    sur le bucket local.
+    """
+
+    def __init__(
+        self,
+        calls: int,
+        period: float,
+        shared: bool = False,
+        max_clients: int = 10000,
+        prefix: str = "ratelimit:",
+        client_provider=None
+    ):
+        self.capacity = max(1, int(calls))
+        self.rate = self.capacity / period
+        self.shared = shared
+        self.max_clients = max_clients
+        self.prefix = prefix
+        self._client_provider = client_provider or _default_client
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self._bucket: Optional[RedisTokenBucket] = None
+        self.allowed = 0
+        self.limited = 0
+        self.local_fallbacks = 0
+
+    def _hit_local(self, client: str) -> Tuple[bool, float]:
+        now = time.monotonic()
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = [float(self.capacity), now]
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+            bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return True, 0.0
+        return False, (1 - bucket[0]) / self.rate
+
+    async def _hit_shared(self, client: str) -> Optional[Tuple[bool, float]]:
+        redis = self._client_provider()
+        if redis is None:
+            self._bucket = None
+            return None
+        if self._bucket is None or self._bucket.client is not redis:
+            self._bucket = RedisTokenBucket(redis)
+        try:
+            granted, wait = await self._bucket.take(f"{self.prefix}{client}", self.capacity, self.rate)
+        except Exception as e:
+            logger.warning(f"[RateLimit] Redis bucket unavailable, using local bucket: {str(e)}")
+            return None
+        return bool(granted), wait
+
+    async def hit(self, client: str) -> Tuple[bool, float]:
+        """Consomme une requête du bucket de `client` ; renvoie (autorisée, secondes avant la prochaine)."""
+        result = await self._hit_shared(client) if self.shared else None
+        if result is None:
+            if self.shared:
+                self.local_fallbacks += 1
+            result = self._hit_local(client)
+        if result[0]:
+            self.allowed += 1
+        else:
+            self.limited += 1
+        return result
+
+    def stats(self) -> dict:
+        """Compteurs du limiteur, pour l'endpoint de métriques."""
+        return {
+            "scope": "redis" if self._bucket is not None else "local",
+            "capacity": self.capacity,
+            "rate": self.rate,
+            "tracked_clients": len(self._buckets),
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "local_fallbacks": self.local_fallbacks,
+        }
+
+
+class LoadShedder:
+    """
+    Plafond de requêtes traitées simultanément, avec une file d'attente bornée.
+
+    Une requête prend une place si `in_flight < max_in_flight` ; sinon elle attend
+    (FIFO) au plus `queue_timeout` secondes qu'une place lui soit cédée. File
+    pleine ou attente expirée : `acquire()` renvoie False et la requête est
+    délestée.
+    """
+
+    def __init__(self, max_in_flight: int, max_queued: int, queue_timeout: float):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queued = max(0, max_queued)
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """Prend une place, en attendant dans la file si besoin ; False si la requête est délestée."""
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if len(self._waiters) >= self.max_queued:
+            self.rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            # La place a pu être cédée au moment même de l'expiration
+            if waiter.done() and not waiter.cancelled():
+                self.admitted += 1
+                return True
+            self.timed_out += 1
+            return False
+        except asyncio.CancelledError:
+            # Client parti : une place déjà cédée est rendue au suivant
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        """Rend une place : cédée directement au premier en attente, sinon libérée."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> dict:
+        """Compteurs du délestage, pour l'endpoint de métriques."""
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queued": self.max_queued,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+def _parse_networks(proxies: Iterable[str]) -> List[ipaddress._BaseNetwork]:
+    networks = []
+    for proxy in proxies:
+        try:
+            networks.append(ipaddress.ip_network(proxy, strict=False))
+        except ValueError:
+            logger.warning(f"[RateLimit] Ignoring invalid trusted proxy {proxy!r}")
+    return networks
+
+
+def client_address(request: Request, trusted_proxies: List[ipaddress._BaseNetwork]) -> str:
+    """
+    Adresse du client à l'origine de la requête.
+
+    Derrière un proxy de confiance (nginx), c'est celle qu'il transmet dans
+    X-Real-IP, à défaut la dernière entrée de X-Forwarded-For (celle qu'il a
+    ajoutée) ; ces en-têtes sont ignorés venant de n'importe qui d'autre.
+    """
+    host = request.client.host if request.client else "unknown"
+    if not trusted_proxies:
+        return host
+    try:
+        peer = ipaddress.ip_address(host)
+    except ValueError:
+        return host
+    if not any(peer in network for network in trusted_proxies):
+        return host
+    forwarded = request.headers.get("x-real-ip") or request.headers.get("x-forwarded-for", "").split(",")[-1]
+    return forwarded.strip() or host
+
+
+def _too_many(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        {"detail": detail},
+        status_code=status_code,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+
+
+class RateLimitMiddleware(BaseHTTPMiddleware):
+    """
+    429 au-delà du débit d'un client, 503 si le worker est saturé.
+
+    Le client est identifié par son adresse ; pour une requête relayée par un
+    proxy de `TRUSTED_PROXIES` (le nginx du déploiement), par l'adresse que le
+    proxy transmet, sinon tous les utilisateurs partageraient son bucket.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: Optional[ClientRateLimiter] = None,
+        shedder: Optional[LoadShedder] = None,
+        exempt_paths=EXEMPT_PATHS,
+        trusted_proxies: Optional[Iterable[str]] = None
+    ):
+        super().__init__(app)
+        self.limiter = limiter or rate_limiter
+        self.shedder = shedder or load_shedder
+        self.exempt_paths = frozenset(path.rstrip("/") or "/" for path in exempt_paths)
+        self.trusted_proxies = _parse_networks(
+            settings.TRUSTED_PROXIES if trusted_proxies is None else trusted_proxies
+        )
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method == "OPTIONS" or (request.url.path.rstrip("/") or "/") in self.exempt_paths:
+            return await call_next(request)
+
+        client = client_address(request, self.trusted_proxies)
+        allowed, retry_after = await self.limiter.hit(client)
+        if not allowed:
+            return _too_many(429, "Too many requests", retry_after)
+
+        if not await self.shedder.acquire():
+            logger.warning(f"Shedding {request.method} {request.url.path}: {self.shedder.in_flight} requests in flight")
+            return _too_many(503, "Server overloaded, retry later", self.shedder.queue_timeout)
+        try:
+            return await call_next(request)
+        finally:
+            self.shedder.release()
+
+
+def _default_client():
+    from backend.app.redis_client import redis_manager
+    return redis_manager.get_client()
+
+
+# Instances globales
+rate_limiter = ClientRateLimiter(
+    settings.RATE_LIMIT_CALLS,
+    settings.RATE_LIMIT_PERIOD,
+    shared=settings.RATE_LIMIT_SHARED
+)
+load_shedder = LoadShedder(settings.MAX_IN_FLIGHT, settings.MAX_QUEUED, settings.QUEUE_TIMEOUT)
+metrics.register("rate_limit", rate_limiter.stats)
+metrics.register("load_shedding", load_shedder.stats)
@@ -0,0 +1,154 @@
+"""
+Représentation interne compacte des résultats de recherche.
+
+Les couches service et repository manipulent ces dataclasses à slots plutôt que
+les modèles pydantic de `models.twitch` : pas de validation à la construction,
+pas de `__dict__` par instance. La conversion vers les modèles pydantic n'a lieu
+qu'à la frontière de l'API (`SearchRecord.to_api`). La correspondance avec les
+payloads Helix est dans `services.twitch.mapping`.
+"""
+import calendar
+import re
+from dataclasses import dataclass, fields, replace
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from backend.app.models.twitch import TwitchSearchResult
+
+_DURATION_RE = re.compile(r"(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s)?")
+
+
+def parse_duration(duration: str) -> int:
+    """Convertit une durée Twitch ("1h2m3s") en secondes ; 0 pour "live" ou vide."""
+    if not duration:
+        return 0
+    match = _DURATION_RE.match(duration)
+    hours, minutes, seconds = (int(group) if group else 0 for group in match.groups())
+    return hours * 3600 + minutes * 60 + seconds
+
+
+@dataclass(slots=True)
+class GameRecord:
+    id: str
+    name: str
+    box_art_url: str = ""
+
+    def to_document(self) -> Dict[str, Any]:
+        return {"id": self.id, "name": self.name, "box_art_url": self.box_art_url}
+
+    @classmethod
+    def from_document(cls, doc: Dict[str, Any]) -> "GameRecord":
+        return cls(id=doc["id"], name=doc["name"], box_art_url=doc.get("box_art_url", ""))
+
+
+@dataclass(slots=True)
+class VideoRecord:
+    id: str
+    user_name: str
+    title: str
+    thumbnail_url: str
+    language: str = ""
+    # /streams expose viewer_count et started_at, /videos view_count et created_at
+    view_count: Optional[int] = None
+    created_at: Optional[datetime] = None
+    type: Optional[str] = None  # "live" pour /streams, "archive" pour /videos
+    url: str = ""
+    duration: str = "live"  # /streams ne fournit pas de durée
+    # Champs dérivés une seule fois dans __post_init__ s'ils ne sont pas fournis
+    duration_seconds: Optional[int] = None
+    is_live: Optional[bool] = None
+    game_id: Optional[str] = None
+    game_name: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if self.is_live is None:
+            self.is_live = self.type == "live"
+        if self.duration_seconds is None:
+            self.duration_seconds = 0 if self.is_live else parse_duration(self.duration)
+        if not self.url:
+            self.url = f"https://www.twitch.tv/{self.user_name.lower()}"
+        # MongoDB renvoie des datetimes naïfs : on les considère en UTC
+        if self.created_at is not None and self.created_at.tzinfo is None:
+            self.created_at = self.created_at.replace(tzinfo=timezone.utc)
+
+    def to_document(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in _VIDEO_FIELDS}
+
+    @classmethod
+    def from_document(cls, doc: Dict[str, Any]) -> "VideoRecord":
+        return cls(
+            id=doc["id"],
+            user_name=doc["user_name"],
+            title=doc["title"],
+            thumbnail_url=doc["thumbnail_url"],
+            language=doc.get("language", ""),
+            view_count=doc.get("view_count"),
+            created_at=doc.get("created_at"),
+            type=doc.get("type"),
+            url=doc.get("url", ""),
+            duration=doc.get("duration", "live"),
+            duration_seconds=doc.get("duration_seconds"),
+            is_live=doc.get("is_live"),
+            game_id=doc.get("game_id"),
+            game_name=doc.get("game_name")
+        )
+
+
+_VIDEO_FIELDS = tuple(field.name for field in fields(VideoRecord))
+
+
+@dataclass(slots=True)
+class SearchRecord:
+    game_name: str
+    game: Optional[GameRecord]
+    videos: List[VideoRecord]
+    last_updated: datetime
+    pagination: Dict[str, Optional[str]]
+    snapshot_id: Optional[str] = None  # Snapshot servant les pages suivantes
+    partial: bool = False  # Résultat tronqué par l'échéance de la requête (non persisté)
+
+    @property
+    def total_count(self) -> int:
+        return len(self.videos)
+
+    @property
+    def generation(self) -> int:
+        """Version du résultat : horodatage UTC de sa lecture Helix, en microsecondes."""
+        return calendar.timegm(self.last_updated.utctimetuple()) * 1_000_000 + self.last_updated.microsecond
+
+    def with_videos(
+        self,
+        videos: List[VideoRecord],
+        pagination: Optional[Dict[str, Optional[str]]] = None
+    ) -> "SearchRecord":
+        """Copie du résultat avec une autre liste de vidéos (et pagination)."""
+        if pagination is None:
+            return replace(self, videos=videos)
+        return replace(self, videos=videos, pagination=pagination)
+
+    def to_document(self) -> Dict[str, Any]:
+        return {
+            "game_name": self.game_name,
+            "game": self.game.to_document() if self.game else None,
+            "videos": [video.to_document() for video in self.videos],
+            "total_count": self.total_count,
+            "last_updated": self.last_updated,
+            "pagination": self.pagination,
+            "snapshot_id": self.snapshot_id
+        }
+
+    @classmethod
+    def from_document(cls, doc: Dict[str, Any]) -> "SearchRecord":
+        game = doc.get("game")
+        return cls(
+            game_name=doc["game_name"],
+            game=GameRecord.from_document(game) if game else None,
+            videos=[VideoRecord.from_document(video) for video in doc.get("videos", [])],
+            last_updated=doc["last_updated"],
+            pagination=doc.get("pagination") or {"cursor": None},
+            snapshot_id=doc.get("snapshot_id")
+        )
+
+    def to_api(self) -> TwitchSearchResult:
+        """Conversion vers le modèle pydantic exposé par l'API."""
+        return TwitchSearchResult.model_validate(self, from_attributes=True)
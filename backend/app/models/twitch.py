@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List, Dict
-from datetime import datetime
+from pydantic import BaseModel, Field, ConfigDict, field_validator
+from typing import Optional, List, Dict, Literal
+from datetime import datetime, timezone
 
 class SearchParams(BaseModel):
     model_config = ConfigDict(title="Paramètres de recherche")
@@ -8,6 +8,24 @@ class SearchParams(BaseModel):
     limit: int = Field(default=100, ge=1, le=100, description="Nombre maximum de résultats à retourner")
     cursor: Optional[str] = None
 
+class SearchFilters(BaseModel):
+    model_config = ConfigDict(title="Filtres de recherche")
+    language: Optional[str] = Field(default=None, description="Langue des vidéos (transmise à Helix)")
+    date: Literal["all", "today", "this_week", "this_month"] = "all"
+    duration: Literal["all", "short", "medium", "long"] = "all"
+    views: Literal["all", "less_100", "100_1000", "more_1000"] = "all"
+    sort: Optional[Literal["date", "views", "duration"]] = None
+
+    @property
+    def is_active(self) -> bool:
+        """Vrai si un filtre ou un tri doit être appliqué côté serveur."""
+        return (
+            self.date != "all"
+            or self.duration != "all"
+            or self.views != "all"
+            or self.sort is not None
+        )
+
 class TwitchUser(BaseModel):
     model_config = ConfigDict(title="Utilisateur Twitch")
     id: str
@@ -50,13 +68,23 @@ class TwitchVideo(BaseModel):
     url: str
     view_count: Optional[int] = None
     duration: str
-    created_at: str
+    duration_seconds: int = 0  # Durée parsée à l'ingestion (0 pour un live)
+    created_at: Optional[datetime] = None
+    is_live: bool = False
     language: str
     thumbnail_url: str
     game_id: Optional[str] = None
     game_name: Optional[str] = None
     type: Optional[str] = None  # Pour différencier les lives des archives
 
+    @field_validator("created_at")
+    @classmethod
+    def _created_at_utc(cls, v: Optional[datetime]) -> Optional[datetime]:
+        # MongoDB renvoie des datetimes naïfs : on les considère en UTC
+        if v is not None and v.tzinfo is None:
+            return v.replace(tzinfo=timezone.utc)
+        return v
+
 class TwitchGame(BaseModel):
     model_config = ConfigDict(title="Jeu Twitch")
     id: str
@@ -70,4 +98,5 @@ class TwitchSearchResult(BaseModel):
     videos: List[TwitchVideo]
     total_count: int
     last_updated: datetime
-    pagination: Dict[str, Optional[str]]  # Contient le curseur pour la pagination 
\ No newline at end of file
+    pagination: Dict[str, Optional[str]]  # Contient le curseur pour la pagination
+    partial: bool = False  # Page restée incomplète à l'échéance de la requête 
\ No newline at end of file
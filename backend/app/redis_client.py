@@ -0,0 +1,52 @@
+import logging
+from typing import Any, Optional
+
+from backend.app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RedisManager:
+    """
+    Singleton-style Redis client manager with lifecycle methods.
+
+    Redis est optionnel : si le module n'est pas installé ou si le serveur est
+    injoignable, `client` reste None et les composants retombent sur leur
+    fonctionnement local (un seul worker).
+    """
+
+    def __init__(self):
+        self.client = None
+
+    async def connect(self) -> None:
+        if not settings.REDIS_URL:
+            logger.info("Redis non configuré, coordination entre workers désactivée")
+            return
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            logger.warning("Redis non disponible, coordination entre workers désactivée")
+            return
+
+        client = redis.from_url(settings.REDIS_URL)
+        try:
+            await client.ping()
+        except Exception as e:
+            logger.warning(f"Redis injoignable ({str(e)}), coordination entre workers désactivée")
+            await client.aclose()
+            return
+        self.client = client
+        logger.info("Connected to Redis")
+
+    async def disconnect(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+            logger.info("Disconnected from Redis")
+
+    def get_client(self) -> Optional[Any]:
+        """Client Redis partagé, ou None si Redis n'est pas disponible."""
+        return self.client
+
+
+redis_manager = RedisManager()
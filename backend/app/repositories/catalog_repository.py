@@ -0,0 +1,88 @@
+from typing import Optional, List
+from ..models.records import VideoRecord
+from ..storage.base import StorageBackend, StorageError, Write, storage_key
+from datetime import datetime, timedelta
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Espaces de noms du stockage : vidéos rangées par (game_id, id), checkpoints par clé
+VIDEOS = "videos"
+CHECKPOINTS = "ingestion_checkpoints"
+
+class CatalogRepository:
+    """Local catalog of videos ingested in the background from Helix."""
+
+    def __init__(self, store: StorageBackend):
+        self.store = store
+
+    async def initialize(self):
+        """
+        Prépare les espaces de noms du catalogue.
+        """
+        await self.store.initialize(VIDEOS)
+        await self.store.initialize(CHECKPOINTS)
+
+    async def bulk_upsert_videos(self, videos: List[VideoRecord], game_name: str) -> int:
+        """
+        Upsert a batch of videos in a single storage write.
+        Returns the number of written documents.
+        """
+        if not videos:
+            return 0
+
+        now = datetime.utcnow()
+        writes = [
+            Write(
+                storage_key(video.game_id, video.id),
+                document={**video.to_document(), "game_name": game_name, "ingested_at": now}
+            )
+            for video in videos
+        ]
+        try:
+            return await self.store.write(VIDEOS, writes)
+        except StorageError as e:
+            logger.error(f"Error upserting {len(videos)} videos for {game_name}: {str(e)}")
+            return 0
+
+    async def find_videos(
+        self,
+        game_id: str,
+        limit: int,
+        max_age: int,
+        language: Optional[str] = None
+    ) -> List[VideoRecord]:
+        """
+        Get the catalog videos of a game ingested less than `max_age` seconds ago,
+        live streams first then by view count.
+        """
+        try:
+            cutoff = datetime.utcnow() - timedelta(seconds=max_age)
+            docs = [
+                doc for _, doc in await self.store.scan(VIDEOS, storage_key(game_id, ""))
+                if doc["ingested_at"] >= cutoff and (not language or doc.get("language") == language)
+            ]
+            docs.sort(key=lambda doc: (bool(doc.get("is_live")), doc.get("view_count") or 0), reverse=True)
+            return [VideoRecord.from_document(doc) for doc in docs[:limit]]
+        except StorageError as e:
+            logger.error(f"Error reading catalog for game {game_id}: {str(e)}")
+            return []
+
+    async def get_checkpoint(self, key: str) -> Optional[dict]:
+        """
+        Récupère le checkpoint d'ingestion (curseur Helix et date) pour une clé.
+        """
+        try:
+            return await self.store.get(CHECKPOINTS, key)
+        except StorageError as e:
+            logger.error(f"Error reading checkpoint {key}: {str(e)}")
+            return None
+
+    async def save_checkpoint(self, key: str, cursor: Optional[str]) -> None:
+        """
+        Enregistre le curseur Helix courant (None quand le parcours est terminé).
+        """
+        try:
+            await self.store.put(CHECKPOINTS, key, {"key": key, "cursor": cursor, "updated_at": datetime.utcnow()})
+        except StorageError as e:
+            logger.error(f"Error saving checkpoint {key}: {str(e)}")
@@ -2,24 +2,30 @@ import logging
 from datetime import datetime, timedelta
 from typing import Optional
 
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from pymongo import DESCENDING
-
 from backend.app.models.twitch import TwitchToken
+from backend.app.storage.base import StorageBackend
+
+from .write_behind import WriteBehindQueue
 
 logger = logging.getLogger(__name__)
 
+# Espace de noms des tokens, rangés par access_token
+TOKENS = "twitch_tokens"
+
 class TokenRepository:
-    def __init__(self, db: AsyncIOMotorDatabase):
-        self.db = db
-        self.collection = self.db.twitch_tokens
+    def __init__(self, store: StorageBackend, write_queue: Optional[WriteBehindQueue] = None):
+        """
+        With a running `write_queue`, `last_used` updates are deferred to it and
+        coalesced per token instead of costing a storage write each.
+        """
+        self.store = store
+        self.write_queue = write_queue
 
     async def initialize(self):
         """
-        Initialise les index nécessaires.
+        Prépare l'espace de noms des tokens.
         """
-        await self.collection.create_index([("created_at", DESCENDING)])
-        await self.collection.create_index("is_valid")
+        await self.store.initialize(TOKENS)
 
     async def save_token(self, token: TwitchToken) -> None:
         """
@@ -29,7 +35,7 @@ class TokenRepository:
             token_dict = token.model_dump()
             token_dict["created_at"] = datetime.utcnow()
             
-            await self.collection.insert_one(token_dict)
+            await self.store.put(TOKENS, token.access_token, token_dict)
             logger.info("Token sauvegardé avec succès")
             
         except Exception as e:
@@ -41,11 +47,10 @@ class TokenRepository:
         Récupère le token le plus récent et valide de la base de données.
         """
         try:
-            # Chercher le token le plus récent qui n'est pas expiré
-            token_doc = await self.collection.find_one(
-                {"expires_at": {"$gt": datetime.utcnow()}},
-                sort=[("created_at", -1)]
-            )
+            # Chercher le token le plus récent qui n'est pas expiré (quelques documents)
+            now = datetime.utcnow()
+            tokens = [doc for _, doc in await self.store.scan(TOKENS) if doc["expires_at"] > now]
+            token_doc = max(tokens, key=lambda doc: doc.get("created_at") or datetime.min, default=None)
             
             if token_doc:
                 return TwitchToken(**token_doc)
@@ -60,10 +65,11 @@ class TokenRepository:
         Met à jour la date de dernière utilisation d'un token.
         """
         try:
-            await self.collection.update_one(
-                {"access_token": token.access_token},
-                {"$set": {"last_used": datetime.utcnow()}}
-            )
+            if self.write_queue is not None and self.write_queue.is_running:
+                # Date indicative : une écriture par token et par flush suffit
+                self.write_queue.update(TOKENS, token.access_token, {"last_used": datetime.utcnow()})
+                return
+            await self.store.update(TOKENS, token.access_token, {"last_used": datetime.utcnow()})
         except Exception as e:
             logger.error(f"Erreur lors de la mise à jour du token: {str(e)}")
 
@@ -72,10 +78,7 @@ class TokenRepository:
         Marque un token comme invalide dans la base de données.
         """
         try:
-            await self.collection.update_one(
-                {"access_token": token.access_token},
-                {"$set": {"is_valid": False}}
-            )
+            await self.store.update(TOKENS, token.access_token, {"is_valid": False})
         except Exception as e:
             logger.error(f"Erreur lors de l'invalidation du token: {str(e)}")
             raise
@@ -86,11 +89,12 @@ class TokenRepository:
         """
         try:
             cutoff_date = datetime.utcnow() - timedelta(days=days)
-            result = await self.collection.delete_many({
-                "is_valid": False,
-                "created_at": {"$lt": cutoff_date}
-            })
-            logger.info(f"Nettoyage des vieux tokens: {result.deleted_count} supprimés")
+            expired = [
+                key for key, doc in await self.store.scan(TOKENS)
+                if not doc.get("is_valid", True) and doc.get("created_at") and doc["created_at"] < cutoff_date
+            ]
+            deleted = await self.store.delete(TOKENS, expired)
+            logger.info(f"Nettoyage des vieux tokens: {deleted} supprimés")
         except Exception as e:
             logger.error(f"Erreur lors du nettoyage des vieux tokens: {str(e)}")
             raise 
\ No newline at end of file
@@ -1,124 +1,435 @@
-from typing import Optional, List
-from motor.motor_asyncio import AsyncIOMotorDatabase
-from pymongo.errors import PyMongoError
-from ..models.twitch import TwitchGame, TwitchSearchResult, TwitchVideo
+from typing import Dict, Optional
+from ..cache.codec import PayloadCodec, decode_result
+from ..cache.disk import DiskCache
+from ..cache.invalidation import InvalidationBus, disk_key
+from ..cache.tinylfu import TinyLFUCache
+from ..models.records import GameRecord, SearchRecord
+from ..services.twitch.keys import normalize_query
+from ..storage.base import StorageBackend, StorageError, storage_key
+from .write_behind import WriteBehindQueue
+from dataclasses import replace
 from datetime import datetime, timedelta
+import bson
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+# Segments du cache de recherche, chacun avec son propre TTL
+LIVE_SEGMENT = "live"
+ARCHIVE_SEGMENT = "archive"
+
+# Espaces de noms du stockage
+SEARCH_CACHE = "search_cache"
+SNAPSHOTS = "search_snapshots"
+GAMES = "games"
+
+# Durée pendant laquelle un segment expiré reste lisible par get_stale_segments
+STALE_TTL = 60
+
+
+def segment_key(game_name: str, language: Optional[str], segment: str) -> tuple:
+    """Clé d'un segment du cache de recherche (jeu normalisé comme la popularité, langue, segment)."""
+    return (normalize_query(game_name), language, segment)
+
+
 class TwitchRepository:
-    def __init__(self, db: AsyncIOMotorDatabase):
-        """Initialize the repository with an injected database handle."""
-        self.db = db
-        self.games_collection = self.db["games"]
-        self.search_cache_collection = self.db["search_cache"]
-        self._ensure_indexes()
-
-    def _ensure_indexes(self):
-        """Ensure all required indexes exist."""
+    def __init__(
+        self,
+        store: StorageBackend,
+        write_queue: Optional[WriteBehindQueue] = None,
+        codec: Optional[PayloadCodec] = None,
+        disk_cache: Optional[DiskCache] = None,
+        memory_cache: Optional[TinyLFUCache] = None,
+        invalidation: Optional[InvalidationBus] = None
+    ):
+        """
+        Initialize the repository with an injected storage backend.
+        With a running `write_queue`, cache, snapshot and game writes are deferred to it.
+        With a `codec`, cached results and snapshots are stored as a compressed payload.
+        With an open `disk_cache`, cache segments are also kept in that local tier.
+        With a `memory_cache`, cache segments are served from memory first (L1).
+        With an `invalidation` bus, refreshes and invalidations reach every worker's local caches.
+        """
+        self.store = store
+        self.write_queue = write_queue
+        self.codec = codec
+        self.disk_cache = disk_cache
+        self.memory_cache = memory_cache
+        self.invalidation = invalidation
+
+    async def initialize(self):
+        """
+        Prépare les espaces de noms du stockage (expiration des documents).
+        """
         try:
-            # Index pour le cache de recherche (TTL 2 minutes)
-            self.search_cache_collection.create_index(
-                "created_at", 
-                expireAfterSeconds=120
-            )
-            # Index composé pour la recherche rapide par nom de jeu et date
-            self.search_cache_collection.create_index([
-                ("game_name", 1),
-                ("created_at", -1)
-            ])
-            # Index pour les jeux
-            self.games_collection.create_index("name")
-            logger.info("Indexes created successfully")
-        except PyMongoError as e:
-            logger.error(f"Error creating indexes: {str(e)}")
+            for namespace in (SEARCH_CACHE, SNAPSHOTS, GAMES):
+                await self.store.initialize(namespace)
+            logger.info("Storage initialized successfully")
+        except StorageError as e:
+            logger.error(f"Error initializing storage: {str(e)}")
 
     async def close(self):
-        """No-op: the MongoDB client is managed by the app lifespan."""
+        """No-op: the storage backend is managed by the app lifespan."""
         return None
 
-    async def get_cached_game_search(self, game_name: str, limit: int = None) -> Optional[TwitchSearchResult]:
+    def _encode(self, result: SearchRecord) -> dict:
+        return self.codec.encode(result) if self.codec else result.to_document()
+
+    @property
+    def _disk(self) -> Optional[DiskCache]:
+        """Niveau de cache local persistant, s'il est ouvert."""
+        if self.disk_cache is not None and self.disk_cache.is_open:
+            return self.disk_cache
+        return None
+
+    _disk_key = staticmethod(disk_key)
+
+    def _is_stale(self, key: tuple, result: SearchRecord) -> bool:
+        """True si le segment a été invalidé ou remplacé par un autre worker depuis sa lecture."""
+        return self.invalidation is not None and self.invalidation.is_stale(key, result.generation)
+
+    def _get_disk_segments(
+        self,
+        game_name: str,
+        language: Optional[str],
+        segments: Dict[str, SearchRecord]
+    ) -> None:
+        for segment in (LIVE_SEGMENT, ARCHIVE_SEGMENT):
+            if segment in segments:
+                continue
+            key = self._segment_key(game_name, language, segment)
+            entry = self._disk.get_entry(self._disk_key(key))
+            if entry is not None:
+                value, expires_at = entry
+                result = decode_result(bson.decode(value)["result"], lazy=True)
+                if not self._is_stale(key, result):
+                    segments[segment] = result
+                    self._remember(key, result, expires_at - time.time())
+
+    def _remember(self, key: tuple, result: SearchRecord, ttl: float) -> None:
+        """Place un segment dans le cache mémoire, sauf si une génération plus récente s'y trouve."""
+        if self.memory_cache is None or self._is_stale(key, result):
+            return
+        current = self.memory_cache.peek(key)
+        if current is None or current.last_updated <= result.last_updated:
+            self.memory_cache.set(key, result, ttl)
+
+    def warm_memory_cache(self, limit: int) -> int:
         """
-        Get cached search results for a specific game.
-        Returns None if the cache is stale or doesn't exist.
+        Charge dans le cache mémoire les segments les plus récemment utilisés du
+        niveau disque, pour qu'un worker redémarré serve ses clés chaudes.
+        Returns the number of segments loaded.
+        """
+        if self.memory_cache is None or not self._disk:
+            return 0
+        loaded = 0
+        now = time.time()
+        for entry_key, value, expires_at in self._disk.hot_entries(limit):
+            prefix, game_name, language, segment = entry_key.split("\t")
+            if prefix != "search_cache":
+                continue
+            result = decode_result(bson.decode(value)["result"], lazy=True)
+            self._remember((game_name, language or None, segment), result, expires_at - now)
+            loaded += 1
+        logger.info(f"Memory cache warmed with {loaded} segments")
+        return loaded
+
+    @property
+    def _queue(self) -> Optional[WriteBehindQueue]:
+        """File d'écritures différées, si elle tourne (sinon écritures directes)."""
+        if self.write_queue is not None and self.write_queue.is_running:
+            return self.write_queue
+        return None
+
+    async def get_cached_segments(
+        self,
+        game_name: str,
+        language: Optional[str] = None
+    ) -> Dict[str, SearchRecord]:
+        """
+        Get the fresh cached segments ("live", "archive") for a game and language.
+        Expired segments are simply absent from the returned mapping.
         """
         try:
-            cache_result = await self.search_cache_collection.find_one(
-                {"game_name": game_name.lower()},
-                sort=[("created_at", -1)]
-            )
-            
-            if not cache_result:
-                logger.debug(f"No cache found for game: {game_name}")
-                return None
-                
-            created_at = cache_result.get("created_at")
-            if not created_at:
-                logger.warning(f"Invalid cache entry for game {game_name}: missing created_at")
-                await self.invalidate_game_cache(game_name)
-                return None
-                
-            cache_age = datetime.utcnow() - created_at
-            if cache_age > timedelta(minutes=2):
-                logger.debug(f"Cache for game {game_name} is stale ({cache_age.total_seconds()}s old)")
-                await self.invalidate_game_cache(game_name)
-                return None
-                
-            logger.info(f"Cache hit for game {game_name} ({cache_age.total_seconds()}s old)")
-            
-            result = TwitchSearchResult(**cache_result["result"])
-            if limit and limit > 0:
-                result.videos = result.videos[:limit]
-                result.total_count = len(result.videos)
-            
-            return result
-            
-        except PyMongoError as e:
+            # Mémoire, puis disque local : le stockage n'est lu que pour les segments absents
+            segments = {}
+            if self.memory_cache is not None:
+                for segment in (LIVE_SEGMENT, ARCHIVE_SEGMENT):
+                    result = self.memory_cache.get(self._segment_key(game_name, language, segment))
+                    if result is not None:
+                        segments[segment] = result
+            if len(segments) < 2 and self._disk:
+                self._get_disk_segments(game_name, language, segments)
+            if len(segments) < 2:
+                now = datetime.utcnow()
+                keys = [
+                    self._segment_key(game_name, language, segment)
+                    for segment in (LIVE_SEGMENT, ARCHIVE_SEGMENT) if segment not in segments
+                ]
+                entries = await self.store.get_many(SEARCH_CACHE, [storage_key(*key) for key in keys])
+                for key in keys:
+                    entry = entries.get(storage_key(*key))
+                    # Les segments expirés restent stockés STALE_TTL secondes de plus
+                    if entry is None or entry["expires_at"] <= now:
+                        continue
+                    # Décodage différé : un segment non servi n'est jamais décompressé
+                    segments[entry["segment"]] = decode_result(entry["result"], lazy=True)
+                    ttl = (entry["expires_at"] - now).total_seconds()
+                    self._remember(key, segments[entry["segment"]], ttl)
+                    if self._disk and not self._is_stale(key, segments[entry["segment"]]):
+                        self._disk.set(
+                            self._disk_key(key),
+                            bson.encode({"result": entry["result"]}),
+                            ttl=ttl,
+                            version=entry.get("generation")
+                        )
+            # Segments écrits mais pas encore flushés
+            if self._queue:
+                for segment in (LIVE_SEGMENT, ARCHIVE_SEGMENT):
+                    pending = self._queue.peek(
+                        SEARCH_CACHE, storage_key(*self._segment_key(game_name, language, segment))
+                    )
+                    if pending is not None:
+                        segments[segment] = pending
+            logger.debug(f"Cached segments for game {game_name}: {sorted(segments)}")
+            return segments
+
+        except StorageError as e:
             logger.error(f"Database error retrieving cache for {game_name}: {str(e)}")
-            return None
+            return {}
         except Exception as e:
             logger.error(f"Unexpected error retrieving cache for {game_name}: {str(e)}")
-            return None
+            return {}
 
-    async def save_game_search_results(self, game_name: str, result: TwitchSearchResult) -> bool:
+    async def save_cached_segment(
+        self,
+        game_name: str,
+        segment: str,
+        result: SearchRecord,
+        ttl: int,
+        language: Optional[str] = None
+    ) -> bool:
         """
-        Save search results to cache.
-        Returns True if successful, False otherwise.
+        Save one cache segment, keyed by game name, language and segment, expiring after `ttl` seconds.
+
+        A single versioned write: the generation is the time the result was fetched
+        from Helix, and an entry with a newer generation is never overwritten (the
+        stale write is dropped). The entry stays readable by `get_stale_segments`
+        for STALE_TTL seconds after it expires.
+        Returns True if the entry was written, False otherwise.
         """
         try:
-            # Invalider l'ancien cache d'abord
-            await self.invalidate_game_cache(game_name)
-            
-            # Sauvegarder les nouveaux résultats
-            await self.search_cache_collection.insert_one({
-                "game_name": game_name.lower(),
-                "result": result.model_dump(),
-                "created_at": datetime.utcnow()
-            })
-            
-            logger.info(f"Cache updated for game: {game_name}")
+            now = datetime.utcnow()
+            generation = result.generation
+            key = self._segment_key(game_name, language, segment)
+            document = {
+                "game_name": key[0],
+                "language": language,
+                "segment": segment,
+                "generation": generation,
+                "result": self._encode(result),
+                "created_at": now,
+                "expires_at": now + timedelta(seconds=ttl)
+            }
+            self._remember(key, result, ttl)
+            if self._disk:
+                self._disk.set(
+                    self._disk_key(key), bson.encode({"result": document["result"]}), ttl, version=generation
+                )
+            if self._queue:
+                self._queue.put(
+                    SEARCH_CACHE, storage_key(*key), document,
+                    ttl=ttl + STALE_TTL, value=result, version=generation
+                )
+            elif not await self.store.put(
+                SEARCH_CACHE, storage_key(*key), document, ttl=ttl + STALE_TTL, version=generation
+            ):
+                logger.debug(f"Stale cache segment '{segment}' for game {game_name} ignored")
+                return False
+            # Les autres workers retirent leur copie plus ancienne de ce segment
+            if self.invalidation is not None:
+                await self.invalidation.segment_refreshed(key, generation)
+            logger.info(f"Cache segment '{segment}' updated for game: {game_name} (ttl {ttl}s)")
             return True
-            
-        except PyMongoError as e:
+
+        except StorageError as e:
             logger.error(f"Database error saving cache for {game_name}: {str(e)}")
             return False
         except Exception as e:
             logger.error(f"Unexpected error saving cache for {game_name}: {str(e)}")
             return False
 
+    _segment_key = staticmethod(segment_key)
+
+    async def _get_stored_segments(self, game_name: str, language: Optional[str]) -> Dict[str, dict]:
+        """Documents stockés des segments d'un jeu et d'une langue, expirés compris."""
+        keys = {
+            segment: storage_key(*self._segment_key(game_name, language, segment))
+            for segment in (LIVE_SEGMENT, ARCHIVE_SEGMENT)
+        }
+        entries = await self.store.get_many(SEARCH_CACHE, keys.values())
+        return {segment: entries[key] for segment, key in keys.items() if key in entries}
+
+    async def get_stale_segments(
+        self,
+        game_name: str,
+        language: Optional[str] = None
+    ) -> Dict[str, SearchRecord]:
+        """
+        Get the cached segments for a game and language, expired ones included
+        (for STALE_TTL seconds). Used to serve stale data while another worker
+        refreshes the cache.
+        """
+        try:
+            entries = await self._get_stored_segments(game_name, language)
+            return {segment: decode_result(entry["result"], lazy=True) for segment, entry in entries.items()}
+        except StorageError as e:
+            logger.error(f"Database error retrieving stale cache for {game_name}: {str(e)}")
+            return {}
+
+    async def get_segment_expirations(
+        self,
+        game_name: str,
+        language: Optional[str] = None
+    ) -> Dict[str, datetime]:
+        """
+        Get the expiry date of each cached segment for a game and language.
+        Missing segments are absent from the returned mapping.
+        """
+        try:
+            entries = await self._get_stored_segments(game_name, language)
+            return {segment: entry["expires_at"] for segment, entry in entries.items()}
+        except StorageError as e:
+            logger.error(f"Database error retrieving cache expirations for {game_name}: {str(e)}")
+            return {}
+
+    async def attach_snapshot(
+        self,
+        game_name: str,
+        segment: str,
+        snapshot_id: str,
+        language: Optional[str] = None
+    ) -> bool:
+        """
+        Record on a cache segment the snapshot built from it, so cache hits reuse it.
+        Returns True if successful, False otherwise.
+        """
+        try:
+            key = self._segment_key(game_name, language, segment)
+            fields = {"result.snapshot_id": snapshot_id}
+            if self.memory_cache is not None:
+                cached = self.memory_cache.peek(key)
+                if cached is not None:
+                    self.memory_cache.update(key, replace(cached, snapshot_id=snapshot_id))
+            if self._disk:
+                value = self._disk.get(self._disk_key(key))
+                if value is not None:
+                    entry = bson.decode(value)
+                    entry["result"]["snapshot_id"] = snapshot_id
+                    self._disk.replace_value(self._disk_key(key), bson.encode(entry))
+            if self._queue:
+                pending = self._queue.peek(SEARCH_CACHE, storage_key(*key))
+                self._queue.update(
+                    SEARCH_CACHE, storage_key(*key), fields,
+                    value=replace(pending, snapshot_id=snapshot_id) if pending else None
+                )
+            else:
+                await self.store.update(SEARCH_CACHE, storage_key(*key), fields)
+            return True
+        except StorageError as e:
+            logger.error(f"Database error attaching snapshot for {game_name}: {str(e)}")
+            return False
+
+    async def save_snapshot(self, result: SearchRecord, ttl: int) -> bool:
+        """
+        Save a pagination snapshot of a full (unfiltered) search result.
+        Its size is its version: only a longer snapshot can replace it.
+        Returns True if successful, False otherwise.
+        """
+        try:
+            now = datetime.utcnow()
+            size = len(result.videos)
+            document = {
+                "snapshot_id": result.snapshot_id,
+                "size": size,
+                "result": self._encode(result),
+                "created_at": now,
+                "expires_at": now + timedelta(seconds=ttl)
+            }
+            if self._queue:
+                self._queue.put(SNAPSHOTS, result.snapshot_id, document, ttl=ttl, value=result, version=size)
+            else:
+                await self.store.put(SNAPSHOTS, result.snapshot_id, document, ttl=ttl, version=size)
+            logger.debug(f"Snapshot {result.snapshot_id} saved for game: {result.game_name}")
+            return True
+        except StorageError as e:
+            logger.error(f"Database error saving snapshot for {result.game_name}: {str(e)}")
+            return False
+
+    async def update_snapshot(self, result: SearchRecord) -> bool:
+        """
+        Replace the content of an existing snapshot (after it was extended).
+
+        Snapshots only grow: the update only applies over a smaller snapshot, so a
+        concurrent, shorter extension cannot truncate it. Its expiry is left unchanged.
+        Returns True if successful, False otherwise.
+        """
+        try:
+            size = len(result.videos)
+            fields = {"result": self._encode(result), "size": size}
+            if self._queue:
+                self._queue.update(SNAPSHOTS, result.snapshot_id, fields, value=result, version=size)
+            else:
+                await self.store.update(SNAPSHOTS, result.snapshot_id, fields, version=size)
+            return True
+        except StorageError as e:
+            logger.error(f"Database error updating snapshot {result.snapshot_id}: {str(e)}")
+            return False
+
+    async def get_snapshot(self, snapshot_id: str) -> Optional[SearchRecord]:
+        """
+        Get a pagination snapshot by id.
+        Returns None if it expired or doesn't exist.
+        """
+        try:
+            if self._queue:
+                pending = self._queue.peek(SNAPSHOTS, snapshot_id)
+                if pending is not None:
+                    return pending
+            snapshot = await self.store.get(SNAPSHOTS, snapshot_id)
+            if not snapshot:
+                return None
+            return decode_result(snapshot["result"])
+        except StorageError as e:
+            logger.error(f"Database error retrieving snapshot {snapshot_id}: {str(e)}")
+            return None
+
     async def invalidate_game_cache(self, game_name: str) -> bool:
         """
         Invalider explicitement le cache pour un jeu donné.
         Returns True if successful, False otherwise.
         """
         try:
-            result = await self.search_cache_collection.delete_many({
-                "game_name": game_name.lower()
-            })
-            logger.info(f"Invalidated {result.deleted_count} cache entries for game: {game_name}")
+            game_key = normalize_query(game_name)
+            # Caches locaux : via le bus (tous les workers), sinon ceux de ce worker
+            if self.invalidation is not None:
+                await self.invalidation.invalidate_game(game_name)
+            else:
+                if self.memory_cache is not None:
+                    for key in self.memory_cache.keys():
+                        if key[0] == game_key:
+                            self.memory_cache.delete(key)
+                if self._disk:
+                    self._disk.delete_prefix(f"search_cache\t{game_key}\t")
+            # Segments pas encore flushés : ils ne doivent ni être servis ni être réécrits
+            prefix = storage_key(game_key, "")
+            if self.write_queue is not None:
+                await self.write_queue.discard(SEARCH_CACHE, lambda key: key.startswith(prefix))
+            deleted = await self.store.delete_prefix(SEARCH_CACHE, prefix)
+            logger.info(f"Invalidated {deleted} cache entries for game: {game_name}")
             return True
-        except PyMongoError as e:
+        except StorageError as e:
             logger.error(f"Error invalidating cache for {game_name}: {str(e)}")
             return False
 
@@ -128,26 +439,51 @@ class TwitchRepository:
         Returns True if successful, False otherwise.
         """
         try:
-            result = await self.search_cache_collection.delete_many({})
-            logger.info(f"Cleared {result.deleted_count} cache entries")
+            if self.invalidation is not None:
+                await self.invalidation.invalidate_all()
+            else:
+                if self.memory_cache is not None:
+                    self.memory_cache.clear()
+                if self._disk:
+                    self._disk.delete_prefix("search_cache\t")
+            if self.write_queue is not None:
+                await self.write_queue.discard(SEARCH_CACHE, lambda key: True)
+            deleted = await self.store.delete_prefix(SEARCH_CACHE, "")
+            logger.info(f"Cleared {deleted} cache entries")
             return True
-        except PyMongoError as e:
+        except StorageError as e:
             logger.error(f"Error clearing cache: {str(e)}")
             return False
 
-    async def save_game(self, game: TwitchGame) -> bool:
+    async def save_game(self, game: GameRecord) -> bool:
         """
         Save game information to database.
         Returns True if successful, False otherwise.
         """
         try:
-            result = await self.games_collection.update_one(
-                {"id": game.id},
-                {"$set": game.model_dump()},
-                upsert=True
-            )
+            # Clé normalisée comme le cache ("  The  Witcher " = "the witcher")
+            key = normalize_query(game.name)
+            if self._queue:
+                self._queue.update(GAMES, key, game.to_document(), upsert=True)
+            else:
+                await self.store.update(GAMES, key, game.to_document(), upsert=True)
             logger.info(f"Game saved/updated: {game.name}")
             return True
-        except PyMongoError as e:
+        except StorageError as e:
             logger.error(f"Error saving game {game.name}: {str(e)}")
             return False 
+
+
+    async def find_game_by_name(self, game_name: str) -> Optional[GameRecord]:
+        """
+        Retrieve a previously saved game by its (case-insensitive) name.
+        Returns None if the game is unknown.
+        """
+        try:
+            game_doc = await self.store.get(GAMES, normalize_query(game_name))
+            if not game_doc:
+                return None
+            return GameRecord.from_document(game_doc)
+        except StorageError as e:
+            logger.error(f"Error finding game {game_name}: {str(e)}")
+            return None
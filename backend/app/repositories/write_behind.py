@@ -0,0 +1,255 @@
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.app.metrics import metrics
+from backend.app.storage.base import StorageBackend, StorageError, Write, set_path
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingWrite:
+    __slots__ = ("document", "fields", "ttl", "upsert", "value", "attempts", "version", "discarded")
+
+    def __init__(self, upsert: bool):
+        self.document: Optional[Dict[str, Any]] = None  # Remplacement complet
+        self.fields: Dict[str, Any] = {}  # Fusion partielle (chemins pointés)
+        self.ttl: Optional[float] = None
+        self.upsert = upsert
+        self.value: Any = None
+        self.attempts = 0
+        self.version: Optional[int] = None
+        self.discarded = False  # Invalidée pendant son écriture : jamais remise en file
+
+    def to_write(self, key: str) -> Write:
+        if self.document is not None:
+            return Write(key, document=self.document, ttl=self.ttl, version=self.version)
+        return Write(key, fields=self.fields, upsert=self.upsert, version=self.version)
+
+
+class WriteBehindQueue:
+    """
+    File d'écritures différées, hors du chemin des requêtes.
+
+    Les écritures sont regroupées par (espace de noms, clé) : un remplacement
+    complet annule les écritures précédentes de la même clé, une fusion de champs
+    est fusionnée dans l'écriture en attente. Une écriture versionnée plus ancienne
+    que celle en attente est ignorée. Il reste donc au plus une écriture par clé,
+    ce qui permet un seul lot (`StorageBackend.write`) par espace de noms toutes les
+    `flush_interval` secondes (ou dès `max_pending` clés en attente). `stop()` vide
+    la file.
+
+    `peek()` rend la valeur associée à la dernière écriture en attente d'une clé,
+    y compris pendant l'écriture de son lot et jusqu'à son acquittement, pour que les
+    lectures voient leurs propres écritures.
+    `discard()` retire les écritures en attente d'une invalidation, pour qu'un
+    flush ultérieur ne réécrive pas ce qui vient d'être supprimé.
+    """
+
+    # Tentatives avant d'abandonner une écriture en échec
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, flush_interval: float = 0.5, max_pending: int = 1000):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.store: Optional[StorageBackend] = None
+        self._pending: Dict[Tuple[str, str], _PendingWrite] = {}
+        # Lot en cours d'écriture, encore lisible tant que le backend n'a pas répondu
+        self._inflight: Dict[Tuple[str, str], _PendingWrite] = {}
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.queued = 0
+        self.coalesced = 0
+        self.flushed = 0
+        self.failed = 0
+        self.stale = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None
+
+    async def start(self, store: StorageBackend) -> None:
+        """Démarre la boucle de flush sur le backend `store`."""
+        if self._task:
+            return
+        self.store = store
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Write-behind queue started")
+
+    async def stop(self) -> None:
+        """Arrête la boucle et écrit tout ce qui est encore en attente."""
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        while self._pending:
+            await self.flush()
+        logger.info("Write-behind queue drained")
+
+    def put(
+        self,
+        namespace: str,
+        key: str,
+        document: Dict[str, Any],
+        ttl: Optional[float] = None,
+        value: Any = None,
+        version: Optional[int] = None
+    ) -> None:
+        """Met en attente le remplacement complet du document `key`."""
+        entry = self._entry(namespace, key, True, version)
+        if entry is None:
+            return
+        entry.document = document
+        entry.fields = {}
+        entry.ttl = ttl
+        entry.value = value
+
+    def update(
+        self,
+        namespace: str,
+        key: str,
+        fields: Dict[str, Any],
+        value: Any = None,
+        upsert: bool = False,
+        version: Optional[int] = None
+    ) -> None:
+        """Met en attente la fusion de `fields` dans le document `key`."""
+        entry = self._entry(namespace, key, upsert, version)
+        if entry is None:
+            return
+        if entry.document is not None:
+            for path, field_value in fields.items():
+                set_path(entry.document, path, field_value)
+        else:
+            entry.fields.update(fields)
+            entry.upsert = entry.upsert or upsert
+        if value is not None:
+            entry.value = value
+
+    def peek(self, namespace: str, key: str) -> Any:
+        """Valeur de la dernière écriture en attente (ou en cours) pour `key`, ou None."""
+        entry = self._pending.get((namespace, key)) or self._inflight.get((namespace, key))
+        return entry.value if entry else None
+
+    async def discard(self, namespace: str, matches: Callable[[str], bool]) -> int:
+        """
+        Retire les écritures en attente de `namespace` dont la clé vérifie `matches`.
+
+        Si l'une d'elles est en cours d'écriture, attend la fin du flush : une
+        suppression faite ensuite passe forcément après elle.
+        Returns the number of writes dropped.
+        """
+        dropped = [item for item in self._pending if item[0] == namespace and matches(item[1])]
+        for item in dropped:
+            del self._pending[item]
+        writing = [item for item in self._inflight if item[0] == namespace and matches(item[1])]
+        for item in writing:
+            self._inflight.pop(item).discarded = True
+        if writing:
+            async with self._flush_lock:
+                pass
+        return len(dropped) + len(writing)
+
+    def _entry(
+        self,
+        namespace: str,
+        key: str,
+        upsert: bool,
+        version: Optional[int]
+    ) -> Optional[_PendingWrite]:
+        """Entrée en attente pour `key`. Returns None si `version` est périmée."""
+        self.queued += 1
+        entry = self._pending.get((namespace, key))
+        if entry is None:
+            entry = self._pending[(namespace, key)] = _PendingWrite(upsert)
+            if len(self._pending) >= self.max_pending:
+                self._wakeup.set()
+        elif version is not None and entry.version is not None and version < entry.version:
+            self.stale += 1
+            return None
+        else:
+            self.coalesced += 1
+        if version is not None:
+            entry.version = version
+        return entry
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Écrit les opérations en attente, un lot par espace de noms.
+        Returns the number of operations written.
+        """
+        async with self._flush_lock:
+            return await self._flush()
+
+    async def _flush(self) -> int:
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, {}
+        self._inflight = dict(batch)
+        try:
+            return await self._write(batch)
+        finally:
+            self._inflight = {}
+
+    async def _write(self, batch: Dict[Tuple[str, str], _PendingWrite]) -> int:
+
+        by_namespace: Dict[str, List[Tuple[str, _PendingWrite]]] = {}
+        for (namespace, key), entry in batch.items():
+            by_namespace.setdefault(namespace, []).append((key, entry))
+
+        written = 0
+        for namespace, entries in by_namespace.items():
+            try:
+                applied = await self.store.write(namespace, [entry.to_write(key) for key, entry in entries])
+                # Écritures ignorées : une version plus récente est déjà stockée
+                self.stale += len(entries) - applied
+                written += applied
+            except StorageError as e:
+                logger.error(f"[WriteBehind] write on {namespace} failed: {str(e)}")
+                self._requeue(namespace, entries)
+        self.flushed += written
+        return written
+
+    def _requeue(self, namespace: str, entries: List[Tuple[str, _PendingWrite]]) -> None:
+        """Remet en file les écritures en échec, sauf si une plus récente les remplace."""
+        for key, entry in entries:
+            if entry.discarded:
+                continue
+            entry.attempts += 1
+            if entry.attempts >= self.MAX_ATTEMPTS:
+                self.failed += 1
+                continue
+            self._pending.setdefault((namespace, key), entry)
+
+    def stats(self) -> dict:
+        """Compteurs de la file, pour l'endpoint de métriques."""
+        return {
+            "pending": len(self._pending),
+            "queued": self.queued,
+            "coalesced": self.coalesced,
+            "flushed": self.flushed,
+            "failed": self.failed,
+            "stale": self.stale,
+        }
+
+
+# Instance globale
+write_behind = WriteBehindQueue()
+
+metrics.register("write_behind", write_behind.stats)
@@ -2,4 +2,5 @@
 Package contenant les routers de l'application.
 - auth.py : Routes d'authentification Twitch
 - search.py : Routes de recherche de vidéos
+- metrics.py : Métriques internes (cache, TTL)
 """ 
\ No newline at end of file
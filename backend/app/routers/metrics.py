@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+
+from ..metrics import metrics
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+
+@router.get("/")
+async def get_metrics():
+    """Métriques internes du processus (cache, TTL, ...)."""
+    return metrics.collect()
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, HTTPException, Query, Depends
-from typing import Optional
-from ..models.twitch import TwitchSearchResult
+from typing import Optional, Literal
+from ..config import settings
+from ..models.twitch import TwitchSearchResult, SearchFilters
+from ..services.twitch.deadline import deadline
 from ..services.twitch_service import TwitchService
 from ..dependencies import get_twitch_service
 import logging
@@ -13,29 +15,47 @@ async def search_videos(
     game: str = Query(..., description="Nom du jeu à rechercher"),
     limit: int = Query(100, ge=1, le=100, description="Nombre de résultats à retourner (max 100)"),
     use_cache: bool = Query(True, description="Utiliser le cache"),
-    after: Optional[str] = Query(None, description="Curseur pour la pagination"),
+    after: Optional[str] = Query(None, description="Curseur de la page suivante (champ pagination.cursor)"),
+    language: Optional[str] = Query(None, description="Langue des vidéos (ex: fr, en), filtrée par Twitch"),
+    date: Literal["all", "today", "this_week", "this_month"] = Query("all", description="Fenêtre de date de publication"),
+    duration: Literal["all", "short", "medium", "long"] = Query("all", description="Tranche de durée"),
+    views: Literal["all", "less_100", "100_1000", "more_1000"] = Query("all", description="Tranche de nombre de vues"),
+    sort: Optional[Literal["date", "views", "duration"]] = Query(None, description="Tri des résultats (décroissant)"),
     twitch_service: TwitchService = Depends(get_twitch_service)
 ):
     """
     Recherche des vidéos pour un jeu spécifique.
     
     - Limite de 100 résultats par requête
-    - Support de la pagination par curseur
+    - Pagination par curseur au-delà de 100 résultats (page suivante préchargée)
     - Cache configurable
-    - Tri par popularité (streams en direct en premier)
+    - Tri par popularité (streams en direct en premier) ou selon `sort`
+    - Filtres langue/date/durée/vues appliqués côté serveur
+    - Appels Twitch bornés par SEARCH_DEADLINE : une page incomplète à l'échéance
+      (archives non lues, jeu non résolu) est renvoyée avec `partial: true`
     """
     try:
         logger.info(f"Recherche de vidéos pour {game} (limit: {limit}, cache: {use_cache}, cursor: {after})")
-        
-        result = await twitch_service.search_videos_by_game(
-            game_name=game,
-            limit=limit,
-            cursor=after,
-            use_cache=use_cache
+
+        filters = SearchFilters(
+            language=None if language in (None, "", "all") else language,
+            date=date,
+            duration=duration,
+            views=views,
+            sort=sort
         )
         
+        with deadline(settings.SEARCH_DEADLINE):
+            result = await twitch_service.search_videos_by_game(
+                game_name=game,
+                limit=limit,
+                cursor=after,
+                use_cache=use_cache,
+                filters=filters
+            )
+        
         logger.info(f"Trouvé {result.total_count} vidéos pour {game}")
-        return result
+        return result.to_api()
         
     except HTTPException as he:
         logger.error(f"Erreur HTTP pendant la recherche: {str(he)}")
@@ -45,6 +65,4 @@ async def search_videos(
         raise HTTPException(
             status_code=500,
             detail=f"Erreur lors de la recherche de vidéos: {str(e)}"
-        )
-    finally:
-        await twitch_service.close() 
\ No newline at end of file
+        ) 
\ No newline at end of file
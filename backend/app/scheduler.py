@@ -1,60 +1,181 @@
 import asyncio
 import logging
-from datetime import datetime, timedelta
-from fastapi_cache import FastAPICache
+import random
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional
+
+from .locks import WORKER_ID, LocalLease
+from .metrics import metrics
+from .services.twitch.concurrency import background_priority
 
 logger = logging.getLogger(__name__)
 
+
+class Job:
+    """Job périodique et ses statistiques d'exécution."""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[object]],
+        interval: float,
+        jitter: float = 0.1,
+        leader_only: bool = True
+    ):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.leader_only = leader_only
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.skipped_overlap = 0
+        self.skipped_not_leader = 0
+        self.last_duration = 0.0
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+        self.last_run_at: Optional[datetime] = None
+
+    def next_delay(self) -> float:
+        """Intervalle avec une gigue aléatoire de ±`jitter` (fraction de l'intervalle)."""
+        return self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def stats(self) -> dict:
+        return {
+            "interval": self.interval,
+            "leader_only": self.leader_only,
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped_overlap": self.skipped_overlap,
+            "skipped_not_leader": self.skipped_not_leader,
+            "last_duration_ms": round(self.last_duration * 1000, 1),
+            "avg_duration_ms": round(self.total_duration / self.runs * 1000, 1) if self.runs else 0.0,
+            "max_duration_ms": round(self.max_duration * 1000, 1),
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+        }
+
+
 class CacheScheduler:
-    def __init__(self, cache_ttl: int = 3600):
-        self.cache_ttl = cache_ttl
+    """
+    Planificateur de jobs périodiques nommés.
+
+    Chaque job a son intervalle et sa gigue. Une exécution encore en cours au
+    tick suivant fait sauter ce tick (pas de chevauchement). Les jobs
+    `leader_only` ne tournent que sur l'instance qui détient leur lease : avec
+    plusieurs workers ou réplicas, un seul exécute chaque job.
+    """
+
+    def __init__(self, lease=None, owner: str = WORKER_ID):
+        self.lease = lease or LocalLease()
+        self.owner = owner
+        self.jobs: Dict[str, Job] = {}
         self.is_running = False
-        self._task = None
-        
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._runs: Dict[str, asyncio.Task] = {}
+        metrics.register("scheduler", self.stats)
+
+    def add_job(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[object]],
+        interval: float,
+        jitter: float = 0.1,
+        leader_only: bool = True
+    ) -> Job:
+        """Enregistre un job ; il démarre avec le scheduler."""
+        job = Job(name, func, interval, jitter, leader_only)
+        self.jobs[name] = job
+        if self.is_running:
+            self._tasks[name] = asyncio.create_task(self._loop(job))
+        return job
+
     async def start(self):
         """Démarre le scheduler"""
         if self.is_running:
             return
-            
+
         self.is_running = True
-        self._task = asyncio.create_task(self._run())
-        logger.info("Scheduler démarré")
-        
+        for job in self.jobs.values():
+            self._tasks[job.name] = asyncio.create_task(self._loop(job))
+        logger.info(f"Scheduler démarré ({', '.join(self.jobs) or 'aucun job'})")
+
     async def stop(self):
         """Arrête le scheduler"""
         if not self.is_running:
             return
-            
+
         self.is_running = False
-        if self._task:
-            self._task.cancel()
-            try:
-                await self._task
-            except asyncio.CancelledError:
-                pass
+        tasks = list(self._tasks.values()) + list(self._runs.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._runs.clear()
+        for job in self.jobs.values():
+            if job.leader_only:
+                await self.lease.release(self._lease_name(job), self.owner)
         logger.info("Scheduler arrêté")
-        
-    async def _run(self):
-        """Boucle principale du scheduler"""
+
+    async def _loop(self, job: Job):
+        """Boucle de planification d'un job"""
+        # Premier tick peu après le démarrage, étalé entre instances par la gigue
+        delay = random.uniform(0, job.interval * job.jitter)
         while self.is_running:
             try:
-                # Nettoyage du cache
-                # await FastAPICache.clear()
-                # logger.info(f"Cache nettoyé à {datetime.now()}")
-                # FastAPICache is initialized but not actively used for route caching or data storage.
-                # The primary caching (Twitch game search) is handled by TwitchRepository using MongoDB's TTL.
-                # Therefore, clearing FastAPICache here is currently a no-op or clears an empty cache.
-                # Kept the scheduler structure for potential future tasks.
-                logger.debug(f"CacheScheduler running at {datetime.now()}, FastAPICache.clear() is commented out.")
-                
-                # Attendre jusqu'au prochain cycle
-                await asyncio.sleep(self.cache_ttl)
+                await asyncio.sleep(delay)
+                delay = job.next_delay()
+                previous = self._runs.get(job.name)
+                if previous and not previous.done():
+                    job.skipped_overlap += 1
+                    logger.warning(f"[Scheduler] {job.name} still running, tick skipped")
+                    continue
+                # L'exécution est détachée : un job lent ne décale pas les ticks suivants
+                self._runs[job.name] = asyncio.create_task(self.run_job(job))
             except asyncio.CancelledError:
                 break
-            except Exception as e:
-                logger.error(f"Erreur dans le scheduler: {e}")
-                await asyncio.sleep(60)  # Attendre 1 minute en cas d'erreur
-            
-    # async def _update_cache(self):
-    #     """Exemple de tâche périodique pour mettre à jour le cache"""
-    #     pass
\ No newline at end of file
+
+    async def run_job(self, job: Job) -> bool:
+        """
+        Exécute une fois `job` si cette instance en est le leader.
+        Returns True si le job a été exécuté.
+        """
+        started = None
+        try:
+            if job.leader_only:
+                # Le lease couvre deux intervalles : le leader le prolonge à chaque tick,
+                # une autre instance ne le reprend que si le leader disparaît.
+                # Un lease indisponible (Redis, stockage) compte comme un échec du job
+                acquired = await self.lease.acquire(self._lease_name(job), self.owner, 2 * job.interval)
+                if not acquired:
+                    job.skipped_not_leader += 1
+                    return False
+
+            job.running = True
+            job.last_run_at = datetime.utcnow()
+            started = time.perf_counter()
+            # Les appels Helix des jobs passent après ceux des recherches
+            with background_priority():
+                await job.func()
+            return True
+        except Exception as e:
+            job.failures += 1
+            logger.error(f"Erreur dans le job {job.name}: {e}")
+            return started is not None
+        finally:
+            if started is not None:
+                job.last_duration = time.perf_counter() - started
+                job.total_duration += job.last_duration
+                job.max_duration = max(job.max_duration, job.last_duration)
+                job.runs += 1
+                job.running = False
+
+    @staticmethod
+    def _lease_name(job: Job) -> str:
+        return f"scheduler:{job.name}"
+
+    def stats(self) -> dict:
+        """Statistiques par job, pour l'endpoint de métriques."""
+        return {"owner": self.owner, "jobs": {name: job.stats() for name, job in self.jobs.items()}}
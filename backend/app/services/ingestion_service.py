@@ -0,0 +1,118 @@
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import httpx
+
+from backend.app.config import settings
+from backend.app.config.twitch import get_twitch_settings
+from backend.app.models.records import GameRecord
+from backend.app.repositories.catalog_repository import CatalogRepository
+from backend.app.services.twitch.mapping import decode_game_page, decode_video_page
+from backend.app.services.twitch.rate_budget import RateBudget
+from backend.app.services.twitch_service import TwitchService
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionService:
+    """
+    Ingestion périodique des top jeux Twitch dans le catalogue local.
+
+    Chaque passe lit /games/top puis pagine /streams et /videos pour chaque jeu,
+    en consommant au plus `INGESTION_BUDGET_SHARE` du rate limit Helix. Les
+    curseurs sont sauvegardés après chaque page pour reprendre après un redémarrage.
+    """
+
+    def __init__(
+        self,
+        twitch_service: TwitchService,
+        catalog_repository: CatalogRepository,
+        budget: Optional[RateBudget] = None
+    ):
+        self.twitch_service = twitch_service
+        self.catalog_repository = catalog_repository
+        if budget is None:
+            twitch_settings = get_twitch_settings()
+            budget = RateBudget(
+                calls=twitch_settings.rate_limit_calls * settings.INGESTION_BUDGET_SHARE,
+                period=twitch_settings.rate_limit_period
+            )
+        self.budget = budget
+        self.top_games = settings.INGESTION_TOP_GAMES
+        self.max_pages = settings.INGESTION_MAX_PAGES
+        self.interval = settings.INGESTION_INTERVAL
+
+    async def close(self):
+        """Close all service resources."""
+        await self.twitch_service.close()
+
+    async def run_once(self) -> int:
+        """
+        Exécute une passe d'ingestion complète.
+        Returns the number of catalog documents upserted.
+        """
+        headers = await self.twitch_service._get_headers()
+        games = await self._fetch_top_games(headers)
+        logger.info(f"[Ingestion] {len(games)} top games to ingest")
+
+        total = 0
+        for game in games:
+            await self.twitch_service.twitch_repository.save_game(game)
+            for kind in ("streams", "videos"):
+                try:
+                    total += await self._ingest(game, kind, headers)
+                except httpx.HTTPError as e:
+                    logger.error(f"[Ingestion] Error ingesting {kind} for {game.name}: {str(e)}")
+
+        logger.info(f"[Ingestion] Pass finished, {total} documents upserted")
+        return total
+
+    async def _get(self, path: str, params: dict, headers: dict) -> bytes:
+        """Appel Helix GET décompté du budget d'ingestion (et du budget global) ; renvoie le corps brut."""
+        await self.budget.acquire()
+        response = await self.twitch_service.helix.get(path, params=params, headers=headers)
+        response.raise_for_status()
+        return response.content
+
+    async def _fetch_top_games(self, headers: dict) -> List[GameRecord]:
+        """Récupère les `top_games` jeux les plus regardés."""
+        try:
+            content = await self._get("/games/top", {"first": min(100, self.top_games)}, headers)
+        except httpx.HTTPError as e:
+            logger.error(f"[Ingestion] Error fetching top games: {str(e)}")
+            return []
+        return decode_game_page(content)
+
+    async def _ingest(self, game: GameRecord, kind: str, headers: dict) -> int:
+        """Pagine /streams ou /videos pour un jeu en reprenant au dernier checkpoint."""
+        key = f"{kind}:{game.id}"
+        checkpoint = await self.catalog_repository.get_checkpoint(key) or {}
+        cursor = checkpoint.get("cursor")
+
+        # Parcours terminé lors de la passe précédente : rien à reprendre
+        updated_at = checkpoint.get("updated_at")
+        if not cursor and updated_at and datetime.utcnow() - updated_at < timedelta(seconds=self.interval):
+            logger.debug(f"[Ingestion] {key} already ingested at {updated_at}, skipping")
+            return 0
+
+        upserted = 0
+        for _ in range(self.max_pages):
+            params = {"game_id": game.id, "first": 100}
+            if kind == "videos":
+                params["type"] = "archive"
+            if cursor:
+                params["after"] = cursor
+
+            content = await self._get(f"/{kind}", params, headers)
+            videos, cursor = decode_video_page(content, game.id)
+            upserted += await self.catalog_repository.bulk_upsert_videos(videos, game.name)
+
+            if not cursor or not videos:
+                # Parcours terminé : la prochaine passe repart du début de la liste
+                await self.catalog_repository.save_checkpoint(key, None)
+                break
+            # Sinon (max_pages atteint compris) la prochaine passe reprend ici
+            await self.catalog_repository.save_checkpoint(key, cursor)
+
+        return upserted
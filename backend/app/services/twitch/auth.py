@@ -5,9 +5,11 @@ import httpx
 from fastapi import HTTPException
 from cachetools import TTLCache
 
+from backend.app.cache.singleflight import SingleFlight, refresh_flight
 from backend.app.config.twitch import get_twitch_settings
 from backend.app.models.twitch import TwitchToken
 from backend.app.repositories.token_repository import TokenRepository
+from backend.app.services.twitch.token_store import SharedTokenStore
 
 logger = logging.getLogger(__name__)
 
@@ -22,39 +24,89 @@ class TwitchError(HTTPException):
         )
 
 class TwitchAuthService:
-    def __init__(self, token_repository: TokenRepository):
+    def __init__(
+        self,
+        token_repository: TokenRepository,
+        token_store: Optional[SharedTokenStore] = None,
+        flight: Optional[SingleFlight] = None
+    ):
         self.settings = get_twitch_settings()
         self.token_repository = token_repository
         self.client = httpx.AsyncClient()
         # Cache local pour stocker le token pendant 1 heure
         self._token_cache = TTLCache(maxsize=1, ttl=3600)
+        # Token partagé par la flotte ; son renouvellement est fait par un seul worker
+        self.token_store = token_store or SharedTokenStore(self.settings.client_id)
+        self._flight = flight or refresh_flight
 
     async def get_valid_token(self) -> TwitchToken:
         """
         Récupère un token valide, en le renouvelant si nécessaire.
-        Utilise un cache local TTL de 1 heure.
+        Utilise un cache local TTL de 1 heure, puis le token partagé dans Redis,
+        revalidé auprès de Twitch (/validate) à chaque expiration du cache local :
+        chaque worker vérifie donc le token au moins une fois par heure.
         """
         try:
             # Vérifier le cache local d'abord
             if "current_token" in self._token_cache:
                 return self._token_cache["current_token"]
 
-            current_token = await self.token_repository.get_current_token()
-            
-            if current_token and await self._is_token_valid(current_token):
-                logger.debug("Token existant valide trouvé")
-                self._token_cache["current_token"] = current_token
-                return current_token
-                
-            logger.info("Génération d'un nouveau token")
-            new_token = await self._generate_new_token()
-            self._token_cache["current_token"] = new_token
-            return new_token
+            token = await self._get_shared_token()
+            if token is not None and not await self._is_token_valid(token):
+                # Refusé par Twitch : `_is_token_valid` l'a retiré de Redis
+                token = None
+            if token is None:
+                # Un seul worker de la flotte renouvelle le token, les autres relisent Redis
+                token = await self._flight.run(
+                    self.token_store.key, self._refresh_token, self._get_shared_token
+                )
+            self._token_cache["current_token"] = token
+            return token
             
         except Exception as e:
             logger.error(f"Erreur lors de la récupération du token: {str(e)}")
             raise TwitchError(500, "Erreur d'authentification Twitch")
 
+    async def _get_shared_token(self) -> Optional[TwitchToken]:
+        """Token publié dans Redis, s'il n'expire pas bientôt."""
+        token = await self.token_store.get()
+        if token is None or not token.is_valid or self._expires_soon(token):
+            return None
+        return token
+
+    async def _refresh_token(self) -> TwitchToken:
+        """
+        Renouvelle le token de la flotte (worker détenteur du lease, ou seul worker sans Redis).
+        Reprend le dernier token valide de MongoDB avant d'en générer un nouveau.
+        """
+        token = await self._get_shared_token()
+        if token is not None:
+            return token
+
+        current_token = await self.token_repository.get_current_token()
+        if current_token and await self._is_token_valid(current_token):
+            logger.debug("Token existant valide trouvé")
+            token = current_token
+        else:
+            logger.info("Génération d'un nouveau token")
+            token = await self._generate_new_token()
+        await self.token_store.publish(token)
+        return token
+
+    async def invalidate_token(self, access_token: str) -> None:
+        """
+        Oublie un token refusé par Twitch (401 Helix, échec de /validate) : cache
+        local et token partagé, pour que le prochain appel en obtienne un autre.
+        """
+        cached = self._token_cache.get("current_token")
+        if cached is not None and cached.access_token == access_token:
+            self._token_cache.pop("current_token", None)
+        await self.token_store.invalidate(access_token)
+
+    def _expires_soon(self, token: TwitchToken) -> bool:
+        remaining = token.expires_at - datetime.utcnow()
+        return remaining < timedelta(seconds=self.settings.token_refresh_before_expiry)
+
     async def _generate_new_token(self) -> TwitchToken:
         """
         Génère un nouveau token d'accès via l'API Twitch.
@@ -74,27 +126,26 @@ class TwitchAuthService:
             logger.debug(f"[Twitch Auth Request] Headers: {headers}")
             logger.debug(f"[Twitch Auth Request] Data: {data}")
             
-            async with self.client as client:
-                response = await client.post(
-                    self.settings.token_url,
-                    data={
-                        "client_id": self.settings.client_id,
-                        "client_secret": self.settings.client_secret,
-                        "grant_type": "client_credentials"
-                    },
-                    headers=headers
-                )
+            response = await self.client.post(
+                self.settings.token_url,
+                data={
+                    "client_id": self.settings.client_id,
+                    "client_secret": self.settings.client_secret,
+                    "grant_type": "client_credentials"
+                },
+                headers=headers
+            )
                 
-                logger.debug(f"[Twitch Auth Response] Status: {response.status_code}")
-                if response.status_code != 200:
-                    logger.error(f"[Twitch Auth Error] Response: {response.text}")
+            logger.debug(f"[Twitch Auth Response] Status: {response.status_code}")
+            if response.status_code != 200:
+                logger.error(f"[Twitch Auth Error] Response: {response.text}")
                 
-                if response.status_code == 429:
-                    raise TwitchError(429, "Rate limit exceeded")
+            if response.status_code == 429:
+                raise TwitchError(429, "Rate limit exceeded")
                     
-                response.raise_for_status()
-                data = await response.json()
-                logger.info("[Twitch Auth Response] Token generated successfully")
+            response.raise_for_status()
+            data = await response.json()
+            logger.info("[Twitch Auth Response] Token generated successfully")
                 
             expires_at = datetime.utcnow() + timedelta(seconds=data["expires_in"])
             
@@ -124,10 +175,8 @@ class TwitchAuthService:
             logger.info("[Twitch Auth] Token marked as invalid")
             return False
             
-        now = datetime.utcnow()
-        
         # Si le token expire dans moins d'une heure
-        if token.expires_at - now < timedelta(seconds=self.settings.token_refresh_before_expiry):
+        if self._expires_soon(token):
             logger.info(f"[Twitch Auth] Token expires soon (at {token.expires_at})")
             return False
             
@@ -140,23 +189,23 @@ class TwitchAuthService:
             logger.debug(f"[Twitch Auth Request] GET {self.settings.validate_url}")
             logger.debug(f"[Twitch Auth Request] Headers: {headers}")
             
-            async with self.client as client:
-                response = await client.get(self.settings.validate_url, headers=headers)
+            response = await self.client.get(self.settings.validate_url, headers=headers)
                 
-                logger.debug(f"[Twitch Auth Response] Status: {response.status_code}")
-                if response.status_code != 200:
-                    logger.debug(f"[Twitch Auth Response] Body: {response.text}")
+            logger.debug(f"[Twitch Auth Response] Status: {response.status_code}")
+            if response.status_code != 200:
+                logger.debug(f"[Twitch Auth Response] Body: {response.text}")
                 
-                if response.status_code == 429:
-                    raise TwitchError(429, "Rate limit exceeded")
+            if response.status_code == 429:
+                raise TwitchError(429, "Rate limit exceeded")
                     
-                if response.status_code == 200:
-                    await self.token_repository.update_last_used(token)
-                    logger.debug("[Twitch Auth] Token validated successfully")
-                    return True
+            if response.status_code == 200:
+                await self.token_repository.update_last_used(token)
+                logger.debug("[Twitch Auth] Token validated successfully")
+                return True
                 
             logger.warning(f"[Twitch Auth] Invalid token response: {response.status_code}")
             await self.token_repository.invalidate_token(token)
+            await self.invalidate_token(token.access_token)
             return False
             
         except httpx.HTTPError as e:
@@ -0,0 +1,92 @@
+"""
+Client HTTP Helix : point de passage unique de tous les appels GET vers l'API Twitch.
+
+Chaque appel consomme un jeton du budget Helix partagé par la flotte, et chaque
+réponse (429 compris) recale ce budget sur ses en-têtes Ratelimit-*. Le nombre
+d'appels simultanés est borné par une limite adaptative, ajustée sur la latence
+de chaque réponse. Un appel hérite de la classe de priorité de son contexte
+(interactive par défaut, de fond dans les jobs et les préchargements) et son
+échéance : passé celle-ci, l'appel lève `DeadlineExceeded`. Un 401 (token
+révoqué ou expiré côté Twitch) est signalé à `on_unauthorized`.
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+from backend.app.services.twitch.concurrency import AdaptiveLimiter, current_priority
+from backend.app.services.twitch.deadline import DeadlineExceeded, time_left
+from backend.app.services.twitch.rate_budget import SharedRateBudget
+
+logger = logging.getLogger(__name__)
+
+
+class HelixClient:
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        base_url: str,
+        budget: Optional[SharedRateBudget] = None,
+        limiter: Optional[AdaptiveLimiter] = None,
+        on_unauthorized: Optional[Callable[[dict], Awaitable[None]]] = None
+    ):
+        self.client = client
+        self.base_url = base_url
+        self.budget = budget
+        self.limiter = limiter
+        self.on_unauthorized = on_unauthorized
+
+    async def get(self, path: str, params: dict, headers: dict, priority: Optional[str] = None) -> httpx.Response:
+        """
+        GET `path` (relatif à l'API Helix). Ne lève pas sur un statut d'erreur,
+        mais lève `DeadlineExceeded` si l'échéance du contexte est atteinte.
+        """
+        priority = priority or current_priority()
+        remaining = time_left()
+        if remaining is None:
+            return await self._get(path, params, headers, priority)
+        if remaining <= 0:
+            raise DeadlineExceeded(f"GET {path}: deadline already passed")
+        try:
+            return await asyncio.wait_for(self._get(path, params, headers, priority), remaining)
+        except asyncio.TimeoutError:
+            logger.warning(f"[Twitch API] GET {path} cut by the request deadline")
+            raise DeadlineExceeded(f"GET {path}: deadline exceeded") from None
+
+    async def _get(self, path: str, params: dict, headers: dict, priority: str) -> httpx.Response:
+        if self.budget is not None:
+            await self.budget.acquire(priority=priority)
+        logger.debug(f"[Twitch API] GET {path} - Params: {params}")
+        response = await self._send(path, params, headers, priority)
+        logger.debug(f"[Twitch API] GET {path} - Status: {response.status_code}")
+        if self.budget is not None:
+            await self.budget.observe(response.headers)
+        if response.status_code == 429:
+            logger.warning(f"[Twitch API] Rate limited on {path}")
+        elif response.status_code == 401 and self.on_unauthorized is not None:
+            logger.warning(f"[Twitch API] Token rejected on {path}")
+            await self.on_unauthorized(headers)
+        return response
+
+    async def _send(self, path: str, params: dict, headers: dict, priority: str) -> httpx.Response:
+        if self.limiter is None:
+            return await self.client.get(f"{self.base_url}{path}", params=params, headers=headers)
+        # Le jeton du budget est pris avant : on n'occupe pas une place en attendant le rate limit
+        await self.limiter.acquire(priority)
+        start = time.monotonic()
+        try:
+            response = await self.client.get(f"{self.base_url}{path}", params=params, headers=headers)
+        except asyncio.CancelledError:
+            # Appel abandonné (échéance de la requête) : rien à apprendre de Twitch
+            self.limiter.release(time.monotonic() - start, sample=False)
+            raise
+        except Exception:
+            self.limiter.release(time.monotonic() - start, dropped=True)
+            raise
+        self.limiter.release(
+            time.monotonic() - start,
+            dropped=response.status_code == 429 or response.status_code >= 500
+        )
+        return response
@@ -0,0 +1,196 @@
+"""
+Limite adaptative du nombre d'appels Helix simultanés (AIMD).
+
+Au-delà d'un certain nombre d'appels en vol, la latence de Twitch monte
+brutalement, bien avant le rate limit. La limite de concurrence s'ajuste donc
+sur la latence observée :
+
+- augmentation additive (+1 par "tour" de `limit` réponses) tant que la latence
+  reste proche de la latence de base et que la limite est effectivement atteinte ;
+- diminution multiplicative (`backoff`) sur un pic de latence (au-delà de
+  `tolerance` fois la latence de base), une erreur réseau, un 429 ou un 5xx —
+  au plus une fois par aller-retour, pour qu'une rafale de réponses lentes ne
+  compte que pour un seul signal.
+
+La latence de base est le minimum observé, qui remonte lentement pour suivre un
+changement durable (autre région, autre charge chez Twitch).
+
+Chaque appel a une classe de priorité : "interactive" (recherches des
+utilisateurs, par défaut) ou "background" (préchargement, ingestion,
+préchauffage — tout ce qui tourne dans le scheduler). Au-delà de la limite,
+chaque classe attend dans sa propre file (FIFO) et les interactifs sont
+toujours servis d'abord. Une part `reserved_share` de la limite leur est
+réservée : un appel de fond ne démarre que s'il reste cette marge, il utilise
+donc la capacité inoccupée sans jamais retarder une recherche.
+"""
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, Iterator
+
+from backend.app.config import settings
+from backend.app.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Remontée de la latence de base à chaque échantillon (+0,1 %)
+_BASELINE_DRIFT = 1.001
+
+# Classes de priorité des appels Helix
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+PRIORITIES = (INTERACTIVE, BACKGROUND)
+
+_priority: ContextVar[str] = ContextVar("helix_priority", default=INTERACTIVE)
+
+
+def current_priority() -> str:
+    """Classe de priorité des appels Helix faits depuis le contexte courant."""
+    return _priority.get()
+
+
+@contextmanager
+def background_priority() -> Iterator[None]:
+    """Les appels Helix faits dans ce bloc (et les tâches qu'il crée) passent en priorité de fond."""
+    token = _priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class AdaptiveLimiter:
+    """
+    `initial_limit`, `min_limit`, `max_limit` : bornes de la limite de concurrence.
+    `tolerance` : rapport latence / latence de base au-delà duquel on parle de pic.
+    `backoff` : facteur appliqué à la limite sur un pic ou une erreur.
+    `reserved_share` : part de la limite que les appels de fond laissent libre.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 100,
+        tolerance: float = 2.0,
+        backoff: float = 0.9,
+        reserved_share: float = 0.2
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(self.max_limit, max(self.min_limit, initial_limit)))
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.reserved_share = reserved_share
+        self.in_flight = 0
+        self.baseline = None
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {priority: deque() for priority in PRIORITIES}
+        self._last_decrease = 0.0
+        self.increases = 0
+        self.decreases = 0
+        self.admitted = {priority: 0 for priority in PRIORITIES}
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    @property
+    def background_limit(self) -> int:
+        """Places utilisables par les appels de fond : la limite moins la réserve (au moins une)."""
+        limit = int(self.limit)
+        return max(1, limit - math.ceil(limit * self.reserved_share))
+
+    def _has_capacity(self, priority: str) -> bool:
+        if priority == INTERACTIVE:
+            return self.in_flight < int(self.limit)
+        return self.in_flight < self.background_limit and not self._waiters[INTERACTIVE]
+
+    def _wake(self) -> None:
+        for priority in PRIORITIES:
+            waiters = self._waiters[priority]
+            while waiters and self._has_capacity(priority):
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    self.in_flight += 1
+                    self.admitted[priority] += 1
+                    waiter.set_result(True)
+
+    async def acquire(self, priority: str = INTERACTIVE) -> None:
+        """Prend une place d'appel Helix, en attendant son tour (dans sa classe) si besoin."""
+        waiters = self._waiters[priority]
+        if self._has_capacity(priority) and not waiters:
+            self.in_flight += 1
+            self.admitted[priority] += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # La place a été attribuée entre-temps : on la rend
+                self.in_flight -= 1
+                self._wake()
+            else:
+                try:
+                    waiters.remove(waiter)
+                except ValueError:
+                    pass
+                # Un interactif qui abandonne peut débloquer les appels de fond
+                self._wake()
+            raise
+
+    def release(self, latency: float, dropped: bool = False, sample: bool = True) -> None:
+        """
+        Rend la place d'un appel de `latency` secondes et ajuste la limite.
+
+        `dropped` : l'appel a échoué côté Twitch (erreur réseau, 429, 5xx).
+        `sample` : False pour un appel annulé de notre côté, qui ne dit rien de la latence.
+        """
+        saturated = self.in_flight >= int(self.limit)
+        self.in_flight -= 1
+        if not sample:
+            self._wake()
+            return
+        if not dropped:
+            self.baseline = latency if self.baseline is None else min(latency, self.baseline * _BASELINE_DRIFT)
+
+        now = time.monotonic()
+        if dropped or latency > self.baseline * self.tolerance:
+            # Un pic par aller-retour : les réponses lentes d'une même rafale arrivent ensemble
+            if now - self._last_decrease >= latency:
+                self._last_decrease = now
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self.decreases += 1
+                logger.debug(f"[Helix] Concurrency limit down to {self.limit:.1f} (latency {latency * 1000:.0f}ms)")
+        elif saturated and self.limit < self.max_limit:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self.increases += 1
+        self._wake()
+
+    def stats(self) -> dict:
+        """État du limiteur, pour l'endpoint de métriques."""
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "background_limit": self.background_limit,
+            "queue_depth": {priority: len(waiters) for priority, waiters in self._waiters.items()},
+            "admitted": dict(self.admitted),
+            "baseline_ms": round(self.baseline * 1000, 1) if self.baseline is not None else None,
+            "increases": self.increases,
+            "decreases": self.decreases,
+        }
+
+
+# Instance globale : les connexions vers Twitch sont celles du processus
+helix_limiter = AdaptiveLimiter(
+    initial_limit=settings.HELIX_CONCURRENCY_INITIAL,
+    min_limit=settings.HELIX_CONCURRENCY_MIN,
+    max_limit=settings.HELIX_CONCURRENCY_MAX,
+    reserved_share=settings.HELIX_INTERACTIVE_RESERVE
+)
+metrics.register("helix_concurrency", helix_limiter.stats)
@@ -0,0 +1,45 @@
+"""
+Échéance d'une requête, portée jusqu'à chaque appel Helix.
+
+Les timeouts httpx s'appliquent à chaque appel : une recherche qui enchaîne
+catégories, streams et archives peut durer plusieurs fois ce timeout. Une
+recherche fixe donc une échéance (`deadline()`), propagée par une variable de
+contexte à tous les appels Helix qu'elle déclenche, y compris dans les tâches
+qu'elle crée. Chaque appel n'a droit qu'au temps restant (attente du budget et
+de la limite de concurrence comprises) ; une fois l'échéance passée, il lève
+`DeadlineExceeded` sans être envoyé.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """L'échéance de la requête est passée avant la fin de l'appel."""
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """Borne à `seconds` secondes les appels Helix faits dans ce bloc ; None retire l'échéance."""
+    token = _deadline.set(None if seconds is None else time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_left() -> Optional[float]:
+    """Secondes restantes avant l'échéance du contexte courant, None s'il n'y en a pas."""
+    expires_at = _deadline.get()
+    if expires_at is None:
+        return None
+    return expires_at - time.monotonic()
+
+
+def expired() -> bool:
+    """True si le contexte courant a une échéance et qu'elle est passée."""
+    remaining = time_left()
+    return remaining is not None and remaining <= 0
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from backend.app.models.records import VideoRecord
+from backend.app.models.twitch import SearchFilters
+
+
+def _one_month_before(now: datetime) -> datetime:
+    year, month = (now.year, now.month - 1) if now.month > 1 else (now.year - 1, 12)
+    for day in range(now.day, 0, -1):
+        try:
+            return now.replace(year=year, month=month, day=day)
+        except ValueError:
+            continue
+    return now - timedelta(days=30)
+
+
+def _match_date(video: VideoRecord, window: str, now: datetime) -> bool:
+    created_at = video.created_at
+    if created_at is None:
+        return False
+    if window == "today":
+        return created_at.date() == now.date()
+    if window == "this_week":
+        return created_at >= now - timedelta(days=7)
+    if window == "this_month":
+        return created_at >= _one_month_before(now)
+    return True
+
+
+def _match_duration(video: VideoRecord, bucket: str) -> bool:
+    duration = video.duration_seconds
+    if bucket == "short":
+        return duration <= 900
+    if bucket == "medium":
+        return 900 < duration <= 3600
+    if bucket == "long":
+        return duration > 3600
+    return True
+
+
+def _match_views(video: VideoRecord, bucket: str) -> bool:
+    views = video.view_count or 0
+    if bucket == "less_100":
+        return views < 100
+    if bucket == "100_1000":
+        return 100 <= views < 1000
+    if bucket == "more_1000":
+        return views >= 1000
+    return True
+
+
+def apply_filters(
+    videos: List[VideoRecord],
+    filters: SearchFilters,
+    now: Optional[datetime] = None
+) -> List[VideoRecord]:
+    """
+    Applique les filtres date/durée/vues puis le tri demandé.
+
+    Reprend la sémantique du getter `filteredVideos` du frontend ; la langue est
+    filtrée en amont par Helix. Durées et dates sont parsées à l'ingestion
+    (`duration_seconds`, `created_at` en UTC), les comparaisons sont directes.
+    """
+    now = now or datetime.now(timezone.utc)
+    filtered = [
+        video for video in videos
+        if (filters.date == "all" or _match_date(video, filters.date, now))
+        and (filters.duration == "all" or _match_duration(video, filters.duration))
+        and (filters.views == "all" or _match_views(video, filters.views))
+    ]
+
+    if filters.sort == "date":
+        oldest = datetime.min.replace(tzinfo=timezone.utc)
+        filtered.sort(key=lambda video: video.created_at or oldest, reverse=True)
+    elif filters.sort == "views":
+        filtered.sort(key=lambda video: video.view_count or 0, reverse=True)
+    elif filters.sort == "duration":
+        filtered.sort(key=lambda video: video.duration_seconds, reverse=True)
+
+    return filtered
@@ -0,0 +1,12 @@
+"""
+Clé canonique d'un jeu recherché.
+
+Partagée par tout ce qui indexe par jeu (cache de recherche, jeux connus,
+popularité, invalidations, curseurs de pagination) : " Minecraft " et
+"minecraft" désignent partout la même entrée.
+"""
+
+
+def normalize_query(game_name: str) -> str:
+    """Normalise une recherche de jeu ("  Minecraft " et "minecraft" comptent ensemble)."""
+    return " ".join(game_name.casefold().split())
@@ -0,0 +1,98 @@
+"""
+Décodage des réponses Helix directement depuis les octets.
+
+Le JSON est parsé par pydantic-core (`from_json`, plus rapide que `json.loads`
+sur ces pages), puis chaque élément passe par `stream_to_video` ou
+`archive_to_video`. Valider les vidéos avec un `TypeAdapter` (TypedDict ou
+dataclass) coûtait environ 1,5 à 2 fois ce chemin sur une page de 100 éléments :
+les vidéos ne sont donc pas validées, seules les pages de jeux, sans champ
+dérivé, le sont en une passe par `TypeAdapter.validate_json`.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import TypeAdapter
+from pydantic_core import from_json
+from typing_extensions import TypedDict
+
+from backend.app.models.records import GameRecord, VideoRecord, parse_duration
+
+
+class _GamePage(TypedDict, total=False):
+    data: List[GameRecord]
+    pagination: Dict[str, Optional[str]]
+
+
+_GAME_PAGE_ADAPTER = TypeAdapter(_GamePage)
+
+
+def parse_created_at(created_at: Optional[str]) -> Optional[datetime]:
+    """Convertit un horodatage ISO Twitch en datetime UTC ; None s'il est invalide."""
+    if not created_at:
+        return None
+    try:
+        value = datetime.fromisoformat(created_at)
+    except ValueError:
+        return None
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def stream_to_video(stream: Dict[str, Any]) -> VideoRecord:
+    """Convertit un stream Helix (/streams) en VideoRecord."""
+    return VideoRecord(
+        id=stream["id"],
+        title=stream["title"],
+        thumbnail_url=stream["thumbnail_url"],
+        user_name=stream["user_name"],
+        game_id=stream.get("game_id"),
+        game_name=stream.get("game_name"),
+        type="live",
+        is_live=True,
+        view_count=stream["viewer_count"],
+        language=stream.get("language", ""),
+        created_at=parse_created_at(stream.get("started_at")),
+        url=f"https://www.twitch.tv/{stream.get('user_login', stream['user_name']).lower()}",
+        duration="live",
+        duration_seconds=0
+    )
+
+
+def archive_to_video(video: Dict[str, Any], game_id: Optional[str]) -> VideoRecord:
+    """Convertit une vidéo archivée Helix (/videos) en VideoRecord."""
+    duration = video.get("duration", "")
+    return VideoRecord(
+        id=video["id"],
+        title=video["title"],
+        thumbnail_url=video["thumbnail_url"],
+        user_name=video["user_name"],
+        game_id=video.get("game_id") or game_id,
+        type=video.get("type", "archive"),
+        is_live=False,
+        view_count=video.get("view_count"),
+        language=video.get("language", ""),
+        created_at=parse_created_at(video.get("created_at")),
+        url=video.get("url", ""),
+        duration=duration,
+        duration_seconds=parse_duration(duration)
+    )
+
+
+def decode_video_page(content: bytes, game_id: Optional[str] = None) -> Tuple[List[VideoRecord], Optional[str]]:
+    """
+    Décode une page /streams ou /videos en VideoRecord.
+
+    Les éléments /streams se reconnaissent à `viewer_count`. /videos ne renvoie
+    pas de game_id : celui de la requête est reporté sur les vidéos qui n'en ont
+    pas. Retourne aussi le curseur de la page suivante.
+    """
+    page = from_json(content)
+    videos = [
+        stream_to_video(item) if "viewer_count" in item else archive_to_video(item, game_id)
+        for item in page.get("data") or []
+    ]
+    return videos, (page.get("pagination") or {}).get("cursor")
+
+
+def decode_game_page(content: bytes) -> List[GameRecord]:
+    """Décode une page /games/top ou /search/categories en GameRecord."""
+    return _GAME_PAGE_ADAPTER.validate_json(content).get("data", [])
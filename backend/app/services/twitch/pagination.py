@@ -0,0 +1,41 @@
+import base64
+import binascii
+import hashlib
+from typing import Optional, Tuple
+
+from backend.app.models.twitch import SearchFilters
+from backend.app.services.twitch.keys import normalize_query
+
+# Préfixe distinguant nos curseurs de snapshot des curseurs Helix bruts
+_SNAPSHOT_PREFIX = "snap_"
+
+
+def cursor_scope(game_name: str, filters: SearchFilters) -> str:
+    """
+    Empreinte de la recherche (jeu, filtres) pour laquelle un curseur est émis :
+    un curseur rejoué avec un autre jeu ou d'autres filtres ne la retrouve pas.
+    """
+    key = f"{normalize_query(game_name)}\x00{filters.model_dump_json()}"
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def encode_cursor(snapshot_id: str, offset: int, scope: str) -> str:
+    """Encode un curseur opaque pointant sur `offset` dans un snapshot, pour la recherche `scope`."""
+    payload = f"{snapshot_id}:{offset}:{scope}".encode()
+    return _SNAPSHOT_PREFIX + base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[str, int, str]]:
+    """
+    Décode un curseur de snapshot en (snapshot_id, offset, scope).
+    Returns None pour un curseur Helix brut ou invalide.
+    """
+    if not cursor.startswith(_SNAPSHOT_PREFIX):
+        return None
+    encoded = cursor[len(_SNAPSHOT_PREFIX):]
+    try:
+        payload = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)).decode()
+        snapshot_id, offset, scope = payload.split(":")
+        return snapshot_id, max(0, int(offset)), scope
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
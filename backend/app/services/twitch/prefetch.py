@@ -0,0 +1,59 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+
+from backend.app.services.twitch.concurrency import background_priority
+from backend.app.services.twitch.deadline import deadline
+from backend.app.services.twitch.rate_budget import RateBudget
+
+logger = logging.getLogger(__name__)
+
+
+class Prefetcher:
+    """
+    Planifie les préchargements spéculatifs de pages en tâche de fond.
+
+    Un préchargement n'est lancé que si aucun n'est déjà en cours pour la même
+    clé, si moins de `max_tasks` tournent, et s'il reste du budget Helix : il
+    n'attend jamais, il est simplement abandonné. Ses appels Helix passent après
+    ceux des recherches et ne sont pas soumis à l'échéance de la requête qui l'a lancé.
+    """
+
+    def __init__(self, budget: RateBudget, max_tasks: int):
+        self.budget = budget
+        self.max_tasks = max_tasks
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def schedule(self, key: str, job: Callable[[], Awaitable[None]]) -> bool:
+        """Lance `job` en tâche de fond. Returns False si le préchargement est abandonné."""
+        if key in self._tasks or len(self._tasks) >= self.max_tasks or self.budget.available < 1:
+            return False
+        # La tâche copie le contexte courant : priorité de fond, sans l'échéance de la requête
+        with background_priority(), deadline(None):
+            task = asyncio.create_task(job())
+        self._tasks[key] = task
+        task.add_done_callback(lambda done: self._done(key, done))
+        return True
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        self._tasks.pop(key, None)
+        if not task.cancelled() and task.exception():
+            logger.warning(f"[Prefetch] {key} failed: {task.exception()}")
+
+    async def wait(self, key: str, timeout: Optional[float] = None) -> bool:
+        """
+        Attend au plus `timeout` secondes la fin d'un préchargement en cours pour `key`.
+        Returns False si le préchargement tourne encore.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            return True
+        done, _ = await asyncio.wait({task}, timeout=None if timeout is None else max(0.0, timeout))
+        return bool(done)
+
+    async def close(self) -> None:
+        """Annule les préchargements en cours."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
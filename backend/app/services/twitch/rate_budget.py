@@ -0,0 +1,294 @@
+import asyncio
+import logging
+import time
+from typing import Tuple
+
+from backend.app.services.twitch.concurrency import BACKGROUND, INTERACTIVE, PRIORITIES
+
+logger = logging.getLogger(__name__)
+
+
+class RateBudget:
+    """
+    Token bucket bornant le nombre d'appels Helix qu'un composant peut consommer.
+
+    `calls` appels sont autorisés par fenêtre de `period` secondes ; le bucket se
+    remplit en continu et `acquire()` attend lorsque le budget est épuisé.
+    """
+
+    def __init__(self, calls: int, period: float):
+        self.capacity = max(1, int(calls))
+        self.rate = self.capacity / period
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def available(self) -> float:
+        """Nombre d'appels disponibles immédiatement."""
+        self._refill()
+        return self._tokens
+
+    def time_until(self, tokens: int = 1) -> float:
+        """Secondes avant que `tokens` appels soient disponibles (0 s'ils le sont déjà)."""
+        self._refill()
+        return max(0.0, (tokens - self._tokens) / self.rate)
+
+    def try_acquire(self, tokens: int = 1) -> bool:
+        """Consomme `tokens` appels s'ils sont disponibles immédiatement, sans attendre."""
+        self._refill()
+        if self._tokens < tokens:
+            return False
+        self._tokens -= tokens
+        return True
+
+    async def acquire(self, tokens: int = 1) -> None:
+        """Consomme `tokens` appels, en attendant si le budget est épuisé."""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+# Bucket partagé : recharge puis accorde jusqu'à ARGV[3] jetons d'un coup (un lease).
+# L'horloge est celle du serveur Redis, commune à tous les workers.
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local granted = math.min(requested, math.floor(tokens))
+tokens = tokens - granted
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) * 2)
+if granted > 0 then
+    return {granted, 0}
+end
+return {0, math.ceil((1 - tokens) / rate * 1000)}
+"""
+
+# Recalage sur les en-têtes Ratelimit-* de Helix : le bucket ne fait que baisser
+_SYNC_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local remaining = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate, remaining)
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) * 2)
+return 1
+"""
+
+
+class RedisTokenBucket:
+    """
+    Token buckets portés par des clés Redis, communs à tous les workers.
+
+    La recharge et la prise sont atomiques (scripts Lua) et datées par
+    l'horloge du serveur Redis. Sert au budget Helix partagé comme au rate
+    limit des clients entrants.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self._take = client.register_script(_TAKE_SCRIPT)
+        self._sync = client.register_script(_SYNC_SCRIPT)
+
+    async def take(self, key: str, capacity: int, rate: float, tokens: int = 1) -> Tuple[int, float]:
+        """
+        Prend jusqu'à `tokens` jetons du bucket `key` (`capacity` jetons, `rate` par seconde).
+        Returns (jetons accordés, secondes avant le prochain jeton si aucun ne l'est).
+        """
+        granted, wait_ms = await self._take(keys=[key], args=[capacity, rate, tokens])
+        return int(granted), int(wait_ms) / 1000
+
+    async def cap(self, key: str, capacity: int, rate: float, remaining: int) -> None:
+        """Ramène le bucket `key` à `remaining` jetons au plus (il ne fait que baisser)."""
+        await self._sync(keys=[key], args=[capacity, rate, remaining])
+
+
+class SharedRateBudget:
+    """
+    Token bucket Helix partagé par tous les workers, porté par une clé Redis.
+
+    Le rate limit Twitch est par client ID : chaque appel Helix de la flotte puise
+    dans le même bucket, décrémenté atomiquement par un script Lua. Pour éviter
+    un aller-retour Redis par appel, un worker prend des leases de `lease_size`
+    jetons, valables `lease_ttl` secondes ; les jetons d'un lease expiré sont
+    perdus (on ne dépasse jamais le budget, on peut le sous-consommer un peu).
+
+    `observe()` recale le bucket sur les en-têtes Ratelimit-* des réponses.
+    Sans Redis, le budget retombe sur un bucket local au processus.
+
+    Les appels de fond laissent passer les appels interactifs qui attendent le
+    budget : ils ne consomment que ce que les recherches laissent. Chaque classe
+    attend le remplissage du bucket dans sa propre file (FIFO) : une recherche
+    qui arrive pendant qu'un appel de fond attend n'est pas bloquée derrière lui.
+    """
+
+    def __init__(
+        self,
+        calls: int,
+        period: float,
+        key: str = "helix:ratelimit",
+        lease_size: int = 5,
+        lease_ttl: float = 1.0,
+        client_provider=None
+    ):
+        self.capacity = max(1, int(calls))
+        self.period = period
+        self.key = key
+        self.lease_size = max(1, lease_size)
+        self.lease_ttl = lease_ttl
+        self._client_provider = client_provider or _default_client
+        self._local = RateBudget(calls, period)
+        self._lease_tokens = 0
+        self._lease_expires = 0.0
+        self._lock = asyncio.Lock()
+        self._queues = {priority: asyncio.Lock() for priority in PRIORITIES}
+        self._interactive_waiting = 0
+        self._interactive_idle = asyncio.Event()
+        self._interactive_idle.set()
+        self._bucket = None
+        self.redis_calls = 0
+        self.local_fallbacks = 0
+        self.resyncs = 0
+        self.wasted = 0
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.period
+
+    def _redis(self):
+        client = self._client_provider()
+        if client is None:
+            self._bucket = None
+            return None
+        if self._bucket is None or self._bucket.client is not client:
+            self._bucket = RedisTokenBucket(client)
+        return self._bucket
+
+    def _take_lease(self, tokens: int) -> bool:
+        now = time.monotonic()
+        if self._lease_expires <= now and self._lease_tokens:
+            self.wasted += self._lease_tokens
+            self._lease_tokens = 0
+        if self._lease_tokens >= tokens:
+            self._lease_tokens -= tokens
+            return True
+        return False
+
+    async def acquire(self, tokens: int = 1, priority: str = INTERACTIVE) -> None:
+        """Consomme `tokens` appels du budget de la flotte, en attendant si besoin."""
+        if priority == BACKGROUND:
+            await self._yield_to_interactive()
+            await self._acquire(tokens, priority)
+            return
+        self._interactive_waiting += 1
+        self._interactive_idle.clear()
+        try:
+            await self._acquire(tokens, priority)
+        finally:
+            self._interactive_waiting -= 1
+            if not self._interactive_waiting:
+                self._interactive_idle.set()
+
+    async def _yield_to_interactive(self) -> None:
+        while self._interactive_waiting:
+            await self._interactive_idle.wait()
+
+    async def _acquire(self, tokens: int, priority: str) -> None:
+        async with self._queues[priority]:
+            while True:
+                async with self._lock:
+                    wait = await self._try_take(tokens)
+                if wait <= 0:
+                    return
+                # Attente hors du verrou du bucket ; au réveil, un appel de fond repasse derrière les recherches
+                await asyncio.sleep(wait)
+                if priority == BACKGROUND:
+                    await self._yield_to_interactive()
+
+    async def _try_take(self, tokens: int) -> float:
+        """Prend `tokens` jetons. Returns 0 si c'est fait, sinon les secondes à attendre avant de réessayer."""
+        while not self._take_lease(tokens):
+            bucket = self._redis()
+            if bucket is None:
+                return self._try_take_local(tokens)
+            try:
+                self.redis_calls += 1
+                granted, wait = await bucket.take(self.key, self.capacity, self.rate, max(tokens, self.lease_size))
+            except Exception as e:
+                logger.warning(f"[RateBudget] Redis bucket unavailable, using local budget: {str(e)}")
+                return self._try_take_local(tokens)
+            if not granted:
+                return wait
+            # Les jetons restants d'un lease précédent sont conservés
+            self._lease_tokens += granted
+            self._lease_expires = time.monotonic() + self.lease_ttl
+        return 0.0
+
+    def _try_take_local(self, tokens: int) -> float:
+        if self._local.try_acquire(tokens):
+            self.local_fallbacks += 1
+            return 0.0
+        return self._local.time_until(tokens)
+
+    async def observe(self, headers) -> None:
+        """Recale le bucket sur les en-têtes Ratelimit-Limit / Ratelimit-Remaining d'une réponse Helix."""
+        try:
+            limit = int(headers.get("Ratelimit-Limit", 0))
+            remaining = int(headers["Ratelimit-Remaining"])
+        except (KeyError, TypeError, ValueError):
+            return
+        if limit and limit != self.capacity:
+            logger.info(f"[RateBudget] Helix limit is {limit} calls, was {self.capacity}")
+            self.capacity = limit
+            self._local = RateBudget(limit, self.period)
+        # Ce qui reste du lease local est déjà décompté côté Twitch
+        remaining = max(0, remaining - self._lease_tokens)
+        self.resyncs += 1
+        bucket = self._redis()
+        if bucket is None:
+            self._local._refill()
+            self._local._tokens = min(self._local._tokens, remaining)
+            return
+        try:
+            await bucket.cap(self.key, self.capacity, self.rate, remaining)
+        except Exception as e:
+            logger.warning(f"[RateBudget] Could not resync Redis bucket: {str(e)}")
+
+    def stats(self) -> dict:
+        """Compteurs du budget, pour l'endpoint de métriques."""
+        return {
+            "scope": "redis" if self._bucket is not None else "local",
+            "capacity": self.capacity,
+            "period": self.period,
+            "lease_tokens": self._lease_tokens,
+            "redis_calls": self.redis_calls,
+            "local_fallbacks": self.local_fallbacks,
+            "resyncs": self.resyncs,
+            "wasted": self.wasted,
+        }
+
+
+def _default_client():
+    from backend.app.redis_client import redis_manager
+    return redis_manager.get_client()
@@ -0,0 +1,80 @@
+"""
+Token d'application Twitch partagé par tous les workers via Redis.
+
+Le token courant et son expiration sont publiés sous `twitch:app_token:<client_id>`,
+avec une expiration Redis alignée sur celle du token. Les workers le lisent en
+mémoire puis dans Redis : MongoDB ne sert plus qu'à l'historique des tokens
+générés. Un token refusé par Twitch est retiré avec `invalidate`, pour que la
+flotte en obtienne un autre au lieu de le relire jusqu'à son expiration. Sans
+Redis, `get` rend None, `publish` et `invalidate` ne font rien (un seul worker).
+"""
+import logging
+from datetime import datetime
+from typing import Optional
+
+from backend.app.models.twitch import TwitchToken
+
+logger = logging.getLogger(__name__)
+
+
+class SharedTokenStore:
+    def __init__(self, client_id: str, client_provider=None):
+        self.key = f"twitch:app_token:{client_id}"
+        self._client_provider = client_provider or _default_client
+
+    @property
+    def is_shared(self) -> bool:
+        return self._client_provider() is not None
+
+    async def get(self) -> Optional[TwitchToken]:
+        """Token publié par la flotte, ou None s'il n'y en a pas (ou sans Redis)."""
+        client = self._client_provider()
+        if client is None:
+            return None
+        try:
+            raw = await client.get(self.key)
+            if raw is None:
+                return None
+            return TwitchToken.model_validate_json(raw)
+        except Exception as e:
+            logger.warning(f"[Twitch Auth] Shared token unavailable: {str(e)}")
+            return None
+
+    async def publish(self, token: TwitchToken) -> bool:
+        """Publie `token` pour toute la flotte jusqu'à son expiration. Returns True si publié."""
+        client = self._client_provider()
+        if client is None:
+            return False
+        ttl_ms = int((token.expires_at - datetime.utcnow()).total_seconds() * 1000)
+        if ttl_ms <= 0:
+            return False
+        try:
+            await client.set(self.key, token.model_dump_json(), px=ttl_ms)
+            return True
+        except Exception as e:
+            logger.warning(f"[Twitch Auth] Could not publish shared token: {str(e)}")
+            return False
+
+    async def invalidate(self, access_token: str) -> bool:
+        """
+        Retire le token publié s'il s'agit toujours de `access_token` (un autre
+        worker a pu le remplacer entre-temps). Returns True si retiré.
+        """
+        client = self._client_provider()
+        if client is None:
+            return False
+        try:
+            raw = await client.get(self.key)
+            if raw is None or TwitchToken.model_validate_json(raw).access_token != access_token:
+                return False
+            await client.delete(self.key)
+            logger.info("[Twitch Auth] Rejected token removed from the shared store")
+            return True
+        except Exception as e:
+            logger.warning(f"[Twitch Auth] Could not invalidate shared token: {str(e)}")
+            return False
+
+
+def _default_client():
+    from backend.app.redis_client import redis_manager
+    return redis_manager.get_client()
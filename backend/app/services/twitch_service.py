@@ -1,21 +1,47 @@
 from typing import Optional, List, Tuple
 import httpx
+import uuid
 from datetime import datetime, timedelta
 import logging
-from cachetools import TTLCache
 from fastapi import HTTPException
 from pydantic import ValidationError
 
 from backend.app.config import settings
+from backend.app.config.twitch import get_twitch_settings
+from backend.app.cache.codec import build_codec
+from backend.app.cache.disk import disk_cache
+from backend.app.cache.invalidation import invalidation_bus
+from backend.app.cache.singleflight import refresh_flight
+from backend.app.cache.tinylfu import memory_cache
+from backend.app.cache.popularity import popularity_tracker
+from backend.app.cache.ttl_policy import archive_ttl_policy, live_ttl_policy
 from backend.app.database import mongodb
-from backend.app.models.twitch import TwitchUser, TwitchToken, TwitchVideo, TwitchGame, TwitchSearchResult
+from backend.app.metrics import metrics
+from backend.app.models.records import GameRecord, SearchRecord, VideoRecord
+from backend.app.models.twitch import TwitchUser, TwitchToken, SearchFilters
+from backend.app.repositories.catalog_repository import CatalogRepository
 from backend.app.repositories.token_repository import TokenRepository
-from backend.app.repositories.twitch_repository import TwitchRepository
+from backend.app.repositories.twitch_repository import ARCHIVE_SEGMENT, LIVE_SEGMENT, TwitchRepository, segment_key
+from backend.app.repositories.write_behind import write_behind
 from backend.app.services.twitch.auth import TwitchAuthService
+from backend.app.services.twitch.client import HelixClient
+from backend.app.services.twitch.concurrency import helix_limiter
+from backend.app.services.twitch.deadline import DeadlineExceeded, expired as deadline_expired, time_left
+from backend.app.services.twitch.filters import apply_filters
+from backend.app.services.twitch.keys import normalize_query
+from backend.app.services.twitch.mapping import decode_game_page, decode_video_page
+from backend.app.services.twitch.pagination import cursor_scope, decode_cursor, encode_cursor
+from backend.app.services.twitch.prefetch import Prefetcher
+from backend.app.services.twitch.rate_budget import RateBudget, SharedRateBudget
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Taille maximale d'une page Helix (/streams, /videos)
+HELIX_PAGE_SIZE = 100
+# Pages Helix lues au plus pendant une requête (le reste est préchargé)
+MAX_PAGES_PER_REQUEST = 5
+
 class TwitchService:
     def __init__(self):
         """Initialize the Twitch service with necessary components."""
@@ -24,23 +50,53 @@ class TwitchService:
         self.auth_url = "https://id.twitch.tv/oauth2"
         self.client_id = settings.TWITCH_CLIENT_ID
         self.auth_service = None
-        self.twitch_repository = TwitchRepository(mongodb.get_db())
-        
-        # Cache en mémoire pour les données fréquemment accédées
-        self.memory_cache = TTLCache(
-            maxsize=settings.CACHE_MAX_SIZE,
-            ttl=settings.CACHE_TTL
+        self.twitch_repository = TwitchRepository(
+            mongodb.get_db(),
+            write_queue=write_behind,
+            codec=build_codec(settings.CACHE_COMPRESSION),
+            disk_cache=disk_cache,
+            memory_cache=memory_cache,
+            invalidation=invalidation_bus
+        )
+        self.catalog_repository = CatalogRepository(mongodb.get_db())
+
+        # Tous les appels Helix puisent dans le rate limit du client ID, partagé par la flotte
+        twitch_settings = get_twitch_settings()
+        helix_budget = SharedRateBudget(
+            calls=twitch_settings.rate_limit_calls,
+            period=twitch_settings.rate_limit_period,
+            key=f"helix:ratelimit:{self.client_id}",
+            lease_size=settings.HELIX_BUDGET_LEASE_SIZE,
+            lease_ttl=settings.HELIX_BUDGET_LEASE_TTL
+        )
+        metrics.register("helix_budget", helix_budget.stats)
+        self.helix = HelixClient(
+            self.client,
+            self.base_url,
+            helix_budget,
+            limiter=helix_limiter,
+            on_unauthorized=self._on_unauthorized
+        )
+
+        # Préchargement spéculatif des pages suivantes, borné en appels Helix
+        self.prefetcher = Prefetcher(
+            budget=RateBudget(
+                calls=twitch_settings.rate_limit_calls * settings.PREFETCH_BUDGET_SHARE,
+                period=twitch_settings.rate_limit_period
+            ),
+            max_tasks=settings.PREFETCH_MAX_TASKS
         )
 
     async def _get_auth_service(self) -> TwitchAuthService:
         """Lazy initialization of auth service."""
         if not self.auth_service:
-            token_repository = TokenRepository(mongodb.get_db())
+            token_repository = TokenRepository(mongodb.get_db(), write_queue=write_behind)
             self.auth_service = TwitchAuthService(token_repository)
         return self.auth_service
 
     async def close(self):
         """Close all service resources."""
+        await self.prefetcher.close()
         await self.client.aclose()
         if self.auth_service:
             await self.auth_service.close()
@@ -113,73 +169,131 @@ class TwitchService:
             "Authorization": f"Bearer {token.access_token}"
         }
 
+    async def _on_unauthorized(self, headers: dict) -> None:
+        """401 Helix : le token des `headers` est retiré, l'appel suivant en obtiendra un autre."""
+        if not self.auth_service:
+            return
+        access_token = headers.get("Authorization", "").removeprefix("Bearer ")
+        await self.auth_service.invalidate_token(access_token)
+
     async def search_videos_by_game(
         self,
         game_name: str,
         limit: int = 100,
         cursor: Optional[str] = None,
-        use_cache: bool = False
-    ) -> TwitchSearchResult:
+        use_cache: bool = False,
+        filters: Optional[SearchFilters] = None
+    ) -> SearchRecord:
         """
         Recherche des vidéos sur Twitch avec gestion du cache.
+
+        La première page fige les résultats dans un snapshot ; les pages suivantes
+        y sont lues et le snapshot est étendu page Helix par page Helix au-delà des
+        100 premiers résultats. La page N+1 est préchargée en tâche de fond.
+
+        Les appels Helix respectent l'échéance du contexte (fixée par le router) :
+        une page restée incomplète à l'échéance (archives non lues, par exemple)
+        porte `partial=True` ; un jeu non résolu à temps donne un résultat vide partiel.
         
         Args:
             game_name: Nom du jeu à rechercher
             limit: Nombre maximum de résultats
             cursor: Curseur pour la pagination
             use_cache: Utiliser le cache ou non
+            filters: Filtres et tri appliqués côté serveur (langue transmise à Helix)
             
         Returns:
-            TwitchSearchResult: Résultats de la recherche
+            SearchRecord: Résultats de la recherche (convertis par le router via `to_api`)
         """
+        filters = filters or SearchFilters()
+        scope = cursor_scope(game_name, filters)
+        snapshot_ref = decode_cursor(cursor) if cursor else None
+        if snapshot_ref and snapshot_ref[2] != scope:
+            # Le curseur a été émis pour un autre jeu ou d'autres filtres : ses offsets n'ont pas de sens ici
+            logger.warning(f"Cursor rejected for game {game_name}: issued for another search")
+            raise HTTPException(
+                status_code=400,
+                detail="Cursor does not match this search (game or filters changed), restart from the first page"
+            )
         try:
-            # Vérifier le cache si activé
-            if use_cache and not cursor:
-                cached_result = await self.twitch_repository.get_cached_game_search(
-                    game_name=game_name,
-                    limit=limit
-                )
-                if cached_result:
-                    logger.info(f"Cache hit for game: {game_name}")
-                    return cached_result
+            # Pages suivantes : servies depuis le snapshot, étendu si nécessaire
+            if snapshot_ref:
+                snapshot_id, offset, _ = snapshot_ref
+                # Un préchargement en cours contient peut-être déjà la page, mais ses appels
+                # Helix passent après ceux des recherches : on ne l'attend que jusqu'à l'échéance
+                prefetched = await self.prefetcher.wait(snapshot_id, timeout=time_left())
+                snapshot = await self.twitch_repository.get_snapshot(snapshot_id)
+                if not snapshot:
+                    logger.info(f"Snapshot {snapshot_id} expired for game: {game_name}")
+                    return self._empty_result(game_name)
+                if not prefetched:
+                    # Le préchargement étend encore ce snapshot : on étend une copie
+                    logger.info(f"Prefetch of snapshot {snapshot_id} still running, extending it interactively")
+                    snapshot = snapshot.with_videos(list(snapshot.videos), dict(snapshot.pagination))
+                logger.info(f"Snapshot hit for game: {game_name} (offset {offset})")
+                if await self._extend(snapshot, filters, offset + limit, max_pages=MAX_PAGES_PER_REQUEST):
+                    await self.twitch_repository.update_snapshot(snapshot)
+                return self._serve(snapshot, filters, offset, limit, scope)
 
-            # Si pas de cache ou cache expiré, faire l'appel API
-            logger.info(f"Cache miss for game: {game_name}, fetching from API")
-            headers = await self._get_headers()
-            
-            # 1. Rechercher le jeu
-            game = await self._find_game(game_name, headers)
-            if not game:
-                logger.warning(f"No game found for: {game_name}")
-                return self._empty_result(game_name)
-
-            # 2. Récupérer les streams et vidéos
-            videos, pagination = await self._fetch_videos(
-                game_id=game.id,
-                limit=limit,
-                cursor=cursor,
-                headers=headers
-            )
+            result = None
+            # Curseur Helix brut (anciens clients) : on repart de ce curseur
+            if cursor:
+                result = await self._fetch_result(
+                    game_name, filters, limit, {"source": "streams", "cursor": cursor}
+                )
+                if not result:
+                    return self._empty_result(game_name)
 
-            # Créer le résultat
-            result = TwitchSearchResult(
-                game_name=game_name,
-                game=game,
-                videos=videos,
-                total_count=len(videos),
-                last_updated=datetime.utcnow(),
-                pagination=pagination
-            )
+            # Popularité du jeu : préchauffage du cache et TTL adaptatif des segments
+            if not cursor:
+                popularity_tracker.record(game_name)
+                ttl_key = self._ttl_key(game_name, filters.language)
+                live_ttl_policy.record_request(ttl_key)
+                archive_ttl_policy.record_request(ttl_key)
 
-            # Sauvegarder dans le cache si pas de cursor
-            if use_cache and not cursor:
-                await self.twitch_repository.save_game_search_results(
+            segments = {}
+            if not result and use_cache:
+                segments = await self.twitch_repository.get_cached_segments(
                     game_name=game_name,
-                    result=result
+                    language=filters.language
                 )
 
-            return result
+            # Les jeux ingérés en tâche de fond sont servis depuis le catalogue local
+            if not result and not segments and settings.INGESTION_ENABLED:
+                result = await self._get_catalog_result(game_name, settings.SNAPSHOT_MAX_ITEMS, filters.language)
+                if result:
+                    logger.info(f"Catalog hit for game: {game_name}")
+                    if use_cache:
+                        await self._seed_segments(game_name, result, filters.language)
 
+            if not result:
+                if use_cache and LIVE_SEGMENT not in segments:
+                    # Segment live expiré : un seul worker de la flotte interroge Helix
+                    result = await self._refresh_tiered_result(game_name, filters, segments)
+                else:
+                    result = await self._get_tiered_result(game_name, filters, segments, use_cache)
+                if not result:
+                    return self._empty_result(game_name)
+                if not result.snapshot_id:
+                    await self._extend(result, filters, limit, max_pages=MAX_PAGES_PER_REQUEST)
+
+            if not result.snapshot_id:
+                result.snapshot_id = uuid.uuid4().hex
+                await self.twitch_repository.save_snapshot(result, settings.SNAPSHOT_TTL)
+                # Le segment live référence le snapshot pour que les hits restent paginables
+                if use_cache and not cursor:
+                    await self.twitch_repository.attach_snapshot(
+                        game_name=game_name,
+                        segment=LIVE_SEGMENT,
+                        snapshot_id=result.snapshot_id,
+                        language=filters.language
+                    )
+
+            return self._serve(result, filters, 0, limit, scope)
+
+        except DeadlineExceeded as e:
+            logger.warning(f"Search for game {game_name} cut by the deadline: {str(e)}")
+            return self._empty_result(game_name, partial=True)
         except Exception as e:
             logger.error(f"Error in search: {str(e)}", exc_info=True)
             raise HTTPException(
@@ -187,141 +301,461 @@ class TwitchService:
                 detail=f"Error searching videos: {str(e)}"
             )
 
-    async def _find_game(self, game_name: str, headers: dict) -> Optional[TwitchGame]:
+    async def _get_tiered_result(
+        self,
+        game_name: str,
+        filters: SearchFilters,
+        segments: dict,
+        use_cache: bool,
+        refreshed: Optional[set] = None
+    ) -> Optional[SearchRecord]:
+        """
+        Construit la première page à partir des segments du cache, chacun ayant son TTL.
+
+        Le segment live (/streams) expire vite, le segment archive (/videos) lentement :
+        seuls les segments absents sont relus depuis Helix. Comme pour la pagination,
+        les archives ne suivent les streams que lorsque ceux-ci sont épuisés.
+        Les segments effectivement relus depuis Helix sont ajoutés à `refreshed`.
+        Returns None si le jeu est introuvable.
+        """
+        live = segments.get(LIVE_SEGMENT)
+        archive = segments.get(ARCHIVE_SEGMENT)
+        headers = None
+        ttl_key = self._ttl_key(game_name, filters.language)
+        game = (live or archive).game if (live or archive) else None
+
+        if live:
+            logger.info(f"Cache hit (live) for game: {game_name}")
+        else:
+            logger.info(f"Cache miss (live) for game: {game_name}, fetching /streams")
+            headers = await self._get_headers()
+            if not game:
+                game = await self._find_game(game_name, headers)
+                if not game:
+                    logger.warning(f"No game found for: {game_name}")
+                    return None
+            live = await self._fetch_segment(game_name, game, "streams", headers, filters.language)
+            if live is None:
+                # Échec de /streams : on sert les archives sans mettre le segment en cache
+                live = SearchRecord(game_name, game, [], datetime.utcnow(), {"cursor": None})
+            else:
+                if refreshed is not None:
+                    refreshed.add(LIVE_SEGMENT)
+                if use_cache:
+                    ttl = live_ttl_policy.observe(ttl_key, live.videos)
+                    await self.twitch_repository.save_cached_segment(
+                        game_name, LIVE_SEGMENT, live, ttl, filters.language
+                    )
+
+        if not live.pagination.get("cursor"):
+            if archive:
+                logger.info(f"Cache hit (archive) for game: {game_name}")
+            else:
+                logger.info(f"Cache miss (archive) for game: {game_name}, fetching /videos")
+                headers = headers or await self._get_headers()
+                archive = await self._fetch_segment(game_name, live.game, "videos", headers, filters.language)
+                if archive and refreshed is not None:
+                    refreshed.add(ARCHIVE_SEGMENT)
+                if archive and use_cache:
+                    ttl = archive_ttl_policy.observe(ttl_key, archive.videos)
+                    await self.twitch_repository.save_cached_segment(
+                        game_name, ARCHIVE_SEGMENT, archive, ttl, filters.language
+                    )
+
+        return self._merge_segments(live, archive, filters.language)
+
+    async def _refresh_tiered_result(
+        self,
+        game_name: str,
+        filters: SearchFilters,
+        segments: dict
+    ) -> Optional[SearchRecord]:
+        """
+        `_get_tiered_result` sous le verrou de rafraîchissement de la flotte.
+
+        Si un autre worker rafraîchit déjà ce jeu, on sert les segments expirés
+        encore en base, sinon on relit le cache une fois le rafraîchissement notifié.
+        Le résultat peut être partagé entre requêtes concurrentes : il est recopié.
+        """
+        language = filters.language
+
+        async def reload() -> Optional[SearchRecord]:
+            fresh = await self.twitch_repository.get_cached_segments(game_name, language)
+            if LIVE_SEGMENT not in fresh:
+                return None
+            return await self._get_tiered_result(game_name, filters, fresh, use_cache=True)
+
+        async def stale() -> Optional[SearchRecord]:
+            expired = await self.twitch_repository.get_stale_segments(game_name, language)
+            if LIVE_SEGMENT not in expired:
+                return None
+            logger.info(f"Serving stale cache for game: {game_name} (refresh in progress)")
+            return self._merge_segments(expired[LIVE_SEGMENT], expired.get(ARCHIVE_SEGMENT), language)
+
+        result = await refresh_flight.run(
+            self._ttl_key(game_name, language),
+            fetch=lambda: self._get_tiered_result(game_name, filters, segments, use_cache=True),
+            reload=reload,
+            stale=stale,
+            notify_key=segment_key(game_name, language, LIVE_SEGMENT)
+        )
+        if result is None:
+            return None
+        return result.with_videos(list(result.videos), dict(result.pagination))
+
+    @staticmethod
+    def _ttl_key(game_name: str, language: Optional[str]) -> str:
+        return f"{normalize_query(game_name)}:{language or ''}"
+
+    async def warm_game(self, game_name: str, horizon: int) -> bool:
+        """
+        Relit depuis Helix les segments du cache d'un jeu absents ou expirant dans
+        moins de `horizon` secondes, pour que les recherches suivantes restent des hits.
+        `game_name` est la forme normalisée du classement de popularité, celle des clés du cache.
+        Returns True si au moins un segment a été relu depuis Helix.
+        """
+        expirations = await self.twitch_repository.get_segment_expirations(game_name)
+        deadline = datetime.utcnow() + timedelta(seconds=horizon)
+        expiring = {segment for segment, expires_at in expirations.items() if expires_at <= deadline}
+        if expirations and not expiring:
+            return False
+
+        segments = await self.twitch_repository.get_cached_segments(game_name)
+        fresh = {segment: record for segment, record in segments.items() if segment not in expiring}
+        refreshed = set()
+        await self._get_tiered_result(game_name, SearchFilters(), fresh, use_cache=True, refreshed=refreshed)
+        return bool(refreshed)
+
+    async def _fetch_segment(
+        self,
+        game_name: str,
+        game: GameRecord,
+        source: str,
+        headers: dict,
+        language: Optional[str] = None
+    ) -> Optional[SearchRecord]:
+        """Lit la première page Helix d'une source. Returns None en cas d'erreur."""
+        # Horodatage pris avant l'appel : il versionne l'entrée du cache
+        fetched_at = datetime.utcnow()
+        try:
+            videos, next_cursor = await self._fetch_page(
+                source=source,
+                game_id=game.id,
+                cursor=None,
+                headers=headers,
+                language=language
+            )
+        except DeadlineExceeded as e:
+            logger.warning(f"[Twitch API] {source} skipped: {str(e)}")
+            return None
+        except Exception as e:
+            logger.error(f"[Twitch API Error] Error fetching {source}: {str(e)}")
+            return None
+        return SearchRecord(
+            game_name=game_name,
+            game=game,
+            videos=videos,
+            last_updated=fetched_at,
+            pagination={"cursor": next_cursor}
+        )
+
+    @staticmethod
+    def _merge_segments(
+        live: SearchRecord,
+        archive: Optional[SearchRecord],
+        language: Optional[str] = None
+    ) -> SearchRecord:
+        """
+        Fusionne les segments live et archive ; la suite est lue depuis le segment non épuisé.
+        Les archives ne suivent que des streams épuisés : un segment archive en cache
+        est ignoré tant que le segment live a encore un curseur.
+        """
+        videos = list(live.videos)
+        last_updated = live.last_updated
+        pagination = {"source": "streams", "cursor": live.pagination.get("cursor")}
+        if archive and not pagination["cursor"]:
+            seen_ids = {video.id for video in videos}
+            videos += [video for video in archive.videos if video.id not in seen_ids]
+            last_updated = min(last_updated, archive.last_updated)
+            archive_cursor = archive.pagination.get("cursor")
+            pagination = {"source": "videos" if archive_cursor else None, "cursor": archive_cursor}
+        elif not pagination["cursor"]:
+            # Archives non lues (échec /videos) : on les laissera à la pagination
+            pagination = {"source": "videos", "cursor": None}
+        return SearchRecord(
+            game_name=live.game_name,
+            game=live.game,
+            videos=videos,
+            last_updated=last_updated,
+            pagination={**pagination, "language": language},
+            snapshot_id=live.snapshot_id
+        )
+
+    async def _fetch_result(
+        self,
+        game_name: str,
+        filters: SearchFilters,
+        limit: int,
+        pagination: dict
+    ) -> Optional[SearchRecord]:
+        """
+        Interroge Helix (jeu puis streams/vidéos à partir de `pagination`).
+        Returns None si le jeu est introuvable.
+        """
+        headers = await self._get_headers()
+
+        game = await self._find_game(game_name, headers)
+        if not game:
+            logger.warning(f"No game found for: {game_name}")
+            return None
+
+        result = SearchRecord(
+            game_name=game_name,
+            game=game,
+            videos=[],
+            last_updated=datetime.utcnow(),
+            pagination={**pagination, "language": filters.language}
+        )
+        await self._extend(result, filters, limit, headers, max_pages=MAX_PAGES_PER_REQUEST)
+        return result
+
+    def _serve(
+        self,
+        snapshot: SearchRecord,
+        filters: SearchFilters,
+        offset: int,
+        limit: int,
+        scope: str
+    ) -> SearchRecord:
+        """Extrait la page demandée et précharge la suivante en tâche de fond."""
+        page = self._page(snapshot, filters, offset, limit, scope)
+        if snapshot.snapshot_id and self._has_more(snapshot):
+            target = offset + 2 * limit
+            if len(self._filtered(snapshot, filters)) < target:
+                snapshot_id = snapshot.snapshot_id
+                self.prefetcher.schedule(
+                    snapshot_id,
+                    lambda: self._prefetch(snapshot_id, filters, target)
+                )
+        return page
+
+    async def _prefetch(self, snapshot_id: str, filters: SearchFilters, target: int) -> None:
+        """Étend le snapshot jusqu'à `target` vidéos dans le budget de préchargement."""
+        # Relu depuis la base : le résultat servi peut être une copie plus courte (cache)
+        snapshot = await self.twitch_repository.get_snapshot(snapshot_id)
+        if snapshot and await self._extend(snapshot, filters, target, budget=self.prefetcher.budget):
+            await self.twitch_repository.update_snapshot(snapshot)
+            logger.debug(f"[Prefetch] Snapshot {snapshot.snapshot_id} extended to {len(snapshot.videos)} videos")
+
+    def _page(
+        self,
+        result: SearchRecord,
+        filters: SearchFilters,
+        offset: int,
+        limit: int,
+        scope: str
+    ) -> SearchRecord:
+        """
+        Filtre et trie l'ensemble du résultat, puis en extrait la page [offset, offset + limit).
+
+        Le curseur suivant pointe dans le snapshot tant qu'il reste des éléments,
+        ou que le snapshot peut encore être étendu depuis Helix ; il n'est valable
+        que pour la recherche `scope` (jeu et filtres de la requête). La page est
+        `partial` si elle est restée incomplète parce que l'échéance est passée ;
+        le drapeau n'est posé que sur la copie, propre à la requête en cours.
+        """
+        videos = self._filtered(result, filters)
+        end = offset + limit
+        next_cursor = None
+        if result.snapshot_id and (end < len(videos) or self._has_more(result)):
+            next_cursor = encode_cursor(result.snapshot_id, end, scope)
+        page = result.with_videos(videos[offset:end], {"cursor": next_cursor})
+        page.partial = deadline_expired() and len(videos) < end and self._has_more(result)
+        return page
+
+    @staticmethod
+    def _filtered(result: SearchRecord, filters: SearchFilters) -> List[VideoRecord]:
+        return apply_filters(result.videos, filters) if filters.is_active else result.videos
+
+    @staticmethod
+    def _next_source(pagination: dict) -> Optional[str]:
+        """
+        Prochaine source Helix à lire : "streams", "videos" ou None si épuisé.
+        Les résultats antérieurs aux snapshots n'ont qu'un curseur /streams.
+        """
+        if "source" in pagination:
+            return pagination["source"]
+        return "streams" if pagination.get("cursor") else None
+
+    def _has_more(self, result: SearchRecord) -> bool:
+        return (
+            self._next_source(result.pagination) is not None
+            and len(result.videos) < settings.SNAPSHOT_MAX_ITEMS
+        )
+
+    async def _extend(
+        self,
+        result: SearchRecord,
+        filters: SearchFilters,
+        target: int,
+        headers: Optional[dict] = None,
+        budget: Optional[RateBudget] = None,
+        max_pages: Optional[int] = None
+    ) -> bool:
+        """
+        Lit des pages Helix supplémentaires jusqu'à ce que le résultat filtré
+        contienne `target` vidéos : d'abord les streams en direct, puis les
+        archives. S'arrête au plus tard après `max_pages` pages, dès que le
+        `budget` éventuel est épuisé, ou à l'échéance de la requête.
+        Returns True si le résultat a été étendu.
+        """
+        pages = 0
+        seen_ids = {video.id for video in result.videos}
+        while len(self._filtered(result, filters)) < target and self._has_more(result):
+            if max_pages is not None and pages >= max_pages:
+                break
+            if budget and not budget.try_acquire():
+                logger.debug(f"[Prefetch] Budget exhausted for snapshot {result.snapshot_id}")
+                break
+            if headers is None:
+                headers = await self._get_headers()
+
+            source = self._next_source(result.pagination)
+            try:
+                videos, next_cursor = await self._fetch_page(
+                    source=source,
+                    game_id=result.game.id,
+                    cursor=result.pagination.get("cursor"),
+                    headers=headers,
+                    language=result.pagination.get("language")
+                )
+            except DeadlineExceeded as e:
+                logger.warning(f"[Twitch API] {source} page skipped: {str(e)}")
+                break
+            except Exception as e:
+                logger.error(f"[Twitch API Error] Error fetching {source}: {str(e)}")
+                break
+
+            result.videos.extend(video for video in videos if video.id not in seen_ids)
+            seen_ids.update(video.id for video in videos)
+            if videos and next_cursor:
+                result.pagination = {**result.pagination, "source": source, "cursor": next_cursor}
+            elif source == "streams":
+                # Plus de streams en direct : on enchaîne sur les archives
+                result.pagination = {**result.pagination, "source": "videos", "cursor": None}
+            else:
+                result.pagination = {**result.pagination, "source": None, "cursor": None}
+            pages += 1
+        return pages > 0
+
+    async def _get_catalog_result(
+        self,
+        game_name: str,
+        limit: int,
+        language: Optional[str] = None
+    ) -> Optional[SearchRecord]:
+        """
+        Construit un résultat depuis le catalogue ingéré, s'il est assez frais.
+
+        Le résultat couvre tout le catalogue du jeu (au plus `limit` vidéos) : le
+        snapshot qui en est tiré se pagine sans rappeler Helix.
+        """
+        game = await self.twitch_repository.find_game_by_name(game_name)
+        if not game:
+            return None
+
+        videos = await self.catalog_repository.find_videos(
+            game_id=game.id,
+            limit=limit,
+            max_age=settings.CATALOG_FRESHNESS,
+            language=language
+        )
+        if not videos:
+            return None
+
+        return SearchRecord(
+            game_name=game_name,
+            game=game,
+            videos=videos,
+            last_updated=datetime.utcnow(),
+            pagination={"source": None, "cursor": None, "language": language}
+        )
+
+    async def _seed_segments(self, game_name: str, result: SearchRecord, language: Optional[str]) -> None:
+        """
+        Met en cache un résultat du catalogue comme segments live et archive, pour
+        que les recherches suivantes soient servies par le cache (mémoire, disque)
+        et réutilisent le même snapshot.
+        """
+        ttl_key = self._ttl_key(game_name, language)
+        live = result.with_videos(
+            [video for video in result.videos if video.is_live], {"source": "streams", "cursor": None}
+        )
+        archive = result.with_videos(
+            [video for video in result.videos if not video.is_live], {"source": None, "cursor": None}
+        )
+        await self.twitch_repository.save_cached_segment(
+            game_name, LIVE_SEGMENT, live, live_ttl_policy.ttl_for(ttl_key), language
+        )
+        await self.twitch_repository.save_cached_segment(
+            game_name, ARCHIVE_SEGMENT, archive, archive_ttl_policy.ttl_for(ttl_key), language
+        )
+
+    async def _find_game(self, game_name: str, headers: dict) -> Optional[GameRecord]:
         """Recherche un jeu sur Twitch."""
         try:
-            logger.debug(f"[Twitch API] GET /search/categories - query={game_name}")
-            
-            response = await self.client.get(
-                f"{self.base_url}/search/categories",
+            response = await self.helix.get(
+                "/search/categories",
                 params={"query": game_name, "first": 1},
                 headers=headers
             )
-            
-            logger.debug(f"[Twitch API] GET /search/categories - Status: {response.status_code}")
-            
             response.raise_for_status()
-            data = response.json()
+            games = decode_game_page(response.content)
             
-            if not data.get("data"):
+            if not games:
                 logger.warning(f"[Twitch API] No game found for query: {game_name}")
                 return None
                 
-            game = TwitchGame(**data["data"][0])
+            game = games[0]
             await self.twitch_repository.save_game(game)
             return game
             
+        except DeadlineExceeded:
+            # Pas de réponse à temps n'est pas "jeu introuvable" : la recherche est partielle
+            raise
         except Exception as e:
             logger.error(f"[Twitch API Error] Error finding game: {str(e)}")
             return None
 
-    async def _fetch_videos(
+    async def _fetch_page(
         self,
+        source: str,
         game_id: str,
-        limit: int,
         cursor: Optional[str],
-        headers: dict
-    ) -> Tuple[List[TwitchVideo], dict]:
-        """Récupère les streams et vidéos pour un jeu."""
-        all_videos = []
-        seen_ids = set()
-        pagination = {"cursor": None}
-
-        # 1. Récupérer les streams en direct
-        try:
-            stream_params = {"game_id": game_id, "first": min(100, limit)}
-            if cursor:
-                stream_params["after"] = cursor
-
-            logger.debug(f"[Twitch API] GET /streams - Params: {stream_params}")
-
-            stream_response = await self.client.get(
-                f"{self.base_url}/streams",
-                params=stream_params,
-                headers=headers
-            )
-            
-            logger.debug(f"[Twitch API] GET /streams - Status: {stream_response.status_code}")
-            
-            stream_response.raise_for_status()
-            stream_data = stream_response.json()
-
-            for stream in stream_data.get("data", []):
-                if stream["id"] not in seen_ids and len(all_videos) < limit:
-                    video = TwitchVideo(
-                        id=stream["id"],
-                        title=stream["title"],
-                        thumbnail_url=stream["thumbnail_url"],
-                        user_name=stream["user_name"],
-                        game_id=stream["game_id"],
-                        type="live",
-                        view_count=stream["viewer_count"],
-                        language=stream["language"],
-                        created_at=stream["started_at"],
-                        url=f"https://www.twitch.tv/{stream.get('user_login', stream['user_name']).lower()}",
-                        duration="live"
-                    )
-                    all_videos.append(video)
-                    seen_ids.add(stream["id"])
-
-            pagination = {"cursor": stream_data.get("pagination", {}).get("cursor")}
-
-        except Exception as e:
-            logger.error(f"[Twitch API Error] Error fetching streams: {str(e)}")
-
-        # 2. Si on n'a pas atteint la limite, ajouter des vidéos archivées
-        if len(all_videos) < limit:
-            try:
-                remaining_limit = limit - len(all_videos)
-                video_params = {
-                    "game_id": game_id,
-                    "first": remaining_limit,
-                    "type": "archive"
-                }
-
-                logger.debug(f"[Twitch API] GET /videos - Params: {video_params}")
-
-                video_response = await self.client.get(
-                    f"{self.base_url}/videos",
-                    params=video_params,
-                    headers=headers
-                )
-                
-                logger.debug(f"[Twitch API] GET /videos - Status: {video_response.status_code}")
-                
-                video_response.raise_for_status()
-                video_data = video_response.json()
-
-                for video in video_data.get("data", []):
-                    if video["id"] not in seen_ids and len(all_videos) < limit:
-                        video_obj = TwitchVideo(
-                            id=video["id"],
-                            title=video["title"],
-                            thumbnail_url=video["thumbnail_url"],
-                            user_name=video["user_name"],
-                            game_id=game_id,
-                            type="archive",
-                            view_count=video.get("view_count"),
-                            language=video.get("language", ""),
-                            created_at=video.get("created_at", ""),
-                            url=video.get("url", ""),
-                            duration=video.get("duration", "")
-                        )
-                        all_videos.append(video_obj)
-                        seen_ids.add(video["id"])
-
-            except Exception as e:
-                logger.error(f"[Twitch API Error] Error fetching archived videos: {str(e)}")
+        headers: dict,
+        language: Optional[str] = None
+    ) -> Tuple[List[VideoRecord], Optional[str]]:
+        """Récupère une page Helix /streams ou /videos (archives) pour un jeu."""
+        params = {"game_id": game_id, "first": HELIX_PAGE_SIZE}
+        if source == "videos":
+            params["type"] = "archive"
+        if cursor:
+            params["after"] = cursor
+        if language:
+            params["language"] = language
 
-        return all_videos, pagination
+        response = await self.helix.get(f"/{source}", params=params, headers=headers)
+        response.raise_for_status()
+        # /videos ne renvoie pas de game_id : celui de la requête est reporté
+        return decode_video_page(response.content, game_id if source == "videos" else None)
 
-    def _empty_result(self, game_name: str) -> TwitchSearchResult:
+    def _empty_result(self, game_name: str, partial: bool = False) -> SearchRecord:
         """Crée un résultat vide."""
-        return TwitchSearchResult(
+        return SearchRecord(
             game_name=game_name,
             game=None,
             videos=[],
-            total_count=0,
             last_updated=datetime.utcnow(),
-            pagination={"cursor": None}
+            pagination={"cursor": None},
+            partial=partial
         ) 
\ No newline at end of file
@@ -0,0 +1,54 @@
+import logging
+from typing import Optional
+
+from backend.app.cache.popularity import PopularityTracker, popularity_tracker
+from backend.app.config import settings
+from backend.app.redis_client import redis_manager
+from backend.app.services.twitch_service import TwitchService
+
+logger = logging.getLogger(__name__)
+
+
+class CacheWarmingService:
+    """
+    Préchauffage du cache de recherche pour les jeux les plus demandés.
+
+    Chaque worker publie régulièrement sa popularité locale (`sync_popularity`) ;
+    chaque passe (`run_once`) rafraîchit les segments du cache des `WARMING_TOP_K`
+    premiers jeux du classement global qui expireraient avant la passe suivante.
+    """
+
+    def __init__(
+        self,
+        twitch_service: TwitchService,
+        tracker: Optional[PopularityTracker] = None
+    ):
+        self.twitch_service = twitch_service
+        self.tracker = tracker or popularity_tracker
+        self.top_k = settings.WARMING_TOP_K
+        self.interval = settings.WARMING_INTERVAL
+        # Marge : un segment expirant avant la fin de la passe suivante est rafraîchi
+        self.horizon = 2 * self.interval
+
+    async def sync_popularity(self) -> None:
+        """Publie et agrège le classement de popularité entre workers (tous les workers)."""
+        try:
+            await self.tracker.sync(redis_manager.get_client(), ttl=10 * self.interval)
+        except Exception as e:
+            logger.warning(f"[Warming] Popularity sync failed, using local ranking: {str(e)}")
+
+    async def run_once(self) -> int:
+        """
+        Exécute une passe de préchauffage (un seul worker, sur le classement global).
+        Returns the number of games refreshed from Helix.
+        """
+        warmed = 0
+        for game_name, _ in self.tracker.top(self.top_k):
+            try:
+                if await self.twitch_service.warm_game(game_name, self.horizon):
+                    warmed += 1
+            except Exception as e:
+                logger.error(f"[Warming] Error warming {game_name}: {str(e)}")
+        if warmed:
+            logger.info(f"[Warming] {warmed} games refreshed")
+        return warmed
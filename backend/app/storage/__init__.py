@@ -0,0 +1,36 @@
+"""
+Backends de stockage des repositories, choisis par STORAGE_BACKEND.
+
+- "mongodb" (défaut) : une collection par espace de noms, expiration par index TTL ;
+- "redis" : documents partagés par la flotte dans Redis (REDIS_URL) ;
+- "sqlite" : un fichier local (STORAGE_PATH), partagé par les workers d'un hôte ;
+- "memory" : en mémoire du processus (tests, benchmarks, un seul worker).
+
+Tous implémentent `StorageBackend` : des documents par clé, avec durée de vie et
+version. Les repositories et la file d'écritures différées ne dépendent que de
+cette interface.
+"""
+from backend.app.storage.base import StorageBackend, StorageError, Write, storage_key
+
+BACKENDS = ("mongodb", "redis", "sqlite", "memory")
+
+
+async def open_store(backend: str, path: str = "", url: str = "") -> StorageBackend:
+    """Ouvre le backend "memory", "sqlite" (fichier `path`) ou "redis" (`url`)."""
+    if backend == "memory":
+        from backend.app.storage.memory import MemoryBackend
+        return MemoryBackend()
+    if backend == "sqlite":
+        from backend.app.storage.sqlite import SQLiteBackend
+        return SQLiteBackend(path)
+    if backend == "redis":
+        import redis.asyncio as redis
+        from backend.app.storage.redis import RedisBackend
+
+        client = redis.from_url(url)
+        await client.ping()
+        return RedisBackend(client)
+    raise ValueError(f"Unknown storage backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+
+
+__all__ = ["BACKENDS", "StorageBackend", "StorageError", "Write", "open_store", "storage_key"]
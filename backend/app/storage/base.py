@@ -0,0 +1,164 @@
+"""
+Interface de stockage des repositories : des documents rangés par clé.
+
+Chaque backend (MongoDB, Redis, SQLite, mémoire) ne fournit que ce dont les
+repositories ont besoin, sans langage de requête :
+
+- lecture d'un ou plusieurs documents par clé, ou de tous ceux dont la clé
+  commence par un préfixe (segments d'un jeu, vidéos du catalogue d'un jeu) ;
+- écritures par lot (`write`) : remplacement complet ou fusion de champs
+  (chemins pointés), avec une durée de vie et une version optionnelles ;
+- suppression par clé ou par préfixe ;
+- `claim`/`release` : un détenteur à la fois pour une clé, avec expiration
+  (leases des jobs planifiés).
+
+Un document expiré n'est plus jamais lu ; sa suppression effective est laissée
+au backend. Une écriture versionnée est ignorée si le document stocké porte
+déjà une version égale ou plus récente : c'est ce qui écarte les écritures
+périmées. Les erreurs d'un backend sont levées en `StorageError`.
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+Document = Dict[str, Any]
+
+# État stocké d'une clé : document, version, échéance (secondes epoch)
+Stored = Tuple[Document, Optional[int], Optional[float]]
+
+
+class StorageError(Exception):
+    """Erreur d'un backend de stockage."""
+
+
+@dataclass
+class Write:
+    """
+    Une écriture d'un lot sur la clé `key`.
+
+    Avec `document`, le document est remplacé et expire après `ttl` secondes
+    (jamais si None). Sinon `fields` ({chemin pointé: valeur}) est fusionné dans
+    le document existant, dont l'échéance ne change que si `ttl` est donné ; sans
+    document existant, il est créé seulement si `upsert`.
+    """
+    key: str
+    document: Optional[Document] = None
+    fields: Optional[Document] = None
+    ttl: Optional[float] = None
+    version: Optional[int] = None
+    upsert: bool = False
+
+
+def storage_key(*parts: Optional[str]) -> str:
+    """Clé composée ("minecraft", None, "live" -> "minecraft\\t\\tlive"), interrogeable par préfixe."""
+    return "\t".join(part or "" for part in parts)
+
+
+def set_path(document: Document, path: str, value: Any) -> None:
+    """Applique la valeur d'un chemin pointé ("result.snapshot_id") à un document."""
+    *parents, leaf = path.split(".")
+    for part in parents:
+        document = document.setdefault(part, {})
+    document[leaf] = value
+
+
+def is_newer(stored_version: Optional[int], version: Optional[int]) -> bool:
+    """True si une écriture de version `version` peut remplacer `stored_version`."""
+    return version is None or stored_version is None or stored_version < version
+
+
+def resolve(write: Write, current: Optional[Stored], now: float) -> Optional[Stored]:
+    """
+    Nouvel état d'une clé après `write`, à partir de son état vivant `current`
+    (dont le document est modifié sur place). Pour les backends qui appliquent
+    les écritures eux-mêmes (mémoire, SQLite, Redis).
+    Returns None si l'écriture est ignorée (version périmée, mise à jour sans document).
+    """
+    if current is not None and not is_newer(current[1], write.version):
+        return None
+    expires = now + write.ttl if write.ttl is not None else None
+    if write.document is not None:
+        return write.document, write.version, expires
+    if current is None:
+        if not write.upsert:
+            return None
+        document, version = {}, None
+    else:
+        document, version, current_expires = current
+        if write.ttl is None:
+            expires = current_expires
+    for path, value in (write.fields or {}).items():
+        set_path(document, path, value)
+    return document, write.version if write.version is not None else version, expires
+
+
+class StorageBackend(ABC):
+    """
+    Stockage de documents par espace de noms (`namespace`) et par clé.
+
+    Les backends qui gèrent eux-mêmes l'expiration (index TTL) la préparent
+    dans `initialize`.
+    """
+
+    async def initialize(self, namespace: str) -> None:
+        """Prépare un espace de noms (index, expiration). Idempotent."""
+
+    @abstractmethod
+    async def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Document]:
+        """Documents vivants des clés `keys` (les clés absentes ou expirées sont omises)."""
+
+    async def get(self, namespace: str, key: str) -> Optional[Document]:
+        return (await self.get_many(namespace, [key])).get(key)
+
+    @abstractmethod
+    async def scan(self, namespace: str, prefix: str = "") -> List[Tuple[str, Document]]:
+        """Documents vivants dont la clé commence par `prefix`, par clé croissante."""
+
+    @abstractmethod
+    async def write(self, namespace: str, writes: Sequence[Write]) -> int:
+        """
+        Applique un lot d'écritures, dans l'ordre, en une opération du backend.
+        Returns the number of writes applied (les écritures ignorées ne comptent pas).
+        """
+
+    async def put(
+        self,
+        namespace: str,
+        key: str,
+        document: Document,
+        ttl: Optional[float] = None,
+        version: Optional[int] = None
+    ) -> bool:
+        """Remplace le document `key`. Returns False si une version plus récente est stockée."""
+        return await self.write(namespace, [Write(key, document=document, ttl=ttl, version=version)]) == 1
+
+    async def update(
+        self,
+        namespace: str,
+        key: str,
+        fields: Document,
+        upsert: bool = False,
+        version: Optional[int] = None
+    ) -> bool:
+        """Fusionne `fields` dans le document `key`. Returns False si rien n'a été écrit."""
+        write = Write(key, fields=fields, upsert=upsert, version=version)
+        return await self.write(namespace, [write]) == 1
+
+    @abstractmethod
+    async def delete(self, namespace: str, keys: Iterable[str]) -> int:
+        """Supprime les clés `keys`. Returns the number of documents removed."""
+
+    @abstractmethod
+    async def delete_prefix(self, namespace: str, prefix: str) -> int:
+        """Supprime les clés commençant par `prefix` (toutes si vide). Returns the number removed."""
+
+    @abstractmethod
+    async def claim(self, namespace: str, key: str, owner: str, ttl: float) -> bool:
+        """Prend `key` pour `ttl` secondes si elle est libre, expirée ou déjà à `owner`."""
+
+    @abstractmethod
+    async def release(self, namespace: str, key: str, owner: str) -> None:
+        """Libère `key` si `owner` la détient."""
+
+    async def close(self) -> None:
+        """Ferme les connexions du backend."""
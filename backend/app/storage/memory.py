@@ -0,0 +1,93 @@
+"""
+Backend en mémoire : dictionnaires du processus, perdus à l'arrêt.
+
+Pour les tests, les benchmarks et un déploiement à un seul worker. Les
+documents sont gardés encodés en BSON : chaque lecture rend une copie, avec les
+mêmes types qu'une lecture MongoDB (dates naïves UTC à la milliseconde). Un lot
+d'écritures est appliqué sans aucun point de suspension : il est atomique pour
+les autres tâches.
+"""
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import bson
+
+from backend.app.storage.base import Document, StorageBackend, Write, resolve
+
+# Intervalle minimal entre deux purges des documents expirés
+PURGE_INTERVAL = 60.0
+
+
+class MemoryBackend(StorageBackend):
+    def __init__(self):
+        # Par espace de noms : clé -> (document BSON, version, échéance)
+        self._entries: Dict[str, Dict[str, Tuple[bytes, Optional[int], Optional[float]]]] = {}
+        self._purged_at = time.time()
+
+    def _live(self, namespace: str, key: str, now: float) -> Optional[Tuple[bytes, Optional[int], Optional[float]]]:
+        entry = self._entries.get(namespace, {}).get(key)
+        if entry is None or (entry[2] is not None and entry[2] <= now):
+            return None
+        return entry
+
+    async def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Document]:
+        now = time.time()
+        found = {}
+        for key in keys:
+            entry = self._live(namespace, key, now)
+            if entry is not None:
+                found[key] = bson.decode(entry[0])
+        return found
+
+    async def scan(self, namespace: str, prefix: str = "") -> List[Tuple[str, Document]]:
+        now = time.time()
+        return [
+            (key, bson.decode(raw))
+            for key, (raw, _, expires) in sorted(self._entries.get(namespace, {}).items())
+            if key.startswith(prefix) and (expires is None or expires > now)
+        ]
+
+    async def write(self, namespace: str, writes: Sequence[Write]) -> int:
+        now = time.time()
+        self._purge(now)
+        entries = self._entries.setdefault(namespace, {})
+        applied = 0
+        for write in writes:
+            entry = self._live(namespace, write.key, now)
+            current = (bson.decode(entry[0]), entry[1], entry[2]) if entry is not None else None
+            state = resolve(write, current, now)
+            if state is not None:
+                document, version, expires = state
+                entries[write.key] = (bson.encode(document), version, expires)
+                applied += 1
+        return applied
+
+    async def delete(self, namespace: str, keys: Iterable[str]) -> int:
+        entries = self._entries.get(namespace, {})
+        return sum(entries.pop(key, None) is not None for key in keys)
+
+    async def delete_prefix(self, namespace: str, prefix: str) -> int:
+        entries = self._entries.get(namespace, {})
+        return await self.delete(namespace, [key for key in entries if key.startswith(prefix)])
+
+    async def claim(self, namespace: str, key: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        entry = self._live(namespace, key, now)
+        if entry is not None and bson.decode(entry[0]).get("owner") != owner:
+            return False
+        self._entries.setdefault(namespace, {})[key] = (bson.encode({"owner": owner}), None, now + ttl)
+        return True
+
+    async def release(self, namespace: str, key: str, owner: str) -> None:
+        entry = self._entries.get(namespace, {}).get(key)
+        if entry is not None and bson.decode(entry[0]).get("owner") == owner:
+            del self._entries[namespace][key]
+
+    def _purge(self, now: float) -> None:
+        """Retire les documents expirés, au plus une fois par PURGE_INTERVAL."""
+        if now - self._purged_at < PURGE_INTERVAL:
+            return
+        self._purged_at = now
+        for entries in self._entries.values():
+            for key in [key for key, entry in entries.items() if entry[2] is not None and entry[2] <= now]:
+                del entries[key]
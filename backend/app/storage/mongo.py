@@ -0,0 +1,149 @@
+"""
+Backend MongoDB : une collection `store_<namespace>` par espace de noms.
+
+Chaque document est enveloppé : `{_id: clé, doc: {...}, version, expires}`.
+L'expiration est confiée à un index TTL sur `expires` ; comme sa purge passe
+toutes les 60 s, les lectures écartent aussi les documents échus. Un lot
+d'écritures est un seul `bulk_write` non ordonné, dont les filtres portent la
+condition de version : une écriture périmée ne trouve pas le document, et son
+upsert échoue sur la clé `_id` (compté comme ignoré). Le client Motor reste
+géré par `database.MongoDB`.
+"""
+import re
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
+
+from backend.app.storage.base import Document, StorageBackend, StorageError, Write
+
+_DUPLICATE_KEY = 11000
+
+
+def _live(now: datetime) -> Document:
+    return {"$or": [{"expires": None}, {"expires": {"$gt": now}}]}
+
+
+def _replaceable(write: Write, now: datetime) -> Document:
+    """
+    Filtre d'une écriture : un remplacement versionné ne trouve que les documents
+    expirés ou de version antérieure ; une fusion de champs, que les documents vivants.
+    """
+    query: Document = {"_id": write.key}
+    conditions = []
+    if write.version is not None:
+        conditions.append({"$or": [{"version": None}, {"version": {"$lt": write.version}}, {"expires": {"$lte": now}}]})
+    if write.document is None:
+        conditions.append(_live(now))
+    if conditions:
+        query["$and"] = conditions
+    return query
+
+
+class MongoBackend(StorageBackend):
+    def __init__(self, db, prefix: str = "store_"):
+        self.db = db
+        self.prefix = prefix
+
+    def _collection(self, namespace: str):
+        return self.db[self.prefix + namespace]
+
+    async def initialize(self, namespace: str) -> None:
+        try:
+            await self._collection(namespace).create_index("expires", expireAfterSeconds=0)
+        except PyMongoError as e:
+            raise StorageError(str(e)) from e
+
+    async def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Document]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        query = {"_id": {"$in": keys}, **_live(datetime.utcnow())}
+        try:
+            return {item["_id"]: item["doc"] async for item in self._collection(namespace).find(query)}
+        except PyMongoError as e:
+            raise StorageError(str(e)) from e
+
+    async def scan(self, namespace: str, prefix: str = "") -> List[Tuple[str, Document]]:
+        query = _live(datetime.utcnow())
+        if prefix:
+            # Regex ancrée sur un préfixe littéral : parcours d'intervalle de l'index _id
+            query["_id"] = {"$regex": f"^{re.escape(prefix)}"}
+        try:
+            cursor = self._collection(namespace).find(query).sort("_id", 1)
+            return [(item["_id"], item["doc"]) async for item in cursor]
+        except PyMongoError as e:
+            raise StorageError(str(e)) from e
+
+    def _operation(self, write: Write, now: datetime):
+        expires = now + timedelta(seconds=write.ttl) if write.ttl is not None else None
+        query = _replaceable(write, now)
+        if write.document is not None:
+            envelope = {"doc": write.document, "version": write.version, "expires": expires}
+            return ReplaceOne(query, envelope, upsert=True)
+        fields = {f"doc.{path}": value for path, value in (write.fields or {}).items()}
+        if write.version is not None:
+            fields["version"] = write.version
+        if write.ttl is not None:
+            fields["expires"] = expires
+        update: Document = {"$set": fields}
+        if write.upsert and write.ttl is None:
+            update["$setOnInsert"] = {"expires": None}
+        return UpdateOne(query, update, upsert=write.upsert)
+
+    async def write(self, namespace: str, writes: Sequence[Write]) -> int:
+        if not writes:
+            return 0
+        now = datetime.utcnow()
+        operations = [self._operation(write, now) for write in writes]
+        try:
+            result = await self._collection(namespace).bulk_write(operations, ordered=False)
+            return result.matched_count + result.upserted_count
+        except BulkWriteError as e:
+            details = e.details
+            if any(error.get("code") != _DUPLICATE_KEY for error in details.get("writeErrors", [])):
+                raise StorageError(str(e)) from e
+            # Doublons de clé : écritures périmées, les autres sont appliquées
+            return details.get("nMatched", 0) + details.get("nUpserted", 0)
+        except PyMongoError as e:
+            raise StorageError(str(e)) from e
+
+    async def delete(self, namespace: str, keys: Iterable[str]) -> int:
+        keys = list(keys)
+        if not keys:
+            return 0
+        try:
+            result = await self._collection(namespace).delete_many({"_id": {"$in": keys}})
+            return result.deleted_count
+        except PyMongoError as e:
+            raise StorageError(str(e)) from e
+
+    async def delete_prefix(self, namespace: str, prefix: str) -> int:
+        query = {"_id": {"$regex": f"^{re.escape(prefix)}"}} if prefix else {}
+        try:
+            result = await self._collection(namespace).delete_many(query)
+            return result.deleted_count
+        except PyMongoError as e:
+            raise StorageError(str(e)) from e
+
+    async def claim(self, namespace: str, key: str, owner: str, ttl: float) -> bool:
+        now = datetime.utcnow()
+        try:
+            # Upsert : échoue sur la clé _id si un autre détenteur a un lease encore valide
+            await self._collection(namespace).find_one_and_update(
+                {"_id": key, "$or": [{"doc.owner": owner}, {"expires": {"$lte": now}}]},
+                {"$set": {"doc": {"owner": owner}, "version": None, "expires": now + timedelta(seconds=ttl)}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+        except PyMongoError as e:
+            raise StorageError(str(e)) from e
+
+    async def release(self, namespace: str, key: str, owner: str) -> None:
+        try:
+            await self._collection(namespace).delete_one({"_id": key, "doc.owner": owner})
+        except PyMongoError as e:
+            raise StorageError(str(e)) from e
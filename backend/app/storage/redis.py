@@ -0,0 +1,168 @@
+"""
+Backend Redis : les documents partagés par toute la flotte, sans MongoDB.
+
+Par espace de noms :
+- `store:<namespace>:d:<clé>` : hash du document BSON (`doc`) et de sa version
+  (`v`) ; l'échéance est celle de la clé Redis (PEXPIREAT) ;
+- `store:<namespace>:keys` : sorted set des clés (score 0), lu par intervalle
+  lexicographique pour les lectures et suppressions par préfixe ; les clés
+  expirées qui y restent sont retirées quand un parcours les rencontre ;
+- `store:<namespace>:lease:<clé>` : leases de `claim`.
+
+Un lot d'écritures est optimiste : les clés du lot sont surveillées (WATCH),
+leurs versions lues en un pipeline, puis le lot est appliqué par un seul
+MULTI/EXEC, rejoué si un autre worker a écrit l'une de ces clés entre-temps.
+"""
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Iterable, List, Sequence, Tuple
+
+import bson
+
+from backend.app.locks import RedisLease
+from backend.app.storage.base import Document, StorageBackend, StorageError, Stored, Write, resolve
+
+try:
+    from redis.exceptions import RedisError, WatchError
+except ImportError:  # pragma: no cover - redis est une dépendance optionnelle
+    RedisError = WatchError = OSError
+
+
+class RedisBackend(StorageBackend):
+    """
+    `max_attempts` : tentatives d'un lot d'écritures concurrencé avant d'abandonner.
+    """
+
+    def __init__(self, client, prefix: str = "store:", max_attempts: int = 5):
+        self.client = client
+        self.prefix = prefix
+        self.max_attempts = max_attempts
+        self._leases: Dict[str, RedisLease] = {}
+
+    def _doc_key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}{namespace}:d:{key}"
+
+    def _index_key(self, namespace: str) -> str:
+        return f"{self.prefix}{namespace}:keys"
+
+    @asynccontextmanager
+    async def _errors(self) -> AsyncIterator[None]:
+        try:
+            yield
+        except (RedisError, OSError) as e:
+            raise StorageError(str(e)) from e
+
+    async def _read(self, namespace: str, keys: List[str]) -> Dict[str, Tuple[bytes, bytes]]:
+        """Document BSON et version brute des clés présentes."""
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.hmget(self._doc_key(namespace, key), "doc", "v")
+        values = await pipe.execute()
+        return {key: (doc, version) for key, (doc, version) in zip(keys, values) if doc is not None}
+
+    async def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Document]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        async with self._errors():
+            found = await self._read(namespace, keys)
+        return {key: bson.decode(doc) for key, (doc, _) in found.items()}
+
+    async def _keys(self, namespace: str, prefix: str) -> List[str]:
+        if not prefix:
+            members = await self.client.zrange(self._index_key(namespace), 0, -1)
+        else:
+            # 0xff n'apparaît jamais en UTF-8 : borne haute de toutes les clés du préfixe
+            start = b"[" + prefix.encode()
+            members = await self.client.zrangebylex(self._index_key(namespace), start, b"(" + prefix.encode() + b"\xff")
+        return [member.decode() for member in members]
+
+    async def scan(self, namespace: str, prefix: str = "") -> List[Tuple[str, Document]]:
+        async with self._errors():
+            keys = await self._keys(namespace, prefix)
+            found = await self._read(namespace, keys) if keys else {}
+            expired = [key for key in keys if key not in found]
+            if expired:
+                await self.client.zrem(self._index_key(namespace), *expired)
+        return [(key, bson.decode(found[key][0])) for key in keys if key in found]
+
+    async def write(self, namespace: str, writes: Sequence[Write]) -> int:
+        if not writes:
+            return 0
+        keys = list(dict.fromkeys(write.key for write in writes))
+        async with self._errors():
+            for _ in range(self.max_attempts):
+                async with self.client.pipeline(transaction=True) as pipe:
+                    await pipe.watch(*(self._doc_key(namespace, key) for key in keys))
+                    try:
+                        return await self._apply(pipe, namespace, keys, writes)
+                    except WatchError:
+                        continue
+        raise StorageError(f"{namespace}: write batch kept conflicting after {self.max_attempts} attempts")
+
+    async def _apply(self, pipe, namespace: str, keys: List[str], writes: Sequence[Write]) -> int:
+        now = time.time()
+        read = self.client.pipeline(transaction=False)
+        for key in keys:
+            read.hmget(self._doc_key(namespace, key), "doc", "v")
+            read.pttl(self._doc_key(namespace, key))
+        values = await read.execute()
+        states: Dict[str, Stored] = {}
+        for key, (doc, version), ttl in zip(keys, values[::2], values[1::2]):
+            if doc is not None:
+                states[key] = (bson.decode(doc), int(version) if version else None, now + ttl / 1000 if ttl >= 0 else None)
+
+        applied = 0
+        changed = set()
+        for write in writes:
+            state = resolve(write, states.get(write.key), now)
+            if state is not None:
+                states[write.key] = state
+                changed.add(write.key)
+                applied += 1
+
+        pipe.multi()
+        for key in changed:
+            document, version, expires = states[key]
+            doc_key = self._doc_key(namespace, key)
+            pipe.delete(doc_key)
+            pipe.hset(doc_key, mapping={"doc": bson.encode(document), **({"v": version} if version is not None else {})})
+            if expires is not None:
+                pipe.pexpireat(doc_key, int(expires * 1000))
+        if changed:
+            pipe.zadd(self._index_key(namespace), {key: 0 for key in changed})
+        await pipe.execute()
+        return applied
+
+    async def delete(self, namespace: str, keys: Iterable[str]) -> int:
+        keys = list(keys)
+        if not keys:
+            return 0
+        async with self._errors():
+            pipe = self.client.pipeline(transaction=True)
+            for key in keys:
+                pipe.delete(self._doc_key(namespace, key))
+            pipe.zrem(self._index_key(namespace), *keys)
+            results = await pipe.execute()
+        return sum(results[:-1])
+
+    async def delete_prefix(self, namespace: str, prefix: str) -> int:
+        async with self._errors():
+            keys = await self._keys(namespace, prefix)
+        return await self.delete(namespace, keys)
+
+    def _lease(self, namespace: str) -> RedisLease:
+        if namespace not in self._leases:
+            self._leases[namespace] = RedisLease(self.client, prefix=f"{self.prefix}{namespace}:lease:")
+        return self._leases[namespace]
+
+    async def claim(self, namespace: str, key: str, owner: str, ttl: float) -> bool:
+        async with self._errors():
+            return await self._lease(namespace).acquire(key, owner, ttl)
+
+    async def release(self, namespace: str, key: str, owner: str) -> None:
+        async with self._errors():
+            await self._lease(namespace).release(key, owner)
+
+    async def close(self) -> None:
+        await self.client.aclose()
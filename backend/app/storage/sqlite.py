@@ -0,0 +1,190 @@
+"""
+Backend SQLite : un fichier local en mode WAL, partageable entre les workers d'un hôte.
+
+Une seule table, indexée par (espace de noms, clé) : les lectures par clé et
+par préfixe sont des requêtes d'intervalle sur la clé primaire. Les documents
+sont stockés en BSON, avec leur version et leur échéance dans des colonnes ;
+la purge des documents expirés passe par un index sur l'échéance.
+
+Un lot d'écritures est une seule transaction `BEGIN IMMEDIATE` : la lecture des
+versions stockées et l'application du lot (un `executemany`) sont sérialisées
+entre processus. La connexion vit dans un thread dédié : l'attente du verrou
+d'un autre worker (jusqu'à `timeout`) ne bloque pas la boucle d'événements, et
+les appels de ce processus restent exécutés un par un, dans l'ordre.
+"""
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+import bson
+
+from backend.app.storage.base import Document, StorageBackend, StorageError, Stored, Write, resolve
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    doc BLOB NOT NULL,
+    version INTEGER,
+    expires REAL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_by_expiry ON entries (expires) WHERE expires IS NOT NULL;
+"""
+
+# Nombre max de paramètres d'une requête IN (...)
+_CHUNK = 500
+
+# Intervalle minimal entre deux purges des documents expirés
+PURGE_INTERVAL = 60.0
+
+# Borne haute d'un intervalle de préfixe : aucun caractère ne la dépasse
+_MAX_CHAR = "\U0010ffff"
+
+T = TypeVar("T")
+
+
+class SQLiteBackend(StorageBackend):
+    def __init__(self, path: str, timeout: float = 5.0):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        # Un seul thread pour la connexion : les appels sont sérialisés dans l'ordre d'arrivée
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-storage")
+        self._purged_at = time.time()
+        logger.info(f"SQLite storage opened at {path}")
+
+    async def _run(self, function: Callable[..., T], *args) -> T:
+        """Exécute `function(*args)` dans le thread de la connexion."""
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, partial(function, *args))
+        except sqlite3.Error as e:
+            raise StorageError(str(e)) from e
+
+    def _transaction(self, function: Callable[..., T], *args) -> T:
+        """`function(*args)` dans une transaction BEGIN IMMEDIATE (thread de la connexion)."""
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            result = function(*args)
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+        return result
+
+    def _get_many(self, namespace: str, keys: List[str], now: float) -> Dict[str, Tuple[bytes, Optional[int], Optional[float]]]:
+        found = {}
+        for start in range(0, len(keys), _CHUNK):
+            chunk = keys[start:start + _CHUNK]
+            rows = self._db.execute(
+                "SELECT key, doc, version, expires FROM entries"
+                f" WHERE namespace = ? AND key IN ({','.join('?' * len(chunk))})"
+                " AND (expires IS NULL OR expires > ?)",
+                (namespace, *chunk, now)
+            ).fetchall()
+            found.update((key, (doc, version, expires)) for key, doc, version, expires in rows)
+        return found
+
+    async def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Document]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        found = await self._run(self._get_many, namespace, keys, time.time())
+        return {key: bson.decode(entry[0]) for key, entry in found.items()}
+
+    def _scan(self, namespace: str, prefix: str, now: float) -> List[Tuple[str, bytes]]:
+        return self._db.execute(
+            "SELECT key, doc FROM entries WHERE namespace = ? AND key >= ? AND key < ?"
+            " AND (expires IS NULL OR expires > ?) ORDER BY key",
+            (namespace, prefix, prefix + _MAX_CHAR, now)
+        ).fetchall()
+
+    async def scan(self, namespace: str, prefix: str = "") -> List[Tuple[str, Document]]:
+        rows = await self._run(self._scan, namespace, prefix, time.time())
+        return [(key, bson.decode(doc)) for key, doc in rows]
+
+    def _write(self, namespace: str, writes: Sequence[Write], now: float) -> int:
+        stored = self._get_many(namespace, list({write.key for write in writes}), now)
+        states: Dict[str, Stored] = {
+            key: (bson.decode(doc), version, expires) for key, (doc, version, expires) in stored.items()
+        }
+        applied = 0
+        changed = set()
+        for write in writes:
+            state = resolve(write, states.get(write.key), now)
+            if state is not None:
+                states[write.key] = state
+                changed.add(write.key)
+                applied += 1
+        self._db.executemany(
+            "INSERT OR REPLACE INTO entries (namespace, key, doc, version, expires) VALUES (?, ?, ?, ?, ?)",
+            [(namespace, key, bson.encode(states[key][0]), states[key][1], states[key][2]) for key in changed]
+        )
+        if now - self._purged_at >= PURGE_INTERVAL:
+            self._purged_at = now
+            self._db.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+        return applied
+
+    async def write(self, namespace: str, writes: Sequence[Write]) -> int:
+        if not writes:
+            return 0
+        return await self._run(self._transaction, self._write, namespace, writes, time.time())
+
+    def _delete(self, namespace: str, keys: List[str]) -> int:
+        return self._db.executemany(
+            "DELETE FROM entries WHERE namespace = ? AND key = ?", [(namespace, key) for key in keys]
+        ).rowcount
+
+    async def delete(self, namespace: str, keys: Iterable[str]) -> int:
+        keys = list(keys)
+        if not keys:
+            return 0
+        return await self._run(self._delete, namespace, keys)
+
+    def _delete_prefix(self, namespace: str, prefix: str) -> int:
+        return self._db.execute(
+            "DELETE FROM entries WHERE namespace = ? AND key >= ? AND key < ?",
+            (namespace, prefix, prefix + _MAX_CHAR)
+        ).rowcount
+
+    async def delete_prefix(self, namespace: str, prefix: str) -> int:
+        return await self._run(self._delete_prefix, namespace, prefix)
+
+    def _claim(self, namespace: str, key: str, owner: str, ttl: float, now: float) -> bool:
+        entry = self._get_many(namespace, [key], now).get(key)
+        if entry is not None and bson.decode(entry[0]).get("owner") != owner:
+            return False
+        self._db.execute(
+            "INSERT OR REPLACE INTO entries (namespace, key, doc, version, expires) VALUES (?, ?, ?, NULL, ?)",
+            (namespace, key, bson.encode({"owner": owner}), now + ttl)
+        )
+        return True
+
+    async def claim(self, namespace: str, key: str, owner: str, ttl: float) -> bool:
+        return await self._run(self._transaction, self._claim, namespace, key, owner, ttl, time.time())
+
+    def _release(self, namespace: str, key: str, owner: str) -> None:
+        self._db.execute(
+            "DELETE FROM entries WHERE namespace = ? AND key = ? AND doc = ?",
+            (namespace, key, bson.encode({"owner": owner}))
+        )
+
+    async def release(self, namespace: str, key: str, owner: str) -> None:
+        await self._run(self._release, namespace, key, owner)
+
+    async def close(self) -> None:
+        await self._run(self._db.close)
+        self._executor.shutdown(wait=False)
+        logger.info("SQLite storage closed")
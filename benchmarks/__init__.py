@@ -0,0 +1,13 @@
+"""
+Benchmarks du backend.
+
+Lancer toute la suite avec `python -m benchmarks` depuis la racine du dépôt,
+ou un seul module avec `python -m benchmarks.bench_models`.
+"""
+import os
+
+# Les modules mesurés chargent la configuration à l'import : sans .env, on prend
+# celle des tests (aucun service n'est contacté, seules les URL sont requises)
+os.environ.setdefault("ENVIRONMENT", "test")
+os.environ.setdefault("MONGODB_URL", "mongodb://localhost:27017")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379")
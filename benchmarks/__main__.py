@@ -0,0 +1,8 @@
+import importlib
+import pkgutil
+
+import benchmarks
+
+for module_info in sorted(pkgutil.iter_modules(benchmarks.__path__), key=lambda m: m.name):
+    if module_info.name.startswith("bench_"):
+        importlib.import_module(f"benchmarks.{module_info.name}").main()
@@ -0,0 +1,54 @@
+"""
+Entrée du cache en documents imbriqués (BSON) vs payload compressé.
+
+Mesure la taille stockée d'un résultat de 100 vidéos, le coût d'écriture
+(encodage) et celui d'une lecture complète (BSON + décodage), ainsi que le coût
+d'une lecture différée dont les vidéos ne sont jamais consultées.
+"""
+from datetime import datetime
+
+import bson
+
+from backend.app.cache.codec import PayloadCodec, decode_result, zstandard
+from backend.app.models.records import SearchRecord
+from backend.app.services.twitch.mapping import decode_video_page
+from benchmarks.common import helix_payload, helix_streams, helix_videos, measure_time, report
+
+RECORD = SearchRecord(
+    game_name="just chatting",
+    game=None,
+    videos=(
+        decode_video_page(helix_payload(helix_streams(50)))[0]
+        + decode_video_page(helix_payload(helix_videos(50)), "509658")[0]
+    ),
+    last_updated=datetime.utcnow(),
+    pagination={"source": "videos", "cursor": "eyJiIjpudWxsLCJhIjp7Ik9mZnNldCI6MTAwfX0"},
+)
+
+
+def _row(name, encode):
+    stored = bson.encode({"result": encode(RECORD)})
+    return (
+        name,
+        f"{len(stored) / 1024:.1f}",
+        f"{measure_time(lambda: bson.encode({'result': encode(RECORD)})):.0f}",
+        f"{measure_time(lambda: decode_result(bson.decode(stored)['result']).videos[0]):.0f}",
+        f"{measure_time(lambda: decode_result(bson.decode(stored)['result'], lazy=True)):.0f}",
+    )
+
+
+def main():
+    rows = [_row("documents imbriqués", SearchRecord.to_document)]
+    for compression in ("zlib", "zstd"):
+        if compression == "zstd" and zstandard is None:
+            continue
+        rows.append(_row(compression, PayloadCodec(compression).encode))
+    report(
+        "Entrée de cache de 100 vidéos",
+        ("stockage", "taille (KiB)", "écriture (µs)", "lecture (µs)", "lecture différée (µs)"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Décodage d'une page Helix /streams de 100 éléments.
+
+Compare l'ancien chemin (`response.json()` puis construction champ par champ
+dans une boucle Python) à `decode_video_page` (parsing pydantic-core depuis
+les octets, puis construction des VideoRecord).
+"""
+import json
+from datetime import datetime
+
+from backend.app.models.records import VideoRecord
+from backend.app.services.twitch.mapping import decode_video_page
+from benchmarks.common import helix_payload, helix_streams, helix_videos, measure_time, report
+
+def parse_created_at(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+
+
+STREAMS = helix_payload(helix_streams(100))
+VIDEOS = helix_payload(helix_videos(100))
+
+
+def decode_streams_loop():
+    data = json.loads(STREAMS)
+    return [
+        VideoRecord(
+            id=stream["id"],
+            title=stream["title"],
+            thumbnail_url=stream["thumbnail_url"],
+            user_name=stream["user_name"],
+            game_id=stream["game_id"],
+            type="live",
+            view_count=stream["viewer_count"],
+            language=stream["language"],
+            created_at=parse_created_at(stream["started_at"]),
+            url=f"https://www.twitch.tv/{stream.get('user_login', stream['user_name']).lower()}",
+            duration="live",
+        )
+        for stream in data["data"]
+    ]
+
+
+def decode_videos_loop():
+    data = json.loads(VIDEOS)
+    return [
+        VideoRecord(
+            id=video["id"],
+            title=video["title"],
+            thumbnail_url=video["thumbnail_url"],
+            user_name=video["user_name"],
+            game_id="509658",
+            type="archive",
+            view_count=video.get("view_count"),
+            language=video.get("language", ""),
+            created_at=parse_created_at(video.get("created_at")),
+            url=video.get("url", ""),
+            duration=video.get("duration", ""),
+        )
+        for video in data["data"]
+    ]
+
+
+def main():
+    rows = [
+        ("/streams", "json() + boucle", f"{measure_time(decode_streams_loop):.0f}"),
+        ("/streams", "decode_video_page", f"{measure_time(lambda: decode_video_page(STREAMS)):.0f}"),
+        ("/videos", "json() + boucle", f"{measure_time(decode_videos_loop):.0f}"),
+        ("/videos", "decode_video_page", f"{measure_time(lambda: decode_video_page(VIDEOS, '509658')):.0f}"),
+    ]
+    report("Décodage d'une page Helix de 100 éléments", ("endpoint", "méthode", "durée (µs)"), rows)
+
+
+if __name__ == "__main__":
+    main()
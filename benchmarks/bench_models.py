@@ -0,0 +1,66 @@
+"""
+Modèles pydantic vs représentation interne à slots pour un résultat de 100 vidéos.
+
+Mesure la construction depuis un payload Helix, la mémoire retenue par résultat
+et le décodage d'une entrée de cache (document MongoDB).
+"""
+from datetime import datetime
+
+from backend.app.models.records import SearchRecord, VideoRecord
+from backend.app.models.twitch import TwitchSearchResult, TwitchVideo
+from backend.app.services.twitch.mapping import decode_video_page
+from benchmarks.common import helix_payload, helix_streams, helix_videos, measure_memory, measure_time, report
+
+# Champs déjà parsés : on compare uniquement le coût de construction
+FIELDS = [v.to_document() for v in decode_video_page(helix_payload(helix_streams(50)))[0]]
+FIELDS += [v.to_document() for v in decode_video_page(helix_payload(helix_videos(50)), "509658")[0]]
+
+
+def build_records():
+    return SearchRecord(
+        game_name="just chatting",
+        game=None,
+        videos=[VideoRecord(**fields) for fields in FIELDS],
+        last_updated=datetime.utcnow(),
+        pagination={"cursor": None},
+    )
+
+
+def build_pydantic():
+    videos = [TwitchVideo(**fields) for fields in FIELDS]
+    return TwitchSearchResult(
+        game_name="just chatting",
+        game=None,
+        videos=videos,
+        total_count=len(videos),
+        last_updated=datetime.utcnow(),
+        pagination={"cursor": None},
+    )
+
+
+def main():
+    document = build_records().to_document()
+
+    rows = [
+        (
+            "records (slots)",
+            f"{measure_time(build_records):.0f}",
+            f"{measure_memory(build_records) / 1024:.1f}",
+            f"{measure_time(lambda: SearchRecord.from_document(document)):.0f}",
+        ),
+        (
+            "pydantic",
+            f"{measure_time(build_pydantic):.0f}",
+            f"{measure_memory(build_pydantic) / 1024:.1f}",
+            f"{measure_time(lambda: TwitchSearchResult(**document)):.0f}",
+        ),
+    ]
+    report(
+        "Résultat de 100 vidéos",
+        ("représentation", "construction (µs)", "mémoire (KiB)", "décodage cache (µs)"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
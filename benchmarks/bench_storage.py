@@ -0,0 +1,99 @@
+"""
+Opérations des repositories sur les backends de stockage sans service externe.
+
+Pour les backends "memory" et "sqlite" (fichier temporaire) : écriture et
+lecture d'un segment du cache de recherche (100 vidéos, payload zlib), un lot
+de 200 segments (un flush de la file d'écritures différées) et l'upsert d'une
+page de 100 vidéos dans le catalogue. Les backends "mongodb" et "redis" ont la
+même interface mais demandent un serveur : ils ne sont pas mesurés ici.
+"""
+import asyncio
+import os
+import tempfile
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+from backend.app.cache.codec import PayloadCodec
+from backend.app.models.records import SearchRecord
+from backend.app.repositories.catalog_repository import CatalogRepository
+from backend.app.repositories.twitch_repository import TwitchRepository
+from backend.app.services.twitch.mapping import decode_video_page
+from backend.app.storage import Write, open_store, storage_key
+from benchmarks.common import helix_payload, helix_streams, helix_videos, measure_time, report
+
+VIDEOS = (
+    decode_video_page(helix_payload(helix_streams(50)))[0]
+    + decode_video_page(helix_payload(helix_videos(50)), "509658")[0]
+)
+RECORD = SearchRecord(
+    game_name="just chatting",
+    game=None,
+    videos=VIDEOS,
+    last_updated=datetime.utcnow(),
+    pagination={"cursor": None},
+)
+CODEC = PayloadCodec("zlib")
+
+
+def _segment_writes(count: int):
+    now = datetime.utcnow()
+    result = CODEC.encode(RECORD)
+    return [
+        Write(
+            storage_key(f"game {i}", None, "live"),
+            document={
+                "game_name": f"game {i}", "language": None, "segment": "live",
+                "generation": i, "result": result,
+                "created_at": now, "expires_at": now + timedelta(minutes=5),
+            },
+            ttl=300,
+            version=i
+        )
+        for i in range(count)
+    ]
+
+
+def _row(loop, backend: str, path: str):
+    store = loop.run_until_complete(open_store(backend, path=path))
+    repository = TwitchRepository(store, codec=CODEC)
+    catalog = CatalogRepository(store)
+    loop.run_until_complete(repository.initialize())
+    loop.run_until_complete(catalog.initialize())
+    run = loop.run_until_complete
+
+    def save():
+        run(repository.save_cached_segment(
+            "Just Chatting", "live", replace(RECORD, last_updated=datetime.utcnow()), ttl=300
+        ))
+
+    writes = _segment_writes(200)
+    row = (
+        backend,
+        f"{measure_time(save):.0f}",
+        f"{measure_time(lambda: run(repository.get_cached_segments('just chatting'))):.0f}",
+        f"{measure_time(lambda: run(store.write('search_cache', writes)), repeat=20) / 1000:.1f}",
+        f"{measure_time(lambda: run(catalog.bulk_upsert_videos(VIDEOS, 'Just Chatting')), repeat=50):.0f}",
+    )
+    run(store.close())
+    return row
+
+
+def main():
+    loop = asyncio.new_event_loop()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            rows = [
+                _row(loop, "memory", ""),
+                _row(loop, "sqlite", os.path.join(directory, "storage.db")),
+            ]
+    finally:
+        loop.close()
+    report(
+        "Backends de stockage (sans service externe)",
+        ("backend", "écriture segment (µs)", "lecture segments (µs)", "lot de 200 (ms)", "catalogue 100 vidéos (µs)"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
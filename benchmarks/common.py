@@ -0,0 +1,94 @@
+import gc
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+
+def helix_streams(count: int = 100) -> List[Dict[str, Any]]:
+    """Payload /streams Helix réaliste (champs et longueurs d'URL)."""
+    return [
+        {
+            "id": f"4{i:010d}",
+            "user_id": f"1{i:08d}",
+            "user_login": f"streamer_{i}",
+            "user_name": f"Streamer_{i}",
+            "game_id": "509658",
+            "game_name": "Just Chatting",
+            "type": "live",
+            "title": f"Stream numéro {i} - discussion et jeux avec la communauté !",
+            "viewer_count": 10_000 - i,
+            "started_at": "2024-03-25T10:00:00Z",
+            "language": "fr",
+            "thumbnail_url": f"https://static-cdn.jtvnw.net/previews-ttv/live_user_streamer_{i}-{{width}}x{{height}}.jpg",
+            "tag_ids": [],
+            "tags": ["Français", "FR"],
+            "is_mature": False,
+        }
+        for i in range(count)
+    ]
+
+
+def helix_videos(count: int = 100) -> List[Dict[str, Any]]:
+    """Payload /videos Helix (archives) réaliste."""
+    return [
+        {
+            "id": f"2{i:09d}",
+            "stream_id": f"4{i:010d}",
+            "user_id": f"1{i:08d}",
+            "user_login": f"streamer_{i}",
+            "user_name": f"Streamer_{i}",
+            "title": f"Rediffusion numéro {i} - la suite de l'aventure",
+            "description": "",
+            "created_at": "2024-03-24T18:00:00Z",
+            "published_at": "2024-03-24T18:00:00Z",
+            "url": f"https://www.twitch.tv/videos/2{i:09d}",
+            "thumbnail_url": f"https://static-cdn.jtvnw.net/cf_vods/d1m7jfoe9zdc1j/{i:032x}/thumb/thumb0-%{{width}}x%{{height}}.jpg",
+            "viewable": "public",
+            "view_count": 5_000 - i,
+            "language": "fr",
+            "type": "archive",
+            "duration": f"{i % 5}h{i % 60}m{i % 60}s",
+            "muted_segments": None,
+        }
+        for i in range(count)
+    ]
+
+
+def helix_payload(items: List[Dict[str, Any]], cursor: str = "eyJiIjpudWxsfQ") -> bytes:
+    """Corps de réponse Helix encodé, tel que reçu par httpx."""
+    return json.dumps({"data": items, "pagination": {"cursor": cursor}}).encode()
+
+
+def measure_time(fn: Callable[[], Any], repeat: int = 200) -> float:
+    """Durée moyenne d'un appel, en microsecondes."""
+    fn()
+    gc.collect()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1_000_000
+
+
+def measure_memory(fn: Callable[[], Any]) -> int:
+    """Mémoire retenue par l'objet renvoyé par `fn`, en octets."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def report(title: str, header: Sequence[str], rows: Sequence[Tuple[Any, ...]]) -> None:
+    """Affiche un tableau de résultats aligné."""
+    widths = [
+        max(len(str(cell)) for cell in column)
+        for column in zip(header, *rows)
+    ]
+    print(f"\n== {title}")
+    print("  ".join(str(cell).ljust(width) for cell, width in zip(header, widths)))
+    for row in rows:
+        print("  ".join(str(cell).ljust(width) for cell, width in zip(row, widths)))
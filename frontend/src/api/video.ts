@@ -1,10 +1,14 @@
 import axios from 'axios'
 import type { SearchResponse } from '@/types/video'
+import type { VideoFilters, SortOption } from '@/types/filters'
 
 interface SearchOptions {
   limit?: number
   use_cache?: boolean
   cursor?: string | null
+  // Filtres et tri appliqués par le backend : la réponse ne contient que ce qui sera affiché
+  filters?: VideoFilters
+  sort?: SortOption
 }
 
 const api = axios.create({
@@ -18,7 +22,7 @@ export const searchVideosByGame = async (game_name: string, options: SearchOptio
   console.log('Searching videos for game:', game_name, 'with options:', options)
   
   try {
-    const { limit = 100, use_cache = true, cursor = null } = options
+    const { limit = 100, use_cache = true, cursor = null, filters, sort } = options
     const encodedGameName = encodeURIComponent(game_name)
     
     const params: Record<string, any> = {
@@ -30,6 +34,18 @@ export const searchVideosByGame = async (game_name: string, options: SearchOptio
     if (cursor) {
       params.after = cursor
     }
+
+    if (filters) {
+      for (const [key, value] of Object.entries(filters)) {
+        if (value !== 'all') {
+          params[key] = value
+        }
+      }
+    }
+
+    if (sort) {
+      params.sort = sort
+    }
     
     const response = await api.get<SearchResponse>('/api/search/', { params })
 
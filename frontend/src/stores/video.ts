@@ -3,7 +3,6 @@ import { searchVideosByGame as searchApi } from '@/api/video'
 import type { Video, VideoState, VideoStoreActions, VideoStoreGetters, SearchParams } from '@/types/video'
 import type { SortOption, FilterChangeEvent } from '@/types/filters'
 import { DEFAULT_FILTERS, DEFAULT_SORT } from '@/types/filters'
-import { parseDuration } from '@/utils/duration'
 import { retry } from '@/utils/retry'
 import { useToast } from 'vue-toastification'
 
@@ -18,6 +17,9 @@ const FALLBACK_STRATEGIES = [
 const VIDEOS_PER_PAGE = 20
 const MAX_VIDEOS = 100
 
+// Seule la réponse de la dernière recherche lancée est appliquée (filtres changés en rafale)
+let latestRequest = 0
+
 export const useVideoStore = defineStore<string, VideoState, VideoStoreGetters, VideoStoreActions>('video', {
   state: () => ({
     videos: [] as Video[],
@@ -40,88 +42,8 @@ export const useVideoStore = defineStore<string, VideoState, VideoStoreGetters,
 
   getters: {
     filteredVideos(): Video[] {
-      let filtered = [...this.allVideos]
-
-      // Appliquer les filtres
-      if (this.filters.language !== 'all') {
-        filtered = filtered.filter(video => video.language === this.filters.language)
-      }
-
-      if (this.filters.date !== 'all') {
-        const now = new Date()
-        filtered = filtered.filter(video => {
-          const videoDate = new Date(video.created_at)
-          switch (this.filters.date) {
-            case 'today': {
-              return videoDate.toDateString() === now.toDateString()
-            }
-            case 'this_week': {
-              const weekAgo = new Date(now.getTime() - 7 * 24 * 60 * 60 * 1000)
-              return videoDate >= weekAgo
-            }
-            case 'this_month': {
-              const monthAgo = new Date(now.getTime())
-              monthAgo.setMonth(monthAgo.getMonth() - 1)
-              return videoDate >= monthAgo
-            }
-            default:
-              return true
-          }
-        })
-      }
-
-      if (this.filters.duration !== 'all') {
-        filtered = filtered.filter(video => {
-          const duration = parseDuration(video.duration)
-          switch (this.filters.duration) {
-            case 'short': {
-              return duration <= 900
-            }
-            case 'medium': {
-              return duration > 900 && duration <= 3600
-            }
-            case 'long': {
-              return duration > 3600
-            }
-            default:
-              return true
-          }
-        })
-      }
-
-      if (this.filters.views !== 'all') {
-        filtered = filtered.filter(video => {
-          switch (this.filters.views) {
-            case 'less_100': {
-              return video.view_count < 100
-            }
-            case '100_1000': {
-              return video.view_count >= 100 && video.view_count < 1000
-            }
-            case 'more_1000': {
-              return video.view_count >= 1000
-            }
-            default:
-              return true
-          }
-        })
-      }
-
-      // Appliquer le tri
-      filtered.sort((a, b) => {
-        switch (this.sortBy) {
-          case 'date':
-            return new Date(b.created_at).getTime() - new Date(a.created_at).getTime()
-          case 'views':
-            return b.view_count - a.view_count
-          case 'duration':
-            return parseDuration(b.duration) - parseDuration(a.duration)
-          default:
-            return 0
-        }
-      })
-
-      return filtered
+      // Filtres et tri sont appliqués par le backend (paramètres de /api/search/)
+      return this.allVideos
     },
 
     paginatedVideos(): Video[] {
@@ -142,14 +64,22 @@ export const useVideoStore = defineStore<string, VideoState, VideoStoreGetters,
         ...this.filters,
         [event.type]: event.value
       }
-      this.currentPage = 1
-      this.updateVisibleVideos()
+      this.refreshResults()
     },
 
     updateSort(sortBy: SortOption): void {
       this.sortBy = sortBy
+      this.refreshResults()
+    },
+
+    refreshResults(): void {
+      // Le curseur est lié aux filtres de la recherche : on repart de la première page
       this.currentPage = 1
-      this.updateVisibleVideos()
+      if (!this.currentGame) {
+        this.updateVisibleVideos()
+        return
+      }
+      this.searchVideos({ game_name: this.currentGame, refresh: true })
     },
 
     updateVisibleVideos(): void {
@@ -182,7 +112,7 @@ export const useVideoStore = defineStore<string, VideoState, VideoStoreGetters,
       return this.searchVideos({ game_name, reset: true })
     },
 
-    async searchVideos({ game_name, reset = false }: SearchParams): Promise<void> {
+    async searchVideos({ game_name, reset = false, refresh = false }: SearchParams): Promise<void> {
       // game_name here is assumed to be already trimmed if called from searchVideosByGame
       // If searchVideos can be called directly from elsewhere with a raw query,
       // trimming might be needed here too, or ensure all call sites trim.
@@ -192,9 +122,11 @@ export const useVideoStore = defineStore<string, VideoState, VideoStoreGetters,
       if (reset) {
         this.resetState()
       }
+      const firstPage = reset || refresh
+      const request = ++latestRequest
       
-      this.loading = reset
-      this.loadingMore = !reset
+      this.loading = firstPage
+      this.loadingMore = !firstPage
       this.error = null
       
       try {
@@ -202,8 +134,10 @@ export const useVideoStore = defineStore<string, VideoState, VideoStoreGetters,
         const response = await retry(
           () => searchApi(game_name, { 
             limit: MAX_VIDEOS,
-            cursor: reset ? null : this.nextCursor,
-            use_cache: reset
+            cursor: firstPage ? null : this.nextCursor,
+            use_cache: firstPage,
+            filters: this.filters,
+            sort: this.sortBy
           }),
           3,
           1000,
@@ -214,7 +148,20 @@ export const useVideoStore = defineStore<string, VideoState, VideoStoreGetters,
           }
         )
         
+        if (request !== latestRequest) {
+          return
+        }
+
         const newVideos = response.data.videos
+        if (refresh && (!newVideos || newVideos.length === 0)) {
+          // Aucun résultat pour ces filtres : pas de recherche alternative sur le nom du jeu
+          this.allVideos = []
+          this.nextCursor = null
+          this.hasMore = false
+          this.updateVisibleVideos()
+          toast.info('Aucune vidéo ne correspond à ces filtres')
+          return
+        }
         if (!newVideos || newVideos.length === 0) {
           this.handleNoVideosFound(game_name, reset, toast)
           return
@@ -226,7 +173,7 @@ export const useVideoStore = defineStore<string, VideoState, VideoStoreGetters,
         this.nextCursor = response.data.pagination?.cursor || null
         this.hasMore = !!this.nextCursor
         
-        if (reset) {
+        if (firstPage) {
           this.allVideos = newVideos
         } else {
           // Vérifier les doublons avant d'ajouter
@@ -243,10 +190,14 @@ export const useVideoStore = defineStore<string, VideoState, VideoStoreGetters,
           toast.success(`${newVideos.length} vidéos trouvées pour "${game_name}"`)
         }
       } catch (error) {
-        this.handleSearchError(error, game_name, toast)
+        if (request === latestRequest) {
+          this.handleSearchError(error, game_name, toast)
+        }
       } finally {
-        this.loading = false
-        this.loadingMore = false
+        if (request === latestRequest) {
+          this.loading = false
+          this.loadingMore = false
+        }
       }
     },
 
@@ -270,7 +221,9 @@ export const useVideoStore = defineStore<string, VideoState, VideoStoreGetters,
         const response = await retry(
           () => searchApi(modifiedGame, { 
             limit: MAX_VIDEOS,
-            use_cache: false 
+            use_cache: false,
+            filters: this.filters,
+            sort: this.sortBy
           }),
           2,
           1000
@@ -13,7 +13,9 @@ export interface Video {
   url: string
   view_count: number
   duration: string
+  duration_seconds?: number
   created_at: string
+  is_live?: boolean
   language: string
   thumbnail_url?: string | null
   description?: string | null
@@ -35,8 +37,8 @@ export interface SearchResponse {
 
 export interface VideoState {
   videos: Video[]
-  allVideos: Video[]  // Pour stocker tous les vidéos non filtrées
-  visibleVideos: Video[]  // Pour stocker les vidéos filtrées
+  allVideos: Video[]  // Vidéos chargées, déjà filtrées et triées par le backend
+  visibleVideos: Video[]  // Vidéos affichées (pages déjà parcourues)
   loading: boolean
   loadingMore: boolean
   error: string | null
@@ -56,6 +58,7 @@ export interface SearchParams {
   limit?: number
   cursor?: string | null
   reset?: boolean
+  refresh?: boolean  // Relance la première page du jeu courant (filtres ou tri modifiés)
 }
 
 export interface VideoStoreActions {
@@ -65,6 +68,7 @@ export interface VideoStoreActions {
   resetState(): void
   updateFilters(event: FilterChangeEvent): void
   updateSort(sortBy: SortOption): void
+  refreshResults(): void
   updateVisibleVideos(): void
   tryNextStrategy(originalGame: string): Promise<boolean>
   handleNoVideosFound(game_name: string, reset: boolean, toast: any): void
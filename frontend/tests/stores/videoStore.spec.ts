@@ -1,11 +1,17 @@
 import { describe, it, expect, beforeEach, vi } from 'vitest'
 import { setActivePinia, createPinia } from 'pinia'
 import { useVideoStore } from '../../src/stores/video'
-import axios from 'axios'
+
+const { searchApi } = vi.hoisted(() => ({ searchApi: vi.fn() }))
+vi.mock('@/api/video', () => ({ searchVideosByGame: searchApi }))
+vi.mock('vue-toastification', () => ({
+  useToast: () => ({ info: vi.fn(), success: vi.fn(), warning: vi.fn(), error: vi.fn() })
+}))
 
 describe('Video Store', () => {
   beforeEach(() => {
     setActivePinia(createPinia())
+    searchApi.mockReset()
   })
 
   it('initializes with default values', () => {
@@ -72,103 +78,35 @@ describe('Video Store', () => {
     expect(store.sortBy).toBe('date')
   })
 
-  describe('filteredVideos', () => {
-    let store: ReturnType<typeof useVideoStore>
-    const today = new Date()
-    const lastWeek = new Date(today)
-    lastWeek.setDate(today.getDate() - 7)
-    const lastMonth = new Date(today)
-    lastMonth.setMonth(today.getMonth() - 1)
-
-    const mockVideos = [
-      {
-        id: '1',
-        title: 'Video 1',
-        url: 'http://test.com/1',
-        user_name: 'User 1',
-        created_at: today.toISOString(),
-        duration: '10m',
-        view_count: 500,
-        language: 'fr'
-      },
-      {
-        id: '2', 
-        title: 'Video 2',
-        url: 'http://test.com/2',
-        user_name: 'User 2',
-        created_at: lastWeek.toISOString(),
-        duration: '2h',
-        view_count: 2000,
-        language: 'en'
-      },
-      {
-        id: '3',
-        title: 'Video 3',
-        url: 'http://test.com/3',
-        user_name: 'User 3',
-        created_at: lastMonth.toISOString(),
-        duration: '45m',
-        view_count: 50,
-        language: 'fr'
-      }
-    ]
-
-    beforeEach(() => {
-      store = useVideoStore()
-      store.videos = mockVideos
-    })
-
-    it('filters by duration', () => {
-      store.updateFilters({ duration: 'short' })
-      expect(store.filteredVideos.length).toBe(1)
-      expect(store.filteredVideos[0].id).toBe('1')
-
-      store.updateFilters({ duration: 'medium' })
-      expect(store.filteredVideos.length).toBe(1)
-      expect(store.filteredVideos[0].id).toBe('3')
-
-      store.updateFilters({ duration: 'long' })
-      expect(store.filteredVideos.length).toBe(1)
-      expect(store.filteredVideos[0].id).toBe('2')
-    })
-
-    it('filters by views', () => {
-      store.updateFilters({ views: 'less_100' })
-      expect(store.filteredVideos.length).toBe(1)
-      expect(store.filteredVideos[0].id).toBe('3')
-
-      store.updateFilters({ views: '100_1000' })
-      expect(store.filteredVideos.length).toBe(1)
-      expect(store.filteredVideos[0].id).toBe('1')
-
-      store.updateFilters({ views: 'more_1000' })
-      expect(store.filteredVideos.length).toBe(1)
-      expect(store.filteredVideos[0].id).toBe('2')
+  describe('server-side filters', () => {
+    const page = (ids: string[], cursor: string | null = null) => ({
+      data: { videos: ids.map(id => ({ id, title: `Video ${id}` })), pagination: { cursor } }
     })
 
-    it('filters by language', () => {
-      store.updateFilters({ language: 'fr' })
-      expect(store.filteredVideos.length).toBe(2)
-      expect(store.filteredVideos.map(v => v.id)).toContain('1')
-      expect(store.filteredVideos.map(v => v.id)).toContain('3')
+    it('sends filters and sort to the API and reloads the first page', async () => {
+      const store = useVideoStore()
+      searchApi.mockResolvedValueOnce(page(['1', '2'], 'snap_first'))
+      await store.searchVideosByGame('Minecraft')
 
-      store.updateFilters({ language: 'en' })
-      expect(store.filteredVideos.length).toBe(1)
-      expect(store.filteredVideos[0].id).toBe('2')
+      searchApi.mockResolvedValueOnce(page(['3']))
+      store.updateFilters({ type: 'duration', value: 'short' })
+      await vi.waitFor(() => expect(store.filteredVideos.map(v => v.id)).toEqual(['3']))
+
+      // Nouveaux filtres : première page, sans le curseur de la recherche précédente
+      expect(searchApi).toHaveBeenLastCalledWith('Minecraft', expect.objectContaining({
+        cursor: null,
+        filters: expect.objectContaining({ duration: 'short' }),
+        sort: 'date'
+      }))
+      expect(store.hasMore).toBe(false)
     })
 
-    it('sorts by date', () => {
-      store.updateSort('date')
-      expect(store.filteredVideos[0].id).toBe('1')
-      expect(store.filteredVideos[1].id).toBe('2')
-      expect(store.filteredVideos[2].id).toBe('3')
-    })
+    it('keeps the server order', async () => {
+      const store = useVideoStore()
+      searchApi.mockResolvedValueOnce(page(['2', '3', '1']))
+      await store.searchVideosByGame('Minecraft')
 
-    it('sorts by views', () => {
-      store.updateSort('views')
-      expect(store.filteredVideos[0].id).toBe('2')
-      expect(store.filteredVideos[1].id).toBe('1')
-      expect(store.filteredVideos[2].id).toBe('3')
+      expect(store.filteredVideos.map(v => v.id)).toEqual(['2', '3', '1'])
     })
   })
 
@@ -192,7 +130,7 @@ describe('Video Store', () => {
         }
       }
 
-      vi.spyOn(axios, 'get').mockResolvedValue(mockResponse)
+      searchApi.mockResolvedValue(mockResponse)
 
       await store.searchVideosByGame('Minecraft')
 
@@ -102,32 +102,11 @@ describe('Video Store', () => {
       store.videos = mockVideos
     })
 
-    it('should filter videos by date', () => {
-      store.updateFilters({ date: 'today' })
-      const filtered = store.filteredVideos
-      expect(filtered.length).toBe(1)
-      expect(filtered[0].id).toBe('1')
-    })
-
-    it('should filter videos by duration', () => {
-      store.updateFilters({ duration: 'short' })
-      const filtered = store.filteredVideos
-      expect(filtered.length).toBe(1)
-      expect(filtered[0].id).toBe('1')
-    })
-
-    it('should filter videos by views', () => {
-      store.updateFilters({ views: 'more_1000' })
-      const filtered = store.filteredVideos
-      expect(filtered.length).toBe(1)
-      expect(filtered[0].id).toBe('2')
-    })
-
-    it('should filter videos by language', () => {
-      store.updateFilters({ language: 'fr' })
-      const filtered = store.filteredVideos
-      expect(filtered.length).toBe(1)
-      expect(filtered[0].id).toBe('1')
+    it('returns the loaded videos as filtered and sorted by the backend', () => {
+      store.allVideos = mockVideos
+      store.updateFilters({ type: 'language', value: 'fr' })
+      // Pas de second filtrage côté client : la réponse du backend fait foi
+      expect(store.filteredVideos.map(v => v.id)).toEqual(['1', '2'])
     })
   })
 
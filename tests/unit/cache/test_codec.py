@@ -0,0 +1,93 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from backend.app.cache.codec import LazyVideos, PayloadCodec, build_codec, decode_result
+from backend.app.models.records import GameRecord, SearchRecord, VideoRecord
+
+
+def make_record(count=3):
+    videos = [
+        VideoRecord(
+            id=str(i),
+            user_name=f"Streamer{i}",
+            title=f"Title {i}",
+            thumbnail_url=f"http://thumb/{i}",
+            language="fr",
+            view_count=100 - i,
+            created_at=datetime(2024, 3, 25, 10, 0, 0, 250, tzinfo=timezone.utc),
+            type="archive",
+            duration="1h2m3s",
+            game_id="10",
+        )
+        for i in range(count)
+    ]
+    return SearchRecord(
+        game_name="game",
+        game=GameRecord(id="10", name="Game"),
+        videos=videos,
+        last_updated=datetime(2024, 3, 25, 12, 0),
+        pagination={"source": "videos", "cursor": "abc"},
+        snapshot_id="snap1",
+    )
+
+
+def test_compressed_round_trip():
+    record = make_record()
+    document = PayloadCodec("zlib").encode(record)
+
+    assert isinstance(document["payload"], bytes)
+    assert "videos" not in document
+    assert document["encoding"] == "zlib+rows1"
+    assert decode_result(document) == record
+
+
+def test_lazy_decode_only_on_access():
+    document = PayloadCodec().encode(make_record(5))
+    result = decode_result(document, lazy=True)
+
+    assert isinstance(result.videos, LazyVideos)
+    assert len(result.videos) == 5 and result.total_count == 5
+    assert not result.videos.is_decoded
+    assert result.pagination["cursor"] == "abc"
+
+    assert [video.id for video in result.videos] == ["0", "1", "2", "3", "4"]
+    assert result.videos.is_decoded
+
+
+def test_undecoded_payload_is_reused_on_rewrite():
+    codec = PayloadCodec()
+    document = codec.encode(make_record())
+    result = decode_result(document, lazy=True)
+
+    assert codec.encode(result)["payload"] == document["payload"]
+    assert not result.videos.is_decoded
+
+
+def test_nested_documents_are_still_read():
+    record = make_record()
+    assert decode_result(record.to_document(), lazy=True) == record
+
+
+def test_payload_with_other_fields_is_read_by_name():
+    import json
+    import zlib
+
+    payload = zlib.compress(json.dumps({
+        "fields": ["id", "user_name", "title", "thumbnail_url", "created_at"],
+        "rows": [["1", "Streamer", "Title", "http://thumb", 0]],
+    }).encode())
+    videos = decode_result({
+        "game_name": "game", "payload": payload, "encoding": "zlib+rows1",
+        "total_count": 1, "last_updated": datetime(2024, 3, 25),
+    }).videos
+
+    assert videos[0].created_at == datetime(1970, 1, 1, tzinfo=timezone.utc)
+    assert videos[0].url == "https://www.twitch.tv/streamer"
+
+
+def test_build_codec():
+    assert build_codec("none") is None
+    assert build_codec("zlib").compression == "zlib"
+    with pytest.raises(ValueError):
+        build_codec("lz4")
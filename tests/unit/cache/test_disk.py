@@ -0,0 +1,105 @@
+import sqlite3
+import time
+
+import pytest
+
+from backend.app.cache.disk import DiskCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = DiskCache()
+    assert cache.open(str(tmp_path / "cache.db"), max_bytes=10_000)
+    yield cache
+    cache.close()
+
+
+def test_closed_cache_is_a_no_op():
+    cache = DiskCache()
+    assert cache.get("key") is None
+    assert cache.set("key", b"value", ttl=60) is False
+
+
+def test_set_get_and_expiry(cache):
+    cache.set("fresh", b"value", ttl=60)
+    cache.set("expired", b"value", ttl=-1)
+
+    assert cache.get("fresh") == b"value"
+    assert cache.get("expired") is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_older_version_does_not_overwrite(cache):
+    assert cache.set("key", b"new", ttl=60, version=2)
+    assert cache.set("key", b"old", ttl=60, version=1) is False
+    assert cache.get("key") == b"new"
+
+
+def test_least_recently_used_entries_are_evicted(cache):
+    for i in range(4):
+        cache.set(f"key{i}", b"x" * 3000, ttl=60)
+        time.sleep(0.001)
+        # key0 reste la plus récemment utilisée
+        cache.get("key0")
+
+    assert cache.get("key0") is not None
+    assert cache.get("key1") is None
+    assert cache.stats()["bytes"] <= 10_000
+    assert cache.stats()["evictions"] >= 1
+
+
+def test_byte_count_follows_overwrites_and_deletes(cache):
+    cache.set("key", b"x" * 3000, ttl=60)
+    cache.set("key", b"x" * 3000, ttl=60)
+    assert cache.stats()["bytes"] == 3000
+
+    assert cache.replace_value("key", b"x" * 1000)
+    cache.set("other", b"x" * 500, ttl=60)
+    assert cache.stats()["bytes"] == 1500
+
+    cache.delete("key")
+    assert cache.stats()["bytes"] == 500
+    cache.delete_prefix("oth")
+    assert cache.stats()["bytes"] == 0
+    assert cache.stats()["evictions"] == 0
+
+
+def test_entries_survive_a_restart(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first = DiskCache()
+    first.open(path, max_bytes=10_000)
+    first.set("hot", b"value", ttl=60)
+    first.close()
+
+    restarted = DiskCache()
+    restarted.open(path, max_bytes=10_000, warm_items=10)
+    assert restarted.stats()["warmed"] == 1
+    assert restarted.get("hot") == b"value"
+    restarted.close()
+
+
+def test_delete_prefix(cache):
+    cache.set("search_cache\tgame\t\tlive", b"1", ttl=60)
+    cache.set("search_cache\tgame 2\t\tlive", b"2", ttl=60)
+
+    assert cache.delete_prefix("search_cache\tgame\t") == 1
+    assert cache.get("search_cache\tgame 2\t\tlive") == b"2"
+
+
+def test_busy_file_is_skipped_instead_of_blocking(cache):
+    cache.set("key", b"value", ttl=60)
+    # Un autre worker tient le verrou d'écriture du fichier
+    other = sqlite3.connect(cache.path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    try:
+        start = time.monotonic()
+        assert cache.set("other", b"value", ttl=60) is False
+        assert cache.delete("key") is False
+        # Les lectures ne sont pas bloquées par un écrivain (WAL)
+        assert cache.get("key") == b"value"
+        assert time.monotonic() - start < 1.0
+        assert cache.stats()["busy"] >= 2
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
+    assert cache.set("other", b"value", ttl=60)
@@ -0,0 +1,102 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+
+import pytest
+
+from backend.app.cache.invalidation import InvalidationBus
+from backend.app.cache.tinylfu import TinyLFUCache
+from backend.app.models.records import SearchRecord
+
+KEY = ("minecraft", None, "live")
+
+
+def make_result(fetched_at):
+    return SearchRecord("minecraft", None, [], fetched_at, {"cursor": None})
+
+
+@pytest.fixture
+def bus():
+    return InvalidationBus(memory=TinyLFUCache(1_000_000, sizeof=lambda record: 1000))
+
+
+class FakePubSub:
+    def __init__(self):
+        self.messages = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        pass
+
+    async def unsubscribe(self, channel):
+        pass
+
+    async def aclose(self):
+        pass
+
+    async def get_message(self, timeout):
+        try:
+            return await asyncio.wait_for(self.messages.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+def test_refresh_only_drops_older_copies(bus):
+    old = make_result(datetime(2024, 3, 25, 12, 0))
+    new = make_result(datetime(2024, 3, 25, 12, 1))
+    bus.memory.set(KEY, new, ttl=60)
+
+    bus.apply({"kind": "segment", "key": list(KEY), "version": old.generation})
+    assert bus.memory.peek(KEY) is new
+
+    bus.memory.set(KEY, old, ttl=60)
+    bus.apply({"kind": "segment", "key": list(KEY), "version": new.generation})
+    assert bus.memory.peek(KEY) is None
+    assert bus.is_stale(KEY, old.generation)
+    assert not bus.is_stale(KEY, new.generation)
+
+
+def test_duplicate_and_late_messages_are_ignored(bus):
+    event = {"kind": "game", "game": "minecraft", "version": 10}
+    bus.apply(event)
+    bus.apply(event)
+    bus.apply({**event, "version": 5})
+
+    assert bus.stats()["applied"] == 1
+    assert bus.stats()["ignored"] == 2
+
+
+@pytest.mark.asyncio
+async def test_game_invalidation_drops_entries_read_before(bus):
+    bus.memory.set(KEY, make_result(datetime.utcnow() - timedelta(seconds=1)), ttl=60)
+    bus.memory.set(("fortnite", None, "live"), make_result(datetime.utcnow()), ttl=60)
+
+    await bus.invalidate_game("Minecraft")
+
+    assert bus.memory.peek(KEY) is None
+    assert bus.memory.peek(("fortnite", None, "live")) is not None
+
+
+@pytest.mark.asyncio
+async def test_messages_from_other_workers_are_applied(bus):
+    pubsub = FakePubSub()
+    client = AsyncMock()
+    client.pubsub = lambda **kwargs: pubsub
+    await bus.start(client)
+    bus.memory.set(KEY, make_result(datetime(2024, 3, 25, 12, 0)), ttl=60)
+
+    await bus.invalidate_all()
+    sent = json.loads(client.publish.await_args.args[1])
+    assert sent["kind"] == "all" and "origin" in sent
+
+    bus.memory.set(KEY, make_result(datetime(2024, 3, 25, 12, 0)), ttl=60)
+    await pubsub.messages.put({
+        "type": "message",
+        "data": json.dumps({"kind": "segment", "key": list(KEY), "version": 2**62, "origin": "other:1"}),
+    })
+    for _ in range(10):
+        await asyncio.sleep(0)
+    await bus.stop()
+
+    assert bus.memory.peek(KEY) is None
+    assert bus.stats()["received"] == 1
@@ -0,0 +1,95 @@
+import pytest
+
+from backend.app.cache.popularity import CountMinSketch, PopularityTracker
+from backend.app.services.twitch.keys import normalize_query
+
+
+class FakeRedis:
+    """Sous-ensemble des commandes Redis utilisées par PopularityTracker.sync."""
+
+    def __init__(self):
+        self.hashes = {}
+
+    async def hset(self, key, mapping):
+        self.hashes[key] = {
+            field.encode(): value if isinstance(value, bytes) else value.encode()
+            for field, value in mapping.items()
+        }
+
+    async def expire(self, key, ttl):
+        return True
+
+    async def scan_iter(self, match):
+        for key in list(self.hashes):
+            yield key.encode()
+
+    async def hgetall(self, key):
+        return self.hashes[key.decode()]
+
+
+def test_normalize_query():
+    assert normalize_query("  League  of LEGENDS ") == "league of legends"
+
+
+def test_sketch_never_underestimates_and_round_trips():
+    sketch = CountMinSketch(width=64, depth=3)
+    for i in range(200):
+        sketch.add(f"game{i % 20}")
+
+    assert all(sketch.estimate(f"game{i}") >= 10 for i in range(20))
+    restored = CountMinSketch.from_bytes(sketch.to_bytes(), 64, 3)
+    assert restored.estimate("game3") == sketch.estimate("game3")
+    assert CountMinSketch.from_bytes(b"short", 64, 3) is None
+
+
+def test_tracker_keeps_heavy_hitters():
+    tracker = PopularityTracker(k=3, width=256)
+    for i in range(300):
+        tracker.record(f"rare {i}", now=0)
+        if i % 3 == 0:
+            tracker.record("Minecraft", now=0)
+        if i % 5 == 0:
+            tracker.record("Fortnite", now=0)
+
+    assert [game for game, _ in tracker.top(2)] == ["minecraft", "fortnite"]
+
+
+def test_counts_decay_with_half_life():
+    tracker = PopularityTracker(k=5, half_life=60, decay_interval=1)
+    tracker._decayed_at = 0
+    for _ in range(8):
+        tracker.record("minecraft", now=0)
+
+    tracker.record("fortnite", now=120)
+
+    scores = dict(tracker.top())
+    assert scores["minecraft"] == pytest.approx(2, rel=0.01)
+    assert scores["fortnite"] == pytest.approx(1)
+
+
+@pytest.mark.asyncio
+async def test_sync_merges_workers_through_redis():
+    redis = FakeRedis()
+    first, second = PopularityTracker(k=5), PopularityTracker(k=5)
+    first.worker_id, second.worker_id = "a", "b"
+    for _ in range(3):
+        first.record("minecraft", now=0)
+        second.record("minecraft", now=0)
+    second.record("fortnite", now=0)
+
+    await first.sync(redis)
+    await second.sync(redis)
+
+    assert second.top() == [("minecraft", 6.0), ("fortnite", 1.0)]
+    assert second.stats()["scope"] == "global"
+
+
+@pytest.mark.asyncio
+async def test_sync_without_redis_stays_local():
+    tracker = PopularityTracker(k=5)
+    tracker.record("minecraft", now=0)
+
+    await tracker.sync(None)
+
+    assert tracker.top() == [("minecraft", 1.0)]
+    assert tracker.stats()["scope"] == "local"
@@ -0,0 +1,105 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from backend.app.cache.invalidation import InvalidationBus
+from backend.app.cache.singleflight import SingleFlight
+
+
+class FakeLeaseRedis:
+    """Rejoue les scripts de `RedisLease` ; `held_by` simule un autre worker."""
+
+    def __init__(self, held_by=None):
+        self.owners = {}
+        self.held_by = held_by
+
+    def register_script(self, script):
+        return self._release if "DEL" in script else self._acquire
+
+    async def _acquire(self, keys, args):
+        owner = self.held_by or self.owners.get(keys[0])
+        if owner and owner != args[0]:
+            return 0
+        self.owners[keys[0]] = args[0]
+        return 1
+
+    async def _release(self, keys, args):
+        self.owners.pop(keys[0], None)
+        return 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_fetch():
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "fresh"
+
+    flight = SingleFlight(client_provider=lambda: None)
+    results = await asyncio.gather(*(flight.run("key", fetch, AsyncMock()) for _ in range(5)))
+
+    assert results == ["fresh"] * 5
+    assert calls == 1
+    assert flight.stats()["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_leader_fetches_and_releases_the_lock():
+    redis = FakeLeaseRedis()
+    flight = SingleFlight(client_provider=lambda: redis)
+
+    assert await flight.run("key", AsyncMock(return_value="fresh"), AsyncMock()) == "fresh"
+    assert redis.owners == {}
+    assert flight.stats()["leader"] == 1
+
+
+@pytest.mark.asyncio
+async def test_follower_serves_stale_data():
+    fetch = AsyncMock()
+    flight = SingleFlight(client_provider=lambda: FakeLeaseRedis(held_by="other:1"))
+
+    value = await flight.run("key", fetch, AsyncMock(), stale=AsyncMock(return_value="stale"))
+
+    assert value == "stale"
+    fetch.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_follower_reloads_once_the_refresh_is_notified():
+    bus = InvalidationBus()
+    flight = SingleFlight(client_provider=lambda: FakeLeaseRedis(held_by="other:1"), notifier=bus)
+    cache = {}
+
+    async def reload():
+        return cache.get("key")
+
+    async def refresh_elsewhere():
+        await asyncio.sleep(0.01)
+        cache["key"] = "fresh"
+        bus.apply({"kind": "segment", "key": ["game", None, "live"], "version": 1})
+
+    fetch = AsyncMock()
+    value, _ = await asyncio.gather(
+        flight.run("key", fetch, reload, stale=AsyncMock(return_value=None), notify_key=("game", None, "live")),
+        refresh_elsewhere(),
+    )
+
+    assert value == "fresh"
+    fetch.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_follower_fetches_itself_after_the_timeout():
+    flight = SingleFlight(
+        wait_timeout=0.02, poll_interval=0.005,
+        client_provider=lambda: FakeLeaseRedis(held_by="other:1")
+    )
+
+    value = await flight.run("key", AsyncMock(return_value="fresh"), AsyncMock(return_value=None))
+
+    assert value == "fresh"
+    assert flight.stats()["timeouts"] == 1
@@ -0,0 +1,79 @@
+import time
+
+from backend.app.cache.tinylfu import FrequencySketch, TinyLFUCache
+
+
+def make_cache(max_bytes=10_000):
+    # Une entrée = 1 000 octets : 9 entrées tiennent dans la zone principale
+    return TinyLFUCache(max_bytes, sizeof=lambda value: 1000, window_share=0.1)
+
+
+def test_sketch_counts_saturate_and_age():
+    sketch = FrequencySketch(width=64)
+    for _ in range(20):
+        sketch.increment("hot")
+    assert sketch.frequency("hot") == FrequencySketch.MAX_COUNT
+
+    sketch.reset()
+    assert sketch.frequency("hot") == 7
+
+
+def test_byte_budget_is_respected():
+    cache = make_cache()
+    for i in range(30):
+        cache.set(f"key{i}", i, ttl=60)
+
+    assert cache.bytes_used <= 10_000
+    assert cache.stats()["evictions"] + cache.stats()["rejections"] >= 20
+
+
+def test_scan_does_not_evict_the_hot_set():
+    cache = make_cache()
+    hot = [f"hot{i}" for i in range(5)]
+    for key in hot:
+        cache.set(key, key, ttl=60)
+    for _ in range(3):
+        for key in hot:
+            assert cache.get(key) == key
+
+    # Rafale de clés vues une seule fois
+    for i in range(100):
+        cache.set(f"scan{i}", i, ttl=60)
+
+    assert all(cache.get(key) == key for key in hot)
+    assert cache.stats()["rejections"] > 0
+
+
+def test_entries_expire():
+    cache = make_cache()
+    cache.set("key", "value", ttl=0.01)
+    time.sleep(0.02)
+
+    assert cache.get("key") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.bytes_used == 0
+
+
+def test_oversized_value_is_not_cached():
+    cache = TinyLFUCache(1000, sizeof=len)
+    assert cache.set("key", "x" * 2000, ttl=60) is False
+    assert "key" not in cache
+
+
+def test_update_keeps_the_entry():
+    cache = make_cache()
+    cache.set("key", "old", ttl=60)
+    assert cache.update("key", "new") is True
+    assert cache.get("key") == "new"
+    assert cache.update("missing", "value") is False
+
+
+def test_stats_report_hit_rate():
+    cache = make_cache()
+    cache.set("key", "value", ttl=60)
+    cache.get("key")
+    cache.get("missing")
+
+    stats = cache.stats()
+    assert stats["hit_rate"] == 0.5
+    assert stats["bytes"] == 1000 and stats["entries"] == 1
@@ -0,0 +1,58 @@
+from backend.app.cache.ttl_policy import AdaptiveTTLPolicy
+from backend.app.models.records import VideoRecord
+
+
+def make_videos(views):
+    return [
+        VideoRecord(id=video_id, user_name="Streamer", title="Title", thumbnail_url="http://thumb",
+                    view_count=count, type="live")
+        for video_id, count in views.items()
+    ]
+
+
+def make_policy():
+    return AdaptiveTTLPolicy(default_ttl=60, min_ttl=15, max_ttl=600)
+
+
+def test_unknown_key_gets_default_ttl():
+    policy = make_policy()
+    assert policy.ttl_for("minecraft:") == 60
+    assert policy.observe("minecraft:", make_videos({"a": 10})) == 60
+
+
+def test_stable_result_converges_to_max_ttl():
+    policy = make_policy()
+    for _ in range(20):
+        ttl = policy.observe("quiet:", make_videos({"a": 10, "b": 5}))
+    assert ttl == 600
+
+
+def test_volatile_popular_game_gets_shorter_ttl_than_volatile_unpopular_one():
+    policy = make_policy()
+    for i in range(20):
+        for second in range(60):
+            policy.record_request("hot:", now=i * 60 + second)
+        hot = policy.observe("hot:", make_videos({f"hot{i}": 1000, "shared": 1000 * (i + 1)}))
+        cold = policy.observe("cold:", make_videos({f"cold{i}": 1000, "shared": 1000 * (i + 1)}))
+
+    assert 15 <= hot < cold < 600
+
+
+def test_stats_expose_ttl_distribution():
+    policy = make_policy()
+    policy.observe("a:", make_videos({"a": 1}))
+    policy.observe("b:", make_videos({"b": 1}))
+
+    stats = policy.stats()
+
+    assert stats["keys"] == 2
+    assert stats["ttl"]["p50"] == 60
+    assert sum(count for _, count in stats["histogram"]) == 2
+    assert stats["histogram"][-1][0] == 600
+
+
+def test_key_count_is_bounded():
+    policy = AdaptiveTTLPolicy(default_ttl=60, min_ttl=15, max_ttl=600, max_keys=2)
+    for key in ("a", "b", "c"):
+        policy.record_request(key)
+    assert policy.stats()["keys"] == 2
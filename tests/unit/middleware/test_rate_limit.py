@@ -0,0 +1,162 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.app.middleware.rate_limit import ClientRateLimiter, LoadShedder, RateLimitMiddleware
+
+
+class FakeScript:
+    def __init__(self, result):
+        self.result = result
+        self.calls = []
+
+    async def __call__(self, keys, args):
+        self.calls.append((keys, args))
+        return self.result
+
+
+class FakeRedis:
+    def __init__(self, result):
+        self.script = FakeScript(result)
+
+    def register_script(self, source):
+        return self.script
+
+
+@pytest.mark.asyncio
+async def test_client_bucket_limits_each_client_separately():
+    limiter = ClientRateLimiter(calls=2, period=60)
+
+    assert (await limiter.hit("1.1.1.1"))[0]
+    assert (await limiter.hit("1.1.1.1"))[0]
+    allowed, retry_after = await limiter.hit("1.1.1.1")
+
+    assert not allowed
+    assert 0 < retry_after <= 30
+    assert (await limiter.hit("2.2.2.2"))[0]
+    assert limiter.stats()["limited"] == 1
+
+
+@pytest.mark.asyncio
+async def test_shared_bucket_uses_redis_and_falls_back_to_local():
+    redis = FakeRedis([0, 1500])
+    limiter = ClientRateLimiter(calls=5, period=60, shared=True, client_provider=lambda: redis)
+
+    assert await limiter.hit("1.1.1.1") == (False, 1.5)
+    assert redis.script.calls[0][0] == ["ratelimit:1.1.1.1"]
+
+    limiter._client_provider = lambda: None
+    assert (await limiter.hit("1.1.1.1"))[0]
+    assert limiter.stats()["local_fallbacks"] == 1
+
+
+@pytest.mark.asyncio
+async def test_shedder_queues_then_rejects():
+    shedder = LoadShedder(max_in_flight=1, max_queued=1, queue_timeout=1.0)
+    assert await shedder.acquire()
+
+    waiting = asyncio.create_task(shedder.acquire())
+    await asyncio.sleep(0)
+    assert shedder.queue_depth == 1
+    # File pleine : délestage immédiat
+    assert not await shedder.acquire()
+
+    # La place est cédée directement à la requête en attente
+    shedder.release()
+    assert await waiting
+    assert shedder.in_flight == 1
+    shedder.release()
+    assert shedder.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_shedder_times_out_queued_request():
+    shedder = LoadShedder(max_in_flight=1, max_queued=4, queue_timeout=0.01)
+    assert await shedder.acquire()
+
+    assert not await shedder.acquire()
+    assert shedder.queue_depth == 0
+    assert shedder.stats()["timed_out"] == 1
+
+
+def make_app(limiter, shedder):
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, limiter=limiter, shedder=shedder)
+
+    @app.get("/api/search")
+    async def search():
+        return {"ok": True}
+
+    @app.get("/api/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/api/metrics/")
+    async def get_metrics():
+        return {}
+
+    return app
+
+
+def test_middleware_returns_429_with_retry_after():
+    client = TestClient(make_app(ClientRateLimiter(calls=1, period=60), LoadShedder(8, 8, 1.0)))
+
+    assert client.get("/api/search").status_code == 200
+    response = client.get("/api/search")
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "60"
+    # Les sondes ne sont jamais limitées
+    assert client.get("/api/health").status_code == 200
+    # Avec ou sans barre oblique finale (la redirection vers "/api/metrics/" non plus)
+    assert client.get("/api/metrics", follow_redirects=False).status_code == 307
+    assert client.get("/api/metrics/").status_code == 200
+
+
+def test_middleware_sheds_when_saturated():
+    shedder = LoadShedder(max_in_flight=1, max_queued=0, queue_timeout=1.0)
+    shedder.in_flight = 1
+    client = TestClient(make_app(ClientRateLimiter(calls=10, period=60), shedder))
+
+    response = client.get("/api/search")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_clients_behind_a_trusted_proxy_get_separate_buckets():
+    app = FastAPI()
+    app.add_middleware(
+        RateLimitMiddleware,
+        limiter=ClientRateLimiter(calls=1, period=60),
+        shedder=LoadShedder(8, 8, 1.0),
+        trusted_proxies=["172.16.0.0/12"]
+    )
+
+    @app.get("/api/search")
+    async def search():
+        return {"ok": True}
+
+    # Les requêtes arrivent toutes depuis le conteneur nginx
+    transport = httpx.ASGITransport(app=app, client=("172.18.0.5", 41000))
+    async with httpx.AsyncClient(transport=transport, base_url="http://backend") as client:
+        first = await client.get("/api/search", headers={"X-Real-IP": "203.0.113.1"})
+        second = await client.get("/api/search", headers={"X-Forwarded-For": "10.9.9.9, 203.0.113.2"})
+        again = await client.get("/api/search", headers={"X-Real-IP": "203.0.113.1"})
+
+    assert [first.status_code, second.status_code, again.status_code] == [200, 200, 429]
+
+
+@pytest.mark.asyncio
+async def test_forwarded_headers_are_ignored_from_untrusted_peers():
+    app = make_app(ClientRateLimiter(calls=1, period=60), LoadShedder(8, 8, 1.0))
+    transport = httpx.ASGITransport(app=app, client=("198.51.100.7", 41000))
+    async with httpx.AsyncClient(transport=transport, base_url="http://backend") as client:
+        first = await client.get("/api/search", headers={"X-Real-IP": "203.0.113.1"})
+        spoofed = await client.get("/api/search", headers={"X-Real-IP": "203.0.113.2"})
+
+    assert [first.status_code, spoofed.status_code] == [200, 429]
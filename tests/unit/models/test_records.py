@@ -0,0 +1,61 @@
+from datetime import datetime, timezone
+
+from backend.app.models.records import GameRecord, SearchRecord, VideoRecord
+from backend.app.models.twitch import TwitchSearchResult
+
+
+def make_record():
+    video = VideoRecord(
+        id="1",
+        user_name="Streamer",
+        title="Title",
+        url="https://www.twitch.tv/videos/1",
+        view_count=42,
+        duration="1h2m3s",
+        duration_seconds=3723,
+        created_at=datetime(2024, 3, 25, 10, 0, tzinfo=timezone.utc),
+        is_live=False,
+        language="fr",
+        thumbnail_url="http://thumb",
+        game_id="10",
+        type="archive",
+    )
+    return SearchRecord(
+        game_name="game",
+        game=GameRecord(id="10", name="Game", box_art_url="http://box"),
+        videos=[video],
+        last_updated=datetime(2024, 3, 25, 12, 0),
+        pagination={"cursor": None},
+    )
+
+
+def test_records_use_slots():
+    record = make_record()
+    assert not hasattr(record, "__dict__")
+    assert not hasattr(record.videos[0], "__dict__")
+
+
+def test_document_round_trip():
+    record = make_record()
+    document = record.to_document()
+
+    assert document["total_count"] == 1
+    assert SearchRecord.from_document(document) == record
+
+
+def test_from_document_treats_naive_datetimes_as_utc():
+    document = make_record().to_document()
+    document["videos"][0]["created_at"] = datetime(2024, 3, 25, 10, 0)
+
+    video = SearchRecord.from_document(document).videos[0]
+
+    assert video.created_at.tzinfo == timezone.utc
+
+
+def test_to_api_builds_pydantic_result():
+    result = make_record().to_api()
+
+    assert isinstance(result, TwitchSearchResult)
+    assert result.total_count == 1
+    assert result.game.name == "Game"
+    assert result.videos[0].duration_seconds == 3723
@@ -0,0 +1,83 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+from backend.app.models.records import VideoRecord
+from backend.app.repositories.catalog_repository import CatalogRepository
+from backend.app.storage import open_store
+
+
+@pytest.fixture
+def mock_store():
+    return MagicMock()
+
+
+def make_video(video_id, view_count=42, is_live=True, language="fr"):
+    return VideoRecord(
+        id=video_id,
+        user_name="Streamer",
+        title="Title",
+        url="https://www.twitch.tv/streamer",
+        view_count=view_count,
+        duration="live" if is_live else "1h",
+        duration_seconds=0 if is_live else 3600,
+        created_at=None,
+        is_live=is_live,
+        language=language,
+        thumbnail_url="http://thumb",
+        game_id="1",
+        type="live" if is_live else "archive",
+    )
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_videos_uses_a_single_write(mock_store):
+    # Arrange
+    repo = CatalogRepository(store=mock_store)
+    mock_store.write = AsyncMock(return_value=2)
+
+    # Act
+    count = await repo.bulk_upsert_videos([make_video("a"), make_video("b")], "Game")
+
+    # Assert
+    assert count == 2
+    namespace, writes = mock_store.write.call_args.args
+    assert namespace == "videos"
+    assert [write.key for write in writes] == ["1\ta", "1\tb"]
+    assert writes[0].document["game_name"] == "Game"
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_videos_empty_batch_is_noop(mock_store):
+    repo = CatalogRepository(store=mock_store)
+    mock_store.write = AsyncMock()
+
+    assert await repo.bulk_upsert_videos([], "Game") == 0
+    mock_store.write.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_find_videos_filters_and_orders_the_game_catalog():
+    repo = CatalogRepository(await open_store("memory"))
+    await repo.bulk_upsert_videos([
+        make_video("vod", view_count=500, is_live=False),
+        make_video("small", view_count=10),
+        make_video("big", view_count=100),
+        make_video("english", view_count=1000, language="en"),
+    ], "Game")
+
+    videos = await repo.find_videos("1", limit=3, max_age=60, language="fr")
+
+    assert [video.id for video in videos] == ["big", "small", "vod"]
+    assert await repo.find_videos("2", limit=3, max_age=60) == []
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_round_trip():
+    repo = CatalogRepository(await open_store("memory"))
+
+    await repo.save_checkpoint("streams:1", "cursor-1")
+    checkpoint = await repo.get_checkpoint("streams:1")
+
+    assert checkpoint["cursor"] == "cursor-1"
+    assert datetime.utcnow() - checkpoint["updated_at"] < timedelta(seconds=5)
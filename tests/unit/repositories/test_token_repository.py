@@ -1,270 +1,262 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 from datetime import datetime, timedelta
-import unittest.mock
 
 from backend.app.models.twitch import TwitchToken
 from backend.app.repositories.token_repository import TokenRepository
+from backend.app.repositories.write_behind import WriteBehindQueue
 
-# Mock de AsyncIOMotorDatabase
+# Mock du StorageBackend
 @pytest.fixture
-def mock_db():
+def mock_store():
     return MagicMock()
 
+def make_token(access_token, hours=1):
+    return TwitchToken(
+        access_token=access_token,
+        expires_in=3600,
+        token_type="bearer",
+        expires_at=(datetime.utcnow() + timedelta(hours=hours)).isoformat()
+    )
+
 @pytest.mark.asyncio
-async def test_save_token_success(mock_db):
+async def test_save_token_success(mock_store):
     # Arrange
-    repo = TokenRepository(db=mock_db)
-    mock_token_data = {
-        "access_token": "test_token",
-        "expires_in": 3600,
-        "token_type": "bearer",
-        "expires_at": (datetime.utcnow() + timedelta(hours=1)).isoformat()
-    }
-    token = TwitchToken(**mock_token_data)
-
-    mock_insert_one = AsyncMock()
-    mock_db.twitch_tokens.insert_one = mock_insert_one
+    repo = TokenRepository(store=mock_store)
+    token = make_token("test_token")
+
+    mock_put = AsyncMock()
+    mock_store.put = mock_put
 
     # Act
     await repo.save_token(token)
 
     # Assert
-    mock_insert_one.assert_awaited_once()
-    # On vérifie que l'objet inséré ressemble à un dictionnaire de token avec created_at
-    inserted_data = mock_insert_one.call_args[0][0]
+    mock_put.assert_awaited_once()
+    # On vérifie que le document écrit ressemble à un dictionnaire de token avec created_at
+    namespace, key, inserted_data = mock_put.call_args[0]
+    assert (namespace, key) == ("twitch_tokens", "test_token")
     assert isinstance(inserted_data, dict)
     assert "access_token" in inserted_data and inserted_data["access_token"] == "test_token"
     assert "created_at" in inserted_data
     assert isinstance(inserted_data["created_at"], datetime)
 
 @pytest.mark.asyncio
-async def test_save_token_exception(mock_db):
+async def test_save_token_exception(mock_store):
     # Arrange
-    repo = TokenRepository(db=mock_db)
-    mock_token_data = {
-        "access_token": "test_token",
-        "expires_in": 3600,
-        "token_type": "bearer",
-        "expires_at": (datetime.utcnow() + timedelta(hours=1)).isoformat()
-    }
-    token = TwitchToken(**mock_token_data)
-
-    mock_insert_one = AsyncMock(side_effect=Exception("DB Error"))
-    mock_db.twitch_tokens.insert_one = mock_insert_one
+    repo = TokenRepository(store=mock_store)
+    token = make_token("test_token")
+
+    mock_put = AsyncMock(side_effect=Exception("DB Error"))
+    mock_store.put = mock_put
 
     # Act & Assert
     with pytest.raises(Exception, match="DB Error"):
         await repo.save_token(token)
-    mock_insert_one.assert_awaited_once()
+    mock_put.assert_awaited_once()
 
 @pytest.mark.asyncio
-async def test_get_current_token_found(mock_db):
+async def test_get_current_token_found(mock_store):
     # Arrange
-    repo = TokenRepository(db=mock_db)
-    valid_expires_at = datetime.utcnow() + timedelta(hours=1)
-    mock_token_data = {
-        "_id": "some_id", # Ajouter un _id comme si ça venait de Mongo
-        "access_token": "valid_token",
-        "expires_in": 3600,
-        "token_type": "bearer",
-        "expires_at": valid_expires_at,
-        "is_valid": True,
-        "created_at": datetime.utcnow()
-    }
-    mock_find_one = AsyncMock(return_value=mock_token_data)
-    mock_db.twitch_tokens.find_one = mock_find_one
+    repo = TokenRepository(store=mock_store)
+    now = datetime.utcnow()
+
+    def token_doc(access_token, expires_at, created_at):
+        return access_token, {
+            "access_token": access_token,
+            "token_type": "bearer",
+            "expires_at": expires_at,
+            "is_valid": True,
+            "created_at": created_at
+        }
+
+    mock_scan = AsyncMock(return_value=[
+        token_doc("expired_token", now - timedelta(hours=1), now),
+        token_doc("old_token", now + timedelta(hours=1), now - timedelta(hours=2)),
+        token_doc("valid_token", now + timedelta(hours=1), now - timedelta(hours=1)),
+    ])
+    mock_store.scan = mock_scan
 
     # Act
     token = await repo.get_current_token()
 
-    # Assert
-    mock_find_one.assert_awaited_once()
+    # Assert : le plus récent des tokens non expirés
+    mock_scan.assert_awaited_once_with("twitch_tokens")
     assert isinstance(token, TwitchToken)
     assert token.access_token == "valid_token"
 
 @pytest.mark.asyncio
-async def test_get_current_token_not_found(mock_db):
+async def test_get_current_token_not_found(mock_store):
     # Arrange
-    repo = TokenRepository(db=mock_db)
-    mock_find_one = AsyncMock(return_value=None)
-    mock_db.twitch_tokens.find_one = mock_find_one
+    repo = TokenRepository(store=mock_store)
+    mock_scan = AsyncMock(return_value=[])
+    mock_store.scan = mock_scan
 
     # Act
     token = await repo.get_current_token()
 
     # Assert
-    mock_find_one.assert_awaited_once()
+    mock_scan.assert_awaited_once()
     assert token is None
 
 @pytest.mark.asyncio
-async def test_get_current_token_exception(mock_db):
+async def test_get_current_token_exception(mock_store):
     # Arrange
-    repo = TokenRepository(db=mock_db)
-    mock_find_one = AsyncMock(side_effect=Exception("DB Error"))
-    mock_db.twitch_tokens.find_one = mock_find_one
+    repo = TokenRepository(store=mock_store)
+    mock_scan = AsyncMock(side_effect=Exception("DB Error"))
+    mock_store.scan = mock_scan
 
     # Act
     token = await repo.get_current_token()
 
     # Assert
-    mock_find_one.assert_awaited_once()
+    mock_scan.assert_awaited_once()
     # En cas d'exception, get_current_token doit retourner None
     assert token is None
 
 @pytest.mark.asyncio
-async def test_update_last_used_success(mock_db):
+async def test_update_last_used_success(mock_store):
     # Arrange
-    repo = TokenRepository(db=mock_db)
-    mock_token_data = {
-        "access_token": "token_to_update",
-        "expires_in": 3600,
-        "token_type": "bearer",
-        "expires_at": (datetime.utcnow() + timedelta(hours=1)).isoformat()
-    }
-    token = TwitchToken(**mock_token_data)
-
-    mock_update_one = AsyncMock()
-    mock_db.twitch_tokens.update_one = mock_update_one
+    repo = TokenRepository(store=mock_store)
+    token = make_token("token_to_update")
+
+    mock_update = AsyncMock()
+    mock_store.update = mock_update
 
     # Act
     await repo.update_last_used(token)
 
     # Assert
-    mock_update_one.assert_awaited_once_with(
-        {"access_token": token.access_token},
-        {"$set": unittest.mock.ANY}
-    )
-    # Vérifier que la date insérée est proche de maintenant
-    inserted_data = mock_update_one.call_args[0][1]['$set']['last_used']
+    mock_update.assert_awaited_once()
+    namespace, key, fields = mock_update.call_args[0]
+    assert (namespace, key) == ("twitch_tokens", token.access_token)
+    # Vérifier que la date écrite est proche de maintenant
+    inserted_data = fields["last_used"]
     assert isinstance(inserted_data, datetime)
     assert datetime.utcnow() - inserted_data < timedelta(seconds=5)
 
 @pytest.mark.asyncio
-async def test_update_last_used_exception(mock_db):
+async def test_update_last_used_exception(mock_store):
     # Arrange
-    repo = TokenRepository(db=mock_db)
-    mock_token_data = {
-        "access_token": "token_to_update",
-        "expires_in": 3600,
-        "token_type": "bearer",
-        "expires_at": (datetime.utcnow() + timedelta(hours=1)).isoformat()
-    }
-    token = TwitchToken(**mock_token_data)
-
-    mock_update_one = AsyncMock(side_effect=Exception("DB Error"))
-    mock_db.twitch_tokens.update_one = mock_update_one
+    repo = TokenRepository(store=mock_store)
+    token = make_token("token_to_update")
+
+    mock_update = AsyncMock(side_effect=Exception("DB Error"))
+    mock_store.update = mock_update
 
     # Act
     await repo.update_last_used(token)
 
     # Assert
-    mock_update_one.assert_awaited_once()
+    mock_update.assert_awaited_once()
     # Pas d'assertion d'exception car la méthode log l'erreur mais ne la relève pas
 
 @pytest.mark.asyncio
-async def test_invalidate_token_success(mock_db):
+async def test_update_last_used_is_deferred_to_the_write_queue(mock_store):
+    # Arrange
+    queue = WriteBehindQueue(flush_interval=60)
+    await queue.start(mock_store)
+    repo = TokenRepository(store=mock_store, write_queue=queue)
+    token = make_token("token_to_update")
+    mock_store.update = AsyncMock()
+    mock_store.write = AsyncMock(return_value=1)
+
+    # Act
+    await repo.update_last_used(token)
+    await repo.update_last_used(token)
+    await queue.stop()
+
+    # Assert : une seule écriture groupée, aucune écriture directe
+    mock_store.update.assert_not_awaited()
+    mock_store.write.assert_awaited_once()
+    namespace, writes = mock_store.write.call_args[0]
+    assert namespace == "twitch_tokens"
+    assert len(writes) == 1
+    assert writes[0].key == "token_to_update"
+    assert "last_used" in writes[0].fields
+
+@pytest.mark.asyncio
+async def test_invalidate_token_success(mock_store):
     # Arrange
-    repo = TokenRepository(db=mock_db)
-    mock_token_data = {
-        "access_token": "token_to_invalidate",
-        "expires_in": 3600,
-        "token_type": "bearer",
-        "expires_at": (datetime.utcnow() + timedelta(hours=1)).isoformat()
-    }
-    token = TwitchToken(**mock_token_data)
-
-    mock_update_one = AsyncMock()
-    mock_db.twitch_tokens.update_one = mock_update_one
+    repo = TokenRepository(store=mock_store)
+    token = make_token("token_to_invalidate")
+
+    mock_update = AsyncMock()
+    mock_store.update = mock_update
 
     # Act
     await repo.invalidate_token(token)
 
     # Assert
-    mock_update_one.assert_awaited_once_with(
-        {"access_token": token.access_token},
-        {"$set": {"is_valid": False}}
-    )
+    mock_update.assert_awaited_once_with("twitch_tokens", token.access_token, {"is_valid": False})
 
 @pytest.mark.asyncio
-async def test_invalidate_token_exception(mock_db):
+async def test_invalidate_token_exception(mock_store):
     # Arrange
-    repo = TokenRepository(db=mock_db)
-    mock_token_data = {
-        "access_token": "token_to_invalidate",
-        "expires_in": 3600,
-        "token_type": "bearer",
-        "expires_at": (datetime.utcnow() + timedelta(hours=1)).isoformat()
-    }
-    token = TwitchToken(**mock_token_data)
-
-    mock_update_one = AsyncMock(side_effect=Exception("DB Error"))
-    mock_db.twitch_tokens.update_one = mock_update_one
+    repo = TokenRepository(store=mock_store)
+    token = make_token("token_to_invalidate")
+
+    mock_update = AsyncMock(side_effect=Exception("DB Error"))
+    mock_store.update = mock_update
 
     # Act & Assert
     with pytest.raises(Exception, match="DB Error"):
         await repo.invalidate_token(token)
-    mock_update_one.assert_awaited_once()
+    mock_update.assert_awaited_once()
 
 @pytest.mark.asyncio
-async def test_cleanup_old_tokens_success(mock_db):
+async def test_cleanup_old_tokens_success(mock_store):
     # Arrange
-    repo = TokenRepository(db=mock_db)
-    mock_delete_many = AsyncMock()
-    mock_delete_many.return_value.deleted_count = 5 # Simuler 5 documents supprimés
-    mock_db.twitch_tokens.delete_many = mock_delete_many
+    repo = TokenRepository(store=mock_store)
+    now = datetime.utcnow()
+    mock_store.scan = AsyncMock(return_value=[
+        ("old_invalid", {"is_valid": False, "created_at": now - timedelta(days=12)}),
+        ("recent_invalid", {"is_valid": False, "created_at": now - timedelta(days=9)}),
+        ("old_valid", {"is_valid": True, "created_at": now - timedelta(days=12)}),
+    ])
+    mock_delete = AsyncMock(return_value=1)
+    mock_store.delete = mock_delete
 
     # Act
     await repo.cleanup_old_tokens(days=10)
 
-    # Assert
-    mock_delete_many.assert_awaited_once()
-    # Vérifier la requête de suppression (approx)
-    delete_query = mock_delete_many.call_args[0][0]
-    assert "is_valid" in delete_query and delete_query["is_valid"] is False
-    assert "created_at" in delete_query and "$lt" in delete_query["created_at"]
-    # Vérifier que la date de coupure est correcte
-    cutoff_date = delete_query["created_at"]["$lt"]
-    assert isinstance(cutoff_date, datetime)
-    assert datetime.utcnow() - cutoff_date < timedelta(days=11)
-    assert datetime.utcnow() - cutoff_date > timedelta(days=9)
+    # Assert : seuls les tokens invalides plus vieux que la date de coupure
+    mock_delete.assert_awaited_once_with("twitch_tokens", ["old_invalid"])
 
 @pytest.mark.asyncio
-async def test_cleanup_old_tokens_exception(mock_db):
+async def test_cleanup_old_tokens_exception(mock_store):
     # Arrange
-    repo = TokenRepository(db=mock_db)
-    mock_delete_many = AsyncMock(side_effect=Exception("DB Error"))
-    mock_db.twitch_tokens.delete_many = mock_delete_many
+    repo = TokenRepository(store=mock_store)
+    mock_store.scan = AsyncMock(return_value=[])
+    mock_delete = AsyncMock(side_effect=Exception("DB Error"))
+    mock_store.delete = mock_delete
 
     # Act & Assert
     with pytest.raises(Exception, match="DB Error"):
         await repo.cleanup_old_tokens(days=10)
-    mock_delete_many.assert_awaited_once()
+    mock_delete.assert_awaited_once()
 
 @pytest.mark.asyncio
-async def test_initialize_success(mock_db):
+async def test_initialize_success(mock_store):
     # Arrange
-    repo = TokenRepository(db=mock_db)
-    mock_create_index = AsyncMock()
-    mock_db.twitch_tokens.create_index = mock_create_index
+    repo = TokenRepository(store=mock_store)
+    mock_initialize = AsyncMock()
+    mock_store.initialize = mock_initialize
 
     # Act
     await repo.initialize()
 
     # Assert
-    # On s'attend à deux appels à create_index
-    assert mock_create_index.call_count == 2
-    # On peut vérifier les arguments des appels si nécessaire, mais le count est suffisant pour la couverture de base
+    mock_initialize.assert_awaited_once_with("twitch_tokens")
 
 @pytest.mark.asyncio
-async def test_initialize_exception(mock_db):
+async def test_initialize_exception(mock_store):
     # Arrange
-    repo = TokenRepository(db=mock_db)
-    mock_create_index = AsyncMock(side_effect=Exception("DB Error"))
-    mock_db.twitch_tokens.create_index = mock_create_index
+    repo = TokenRepository(store=mock_store)
+    mock_initialize = AsyncMock(side_effect=Exception("DB Error"))
+    mock_store.initialize = mock_initialize
 
     # Act & Assert
     with pytest.raises(Exception, match="DB Error"):
         await repo.initialize()
-    # On s'attend à au moins un appel avant l'exception (le premier create_index)
-    assert mock_create_index.call_count >= 1 
\ No newline at end of file
+    mock_initialize.assert_awaited_once()
@@ -0,0 +1,129 @@
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+from backend.app.models.records import SearchRecord
+from backend.app.repositories.twitch_repository import STALE_TTL, TwitchRepository
+
+
+@pytest.fixture
+def store():
+    store = MagicMock()
+    store.put = AsyncMock(return_value=True)
+    store.update = AsyncMock(return_value=True)
+    store.get = AsyncMock(return_value=None)
+    store.get_many = AsyncMock(return_value={})
+    return store
+
+
+@pytest.fixture
+def repo(store):
+    return TwitchRepository(store=store)
+
+
+def make_result(fetched_at, videos=()):
+    return SearchRecord(
+        game_name="minecraft",
+        game=None,
+        videos=list(videos),
+        last_updated=fetched_at,
+        pagination={"cursor": None},
+        snapshot_id="snap1",
+    )
+
+
+@pytest.mark.asyncio
+async def test_segment_is_saved_with_a_single_versioned_put(repo, store):
+    fetched_at = datetime(2024, 3, 25, 12, 0, 0, 250)
+
+    assert await repo.save_cached_segment("Minecraft", "live", make_result(fetched_at), ttl=60) is True
+
+    namespace, key, document = store.put.await_args.args
+    assert (namespace, key) == ("search_cache", "minecraft\t\tlive")
+    assert document["game_name"] == "minecraft" and document["segment"] == "live"
+    assert document["generation"] == 1711368000_000250
+    # Encore lisible STALE_TTL secondes après son expiration
+    assert store.put.await_args.kwargs == {"ttl": 60 + STALE_TTL, "version": 1711368000_000250}
+
+
+@pytest.mark.asyncio
+async def test_stale_segment_write_loses(repo, store):
+    store.put.return_value = False
+
+    assert await repo.save_cached_segment("minecraft", "live", make_result(datetime.utcnow()), ttl=60) is False
+
+
+@pytest.mark.asyncio
+async def test_snapshot_update_only_grows(repo, store):
+    result = make_result(datetime.utcnow(), videos=[MagicMock(to_document=lambda: {})] * 3)
+
+    await repo.update_snapshot(result)
+
+    (namespace, key, fields), kwargs = store.update.await_args
+    assert (namespace, key) == ("search_snapshots", "snap1")
+    assert fields["size"] == 3
+    assert kwargs == {"version": 3}
+
+
+@pytest.mark.asyncio
+async def test_expired_segments_are_only_served_as_stale(repo, store):
+    from backend.app.cache.codec import PayloadCodec
+
+    entry = {
+        "segment": "live",
+        "result": PayloadCodec().encode(make_result(datetime.utcnow())),
+        "expires_at": datetime(2024, 3, 25, 12, 0),
+    }
+    store.get_many.return_value = {"minecraft\t\tlive": entry}
+
+    assert await repo.get_cached_segments("minecraft") == {}
+    assert list(await repo.get_stale_segments("minecraft")) == ["live"]
+    assert await repo.get_segment_expirations("minecraft") == {"live": datetime(2024, 3, 25, 12, 0)}
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_serves_segments_without_the_store(tmp_path, store):
+    from backend.app.cache.codec import PayloadCodec
+    from backend.app.cache.disk import DiskCache
+
+    disk = DiskCache()
+    disk.open(str(tmp_path / "cache.db"), max_bytes=1_000_000)
+    repo = TwitchRepository(store=store, codec=PayloadCodec(), disk_cache=disk)
+
+    for segment in ("live", "archive"):
+        await repo.save_cached_segment("Minecraft", segment, make_result(datetime.utcnow()), ttl=60)
+    await repo.attach_snapshot("minecraft", "live", "snap2")
+    segments = await repo.get_cached_segments("minecraft")
+
+    assert sorted(segments) == ["archive", "live"]
+    assert segments["live"].snapshot_id == "snap2"
+    store.update.assert_awaited_once_with("search_cache", "minecraft\t\tlive", {"result.snapshot_id": "snap2"})
+    store.get_many.assert_not_awaited()
+    disk.close()
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_keeps_the_newest_generation(repo, store):
+    from backend.app.cache.tinylfu import TinyLFUCache
+
+    repo.memory_cache = TinyLFUCache(1_000_000, sizeof=lambda record: 1000)
+
+    await repo.save_cached_segment("minecraft", "live", make_result(datetime(2024, 3, 25, 12, 1)), ttl=60)
+    await repo.save_cached_segment("minecraft", "live", make_result(datetime(2024, 3, 25, 12, 0)), ttl=60)
+    await repo.save_cached_segment("minecraft", "archive", make_result(datetime(2024, 3, 25, 12, 0)), ttl=60)
+    segments = await repo.get_cached_segments("Minecraft")
+
+    assert segments["live"].last_updated == datetime(2024, 3, 25, 12, 1)
+    store.get_many.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_game_lookup_uses_the_normalized_game_key(repo, store):
+    from backend.app.models.records import GameRecord
+
+    await repo.save_game(GameRecord(id="1", name="The  Witcher 3"))
+    await repo.find_game_by_name("  the witcher 3 ")
+
+    (namespace, key, _), kwargs = store.update.await_args
+    assert (namespace, key, kwargs) == ("games", "the witcher 3", {"upsert": True})
+    store.get.assert_awaited_once_with("games", "the witcher 3")
@@ -0,0 +1,173 @@
+import asyncio
+
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+from backend.app.models.records import SearchRecord
+from backend.app.repositories.twitch_repository import TwitchRepository
+from backend.app.repositories.write_behind import WriteBehindQueue
+from backend.app.storage import StorageError, Write, open_store
+
+
+@pytest.fixture
+def mock_store():
+    store = MagicMock()
+    # Toutes les écritures du lot sont appliquées
+    store.write = AsyncMock(side_effect=lambda namespace, writes: len(writes))
+    store.get = AsyncMock(return_value=None)
+    store.put = AsyncMock()
+    return store
+
+
+def make_result(snapshot_id="snap1"):
+    return SearchRecord(
+        game_name="minecraft",
+        game=None,
+        videos=[],
+        last_updated=datetime.utcnow(),
+        pagination={"cursor": None},
+        snapshot_id=snapshot_id,
+    )
+
+
+def written(store, namespace):
+    return [writes for (ns, writes), _ in store.write.await_args_list if ns == namespace]
+
+
+@pytest.mark.asyncio
+async def test_writes_are_coalesced_per_key(mock_store):
+    queue = WriteBehindQueue()
+    queue.store = mock_store
+    queue.put("search_cache", "a", {"k": "a", "v": 1})
+    queue.put("search_cache", "a", {"k": "a", "v": 2, "result": {}}, ttl=60)
+    queue.update("search_cache", "a", {"result.snapshot_id": "s1"})
+    queue.update("games", "1", {"name": "A"}, upsert=True)
+    queue.update("games", "1", {"box_art_url": "x"})
+
+    assert await queue.flush() == 2
+
+    assert written(mock_store, "search_cache") == [
+        [Write("a", document={"k": "a", "v": 2, "result": {"snapshot_id": "s1"}}, ttl=60)]
+    ]
+    assert written(mock_store, "games") == [[Write("1", fields={"name": "A", "box_art_url": "x"}, upsert=True)]]
+    assert queue.stats()["coalesced"] == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_writes_are_retried_then_dropped(mock_store):
+    queue = WriteBehindQueue()
+    queue.store = mock_store
+    mock_store.write.side_effect = StorageError("down")
+    queue.update("games", "1", {"name": "A"})
+
+    for _ in range(WriteBehindQueue.MAX_ATTEMPTS):
+        assert await queue.flush() == 0
+
+    assert queue.stats() == {"pending": 0, "queued": 1, "coalesced": 0, "flushed": 0, "failed": 1, "stale": 0}
+
+
+@pytest.mark.asyncio
+async def test_stop_drains_pending_writes(mock_store):
+    queue = WriteBehindQueue(flush_interval=60)
+    await queue.start(mock_store)
+    queue.put("search_snapshots", "s1", {"snapshot_id": "s1"})
+
+    await queue.stop()
+
+    mock_store.write.assert_awaited_once()
+    assert not queue.is_running
+
+
+@pytest.mark.asyncio
+async def test_repository_reads_its_own_pending_writes(mock_store):
+    queue = WriteBehindQueue(flush_interval=60)
+    await queue.start(mock_store)
+    repo = TwitchRepository(mock_store, write_queue=queue)
+    result = make_result()
+
+    assert await repo.save_snapshot(result, ttl=900) is True
+    assert await repo.get_snapshot("snap1") is result
+
+    mock_store.put.assert_not_awaited()
+    mock_store.get.assert_not_awaited()
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_older_version_does_not_replace_pending_write(mock_store):
+    queue = WriteBehindQueue()
+    queue.store = mock_store
+    queue.put("search_cache", "a", {"v": "new"}, value="new", version=2)
+    queue.put("search_cache", "a", {"v": "old"}, value="old", version=1)
+
+    assert queue.peek("search_cache", "a") == "new"
+    assert queue.stats()["stale"] == 1
+
+
+@pytest.mark.asyncio
+async def test_writes_ignored_by_the_store_are_counted_stale(mock_store):
+    queue = WriteBehindQueue()
+    queue.store = mock_store
+    # Une version plus récente de "a" est déjà stockée
+    mock_store.write.side_effect = lambda namespace, writes: len(writes) - 1
+    queue.put("search_cache", "a", {"v": 1}, version=1)
+    queue.put("search_cache", "b", {"v": 1}, version=1)
+
+    assert await queue.flush() == 1
+    assert queue.stats()["pending"] == 0
+    assert queue.stats()["stale"] == 1
+
+
+@pytest.mark.asyncio
+async def test_writes_stay_readable_until_acknowledged(mock_store):
+    acknowledged = asyncio.Event()
+
+    async def slow_write(namespace, writes):
+        await acknowledged.wait()
+        return len(writes)
+
+    mock_store.write.side_effect = slow_write
+    queue = WriteBehindQueue()
+    queue.store = mock_store
+    queue.put("search_cache", "a", {"k": "a"}, value="v1")
+    queue.put("search_cache", "b", {"k": "b"}, value="v2")
+
+    flushing = asyncio.create_task(queue.flush())
+    await asyncio.sleep(0)
+    assert queue.stats()["pending"] == 0
+    assert queue.peek("search_cache", "a") == "v1"
+
+    # Invalidée pendant l'écriture : plus lisible, et discard attend l'acquittement
+    discarding = asyncio.create_task(queue.discard("search_cache", lambda key: key == "b"))
+    await asyncio.sleep(0)
+    assert queue.peek("search_cache", "b") is None
+    assert not discarding.done()
+
+    acknowledged.set()
+    assert await flushing == 2
+    assert await discarding == 1
+    assert queue.peek("search_cache", "a") is None
+
+
+@pytest.mark.asyncio
+async def test_invalidation_drops_pending_segments():
+    store = await open_store("memory")
+    queue = WriteBehindQueue(flush_interval=60)
+    await queue.start(store)
+    repo = TwitchRepository(store, write_queue=queue)
+    await repo.initialize()
+
+    assert await repo.save_cached_segment("Minecraft", "live", make_result(), ttl=60)
+    assert await repo.save_cached_segment("Zelda", "live", make_result(), ttl=60)
+    assert await repo.invalidate_game_cache("minecraft")
+    assert await repo.get_cached_segments("minecraft") == {}
+    await queue.flush()
+
+    assert await repo.get_cached_segments("minecraft") == {}
+    assert [key for key, _ in await store.scan("search_cache")] == ["zelda\t\tlive"]
+
+    assert await repo.save_cached_segment("Zelda", "archive", make_result(), ttl=60)
+    assert await repo.clear_all_cache()
+    await queue.stop()
+    assert await store.scan("search_cache") == []
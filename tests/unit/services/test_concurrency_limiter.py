@@ -0,0 +1,118 @@
+import asyncio
+
+import httpx
+import pytest
+
+from backend.app.services.twitch.client import HelixClient
+from backend.app.services.twitch.concurrency import (
+    BACKGROUND,
+    INTERACTIVE,
+    AdaptiveLimiter,
+    background_priority,
+    current_priority,
+)
+
+
+@pytest.mark.asyncio
+async def test_calls_beyond_limit_wait_their_turn():
+    limiter = AdaptiveLimiter(initial_limit=2, min_limit=1, max_limit=10)
+    await limiter.acquire()
+    await limiter.acquire()
+
+    waiting = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.queue_depth == 1
+    assert not waiting.done()
+
+    limiter.release(0.1)
+    await waiting
+    assert limiter.in_flight == 2
+    assert limiter.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_limit_grows_while_latency_is_stable_and_saturated():
+    limiter = AdaptiveLimiter(initial_limit=2, min_limit=1, max_limit=10)
+
+    for _ in range(20):
+        await limiter.acquire()
+        await limiter.acquire()
+        limiter.release(0.1)
+        limiter.release(0.1)
+
+    assert limiter.limit > 3
+    assert limiter.decreases == 0
+
+
+@pytest.mark.asyncio
+async def test_limit_shrinks_once_per_round_trip_on_spike_and_errors():
+    limiter = AdaptiveLimiter(initial_limit=10, min_limit=2, max_limit=10, backoff=0.5)
+    await limiter.acquire()
+    limiter.release(0.1)
+
+    for _ in range(3):
+        await limiter.acquire()
+    # Rafale de réponses lentes : un seul signal
+    for _ in range(3):
+        limiter.release(1.0)
+    assert limiter.limit == 5
+    assert limiter.decreases == 1
+
+    limiter._last_decrease = 0.0
+    await limiter.acquire()
+    limiter.release(0.1, dropped=True)
+    assert limiter.limit == 2.5
+    assert limiter.stats()["limit"] == 2
+
+
+@pytest.mark.asyncio
+async def test_helix_client_reports_429_as_dropped():
+    transport = httpx.MockTransport(lambda request: httpx.Response(429))
+    limiter = AdaptiveLimiter(initial_limit=4, min_limit=1, max_limit=10, backoff=0.5)
+    async with httpx.AsyncClient(transport=transport) as client:
+        helix = HelixClient(client, "https://api.twitch.tv/helix", limiter=limiter)
+        response = await helix.get("/streams", {}, {})
+
+    assert response.status_code == 429
+    assert limiter.in_flight == 0
+    assert limiter.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_interactive_calls_jump_the_background_queue():
+    limiter = AdaptiveLimiter(initial_limit=2, min_limit=1, max_limit=10, reserved_share=0.5)
+    await limiter.acquire(BACKGROUND)
+    assert limiter.background_limit == 1
+
+    # La place réservée reste libre pour les recherches
+    background = asyncio.create_task(limiter.acquire(BACKGROUND))
+    await asyncio.sleep(0)
+    assert not background.done()
+    await limiter.acquire(INTERACTIVE)
+
+    interactive = asyncio.create_task(limiter.acquire(INTERACTIVE))
+    await asyncio.sleep(0)
+    limiter.release(0.1)
+    await asyncio.sleep(0)
+    assert interactive.done() and not background.done()
+
+    limiter.release(0.1)
+    limiter.release(0.1)
+    await asyncio.sleep(0)
+    assert background.done()
+    assert limiter.stats()["admitted"] == {INTERACTIVE: 2, BACKGROUND: 2}
+
+
+@pytest.mark.asyncio
+async def test_priority_follows_the_context():
+    limiter = AdaptiveLimiter(initial_limit=4, min_limit=1, max_limit=10)
+    transport = httpx.MockTransport(lambda request: httpx.Response(200))
+    async with httpx.AsyncClient(transport=transport) as client:
+        helix = HelixClient(client, "https://api.twitch.tv/helix", limiter=limiter)
+        await helix.get("/streams", {}, {})
+        with background_priority():
+            assert current_priority() == BACKGROUND
+            await asyncio.create_task(helix.get("/videos", {}, {}))
+
+    assert current_priority() == INTERACTIVE
+    assert limiter.admitted == {INTERACTIVE: 1, BACKGROUND: 1}
@@ -0,0 +1,49 @@
+import asyncio
+
+import httpx
+import pytest
+
+from backend.app.services.twitch.client import HelixClient
+from backend.app.services.twitch.concurrency import AdaptiveLimiter
+from backend.app.services.twitch.deadline import DeadlineExceeded, deadline, expired, time_left
+
+
+def test_deadline_is_scoped_to_the_block():
+    assert time_left() is None
+    with deadline(5):
+        assert 4 < time_left() <= 5
+        with deadline(None):
+            assert time_left() is None
+        assert not expired()
+    assert time_left() is None
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_cut_at_the_deadline_without_penalizing_the_limit():
+    async def slow(request):
+        await asyncio.sleep(1)
+        return httpx.Response(200)
+
+    limiter = AdaptiveLimiter(initial_limit=4, min_limit=1, max_limit=10)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(slow)) as client:
+        helix = HelixClient(client, "https://api.twitch.tv/helix", limiter=limiter)
+        with deadline(0.02):
+            with pytest.raises(DeadlineExceeded):
+                await helix.get("/videos", {}, {})
+
+    assert limiter.in_flight == 0
+    assert limiter.limit == 4
+    assert limiter.decreases == 0
+
+
+@pytest.mark.asyncio
+async def test_no_call_is_sent_once_the_deadline_has_passed():
+    requests = []
+    transport = httpx.MockTransport(lambda request: requests.append(request) or httpx.Response(200))
+    async with httpx.AsyncClient(transport=transport) as client:
+        helix = HelixClient(client, "https://api.twitch.tv/helix")
+        with deadline(0):
+            with pytest.raises(DeadlineExceeded):
+                await helix.get("/streams", {}, {})
+
+    assert requests == []
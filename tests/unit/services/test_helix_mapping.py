@@ -0,0 +1,73 @@
+import json
+from datetime import datetime, timezone
+
+from backend.app.services.twitch.mapping import decode_game_page, decode_video_page
+
+
+def test_decode_streams_page():
+    content = json.dumps({
+        "data": [{
+            "id": "1",
+            "user_login": "streamer",
+            "user_name": "Streamer",
+            "game_id": "10",
+            "type": "live",
+            "title": "Live",
+            "viewer_count": 42,
+            "started_at": "2024-03-25T10:00:00Z",
+            "language": "fr",
+            "thumbnail_url": "http://thumb",
+            "tags": ["FR"],
+        }],
+        "pagination": {"cursor": "next"},
+    }).encode()
+
+    videos, cursor = decode_video_page(content)
+
+    assert cursor == "next"
+    video = videos[0]
+    assert video.view_count == 42
+    assert video.created_at == datetime(2024, 3, 25, 10, 0, tzinfo=timezone.utc)
+    assert video.is_live is True
+    assert video.duration == "live"
+    assert video.duration_seconds == 0
+    assert video.url == "https://www.twitch.tv/streamer"
+
+
+def test_decode_archives_page_sets_game_id():
+    content = json.dumps({
+        "data": [{
+            "id": "2",
+            "user_login": "streamer",
+            "user_name": "Streamer",
+            "title": "VOD",
+            "created_at": "2024-03-24T18:00:00Z",
+            "url": "https://www.twitch.tv/videos/2",
+            "thumbnail_url": "http://thumb",
+            "view_count": 7,
+            "language": "en",
+            "type": "archive",
+            "duration": "1h2m3s",
+        }],
+        "pagination": {},
+    }).encode()
+
+    videos, cursor = decode_video_page(content, game_id="10")
+
+    assert cursor is None
+    video = videos[0]
+    assert video.game_id == "10"
+    assert video.is_live is False
+    assert video.duration_seconds == 3723
+    assert video.url == "https://www.twitch.tv/videos/2"
+
+
+def test_decode_game_page():
+    content = json.dumps({
+        "data": [{"id": "10", "name": "Game", "box_art_url": "http://box", "igdb_id": "1"}]
+    }).encode()
+
+    games = decode_game_page(content)
+
+    assert games[0].id == "10"
+    assert games[0].name == "Game"
@@ -0,0 +1,132 @@
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from datetime import datetime, timedelta
+
+from backend.app.services.ingestion_service import IngestionService
+from backend.app.services.twitch.client import HelixClient
+from backend.app.services.twitch.rate_budget import RateBudget
+
+
+def make_response(payload):
+    response = MagicMock()
+    response.content = json.dumps(payload).encode()
+    response.raise_for_status = MagicMock()
+    return response
+
+
+def make_stream(stream_id):
+    return {
+        "id": stream_id,
+        "title": f"Stream {stream_id}",
+        "thumbnail_url": "http://thumb",
+        "user_name": "Streamer",
+        "user_login": "streamer",
+        "game_id": "1",
+        "viewer_count": 10,
+        "language": "fr",
+        "started_at": "2024-03-25T10:00:00Z",
+    }
+
+
+@pytest.fixture
+def twitch_service():
+    service = MagicMock()
+    service.base_url = "https://api.twitch.tv/helix"
+    service._get_headers = AsyncMock(return_value={"Client-ID": "id"})
+    service.twitch_repository.save_game = AsyncMock(return_value=True)
+    service.client.get = AsyncMock()
+    service.helix = HelixClient(service.client, service.base_url)
+    return service
+
+
+@pytest.fixture
+def catalog_repository():
+    repo = MagicMock()
+    repo.get_checkpoint = AsyncMock(return_value=None)
+    repo.save_checkpoint = AsyncMock()
+    repo.bulk_upsert_videos = AsyncMock(side_effect=lambda videos, game_name: len(videos))
+    return repo
+
+
+@pytest.mark.asyncio
+async def test_run_once_paginates_and_checkpoints(twitch_service, catalog_repository):
+    # Arrange
+    twitch_service.client.get.side_effect = [
+        make_response({"data": [{"id": "1", "name": "Game", "box_art_url": "http://box"}]}),
+        make_response({"data": [make_stream("a")], "pagination": {"cursor": "page2"}}),
+        make_response({"data": [make_stream("b")], "pagination": {}}),
+        make_response({"data": [], "pagination": {}}),
+    ]
+    service = IngestionService(twitch_service, catalog_repository, budget=RateBudget(100, 1))
+
+    # Act
+    total = await service.run_once()
+
+    # Assert
+    assert total == 2
+    twitch_service.twitch_repository.save_game.assert_awaited_once()
+    second_page_params = twitch_service.client.get.call_args_list[2].kwargs["params"]
+    assert second_page_params["after"] == "page2"
+    saved = [call.args for call in catalog_repository.save_checkpoint.await_args_list]
+    assert ("streams:1", "page2") in saved
+    assert saved[-1] == ("videos:1", None)
+
+
+@pytest.mark.asyncio
+async def test_ingest_resumes_from_checkpoint(twitch_service, catalog_repository):
+    # Arrange
+    catalog_repository.get_checkpoint.return_value = {
+        "cursor": "resume-here",
+        "updated_at": datetime.utcnow(),
+    }
+    twitch_service.client.get.return_value = make_response({"data": [], "pagination": {}})
+    service = IngestionService(twitch_service, catalog_repository, budget=RateBudget(100, 1))
+    game = MagicMock(id="1")
+    game.name = "Game"
+
+    # Act
+    await service._ingest(game, "videos", {})
+
+    # Assert
+    params = twitch_service.client.get.call_args.kwargs["params"]
+    assert params["after"] == "resume-here"
+    assert params["type"] == "archive"
+
+
+@pytest.mark.asyncio
+async def test_ingest_skips_recently_completed_walk(twitch_service, catalog_repository):
+    # Arrange
+    catalog_repository.get_checkpoint.return_value = {
+        "cursor": None,
+        "updated_at": datetime.utcnow() - timedelta(seconds=10),
+    }
+    service = IngestionService(twitch_service, catalog_repository, budget=RateBudget(100, 1))
+
+    # Act
+    upserted = await service._ingest(MagicMock(id="1"), "streams", {})
+
+    # Assert
+    assert upserted == 0
+    twitch_service.client.get.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_ingest_keeps_cursor_when_max_pages_is_reached(twitch_service, catalog_repository):
+    # Arrange
+    twitch_service.client.get.side_effect = [
+        make_response({"data": [make_stream("a")], "pagination": {"cursor": "page2"}}),
+        make_response({"data": [make_stream("b")], "pagination": {"cursor": "page3"}}),
+    ]
+    service = IngestionService(twitch_service, catalog_repository, budget=RateBudget(100, 1))
+    service.max_pages = 2
+    game = MagicMock(id="1")
+    game.name = "Game"
+
+    # Act
+    upserted = await service._ingest(game, "streams", {})
+
+    # Assert
+    assert upserted == 2
+    saved = [call.args for call in catalog_repository.save_checkpoint.await_args_list]
+    assert saved == [("streams:1", "page2"), ("streams:1", "page3")]
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from backend.app.services.twitch.concurrency import BACKGROUND, INTERACTIVE
+from backend.app.services.twitch.rate_budget import SharedRateBudget
+
+
+class FakeBucketRedis:
+    """Rejoue les scripts Lua du bucket partagé en Python (horloge figée)."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.takes = 0
+
+    def register_script(self, script):
+        if "requested" in script:
+            return self._take
+        return self._sync
+
+    async def _take(self, keys, args):
+        self.takes += 1
+        granted = min(int(args[2]), int(self.tokens))
+        self.tokens -= granted
+        return [granted, 0 if granted else 1]
+
+    async def _sync(self, keys, args):
+        self.tokens = min(self.tokens, args[2])
+        return 1
+
+
+@pytest.mark.asyncio
+async def test_leases_cut_redis_round_trips():
+    redis = FakeBucketRedis(tokens=100)
+    budget = SharedRateBudget(800, 60, lease_size=5, client_provider=lambda: redis)
+
+    for _ in range(10):
+        await budget.acquire()
+
+    assert redis.takes == 2
+    assert redis.tokens == 90
+
+
+@pytest.mark.asyncio
+async def test_headers_resync_the_shared_bucket():
+    redis = FakeBucketRedis(tokens=100)
+    budget = SharedRateBudget(800, 60, lease_size=5, client_provider=lambda: redis)
+    await budget.acquire()
+
+    await budget.observe({"Ratelimit-Limit": "800", "Ratelimit-Remaining": "20"})
+
+    # Les 4 jetons encore dans le lease local sont déjà comptés par Twitch
+    assert redis.tokens == 16
+    assert budget.stats()["resyncs"] == 1
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_a_local_bucket_without_redis():
+    budget = SharedRateBudget(2, 60, client_provider=lambda: None)
+
+    await budget.acquire()
+    await budget.observe({"Ratelimit-Limit": "2", "Ratelimit-Remaining": "0"})
+
+    assert budget._local.try_acquire() is False
+    assert budget.stats()["scope"] == "local"
+
+
+@pytest.mark.asyncio
+async def test_new_limit_from_headers_is_adopted():
+    budget = SharedRateBudget(800, 60, client_provider=lambda: None)
+    await budget.observe({"Ratelimit-Limit": "1200", "Ratelimit-Remaining": "1200"})
+
+    assert budget.capacity == 1200
+
+
+@pytest.mark.asyncio
+async def test_background_calls_yield_to_waiting_interactive_calls():
+    budget = SharedRateBudget(1, 0.05, client_provider=lambda: None)
+    await budget.acquire()
+    order = []
+
+    async def take(name, priority):
+        await budget.acquire(priority=priority)
+        order.append(name)
+
+    tasks = [asyncio.create_task(take("interactive 1", INTERACTIVE))]
+    await asyncio.sleep(0)
+    tasks += [asyncio.create_task(take(f"background {i}", BACKGROUND)) for i in (1, 2)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(take("interactive 2", INTERACTIVE)))
+    await asyncio.gather(*tasks)
+
+    assert order == ["interactive 1", "interactive 2", "background 1", "background 2"]
+
+
+@pytest.mark.asyncio
+async def test_search_is_not_stuck_behind_a_background_call_waiting_for_tokens():
+    redis = FakeBucketRedis(tokens=0)
+    budget = SharedRateBudget(800, 60, lease_size=1, client_provider=lambda: redis)
+    background = asyncio.create_task(budget.acquire(priority=BACKGROUND))
+    await asyncio.sleep(0.01)
+
+    # Le bucket est vide : l'appel de fond attend le remplissage
+    search = asyncio.create_task(budget.acquire())
+    await asyncio.sleep(0)
+    redis.tokens = 1
+
+    await asyncio.wait_for(search, 1)
+    assert not background.done()
+    redis.tokens = 1
+    await asyncio.wait_for(background, 1)
@@ -0,0 +1,89 @@
+import pytest
+from datetime import datetime, timezone
+
+from backend.app.models.records import VideoRecord, parse_duration
+from backend.app.models.twitch import SearchFilters
+from backend.app.services.twitch.filters import apply_filters
+
+NOW = datetime(2024, 3, 25, 12, 0, tzinfo=timezone.utc)
+
+
+def make_video(video_id, duration="1h0m0s", view_count=10, created_at="2024-03-25T10:00:00Z"):
+    return VideoRecord(
+        id=video_id,
+        user_name="Streamer",
+        title="Title",
+        url="https://www.twitch.tv/videos/1",
+        view_count=view_count,
+        duration=duration,
+        created_at=datetime.fromisoformat(created_at.replace("Z", "+00:00")),
+        language="fr",
+        thumbnail_url="http://thumb",
+        type="archive",
+    )
+
+
+@pytest.mark.parametrize("duration,expected", [
+    ("1h2m3s", 3723),
+    ("45m", 2700),
+    ("30s", 30),
+    ("live", 0),
+    ("", 0),
+])
+def test_parse_duration(duration, expected):
+    assert parse_duration(duration) == expected
+
+
+def test_archive_record_precomputes_typed_fields():
+    video = make_video("a", duration="1h2m3s")
+
+    assert video.duration_seconds == 3723
+    assert video.created_at == datetime(2024, 3, 25, 10, 0, tzinfo=timezone.utc)
+    assert video.is_live is False
+
+
+def test_naive_datetime_from_storage_is_utc():
+    video = VideoRecord.from_document({**make_video("a").to_document(), "created_at": datetime(2024, 3, 25, 10, 0)})
+
+    assert video.created_at.tzinfo == timezone.utc
+
+
+def test_inactive_filters_keep_order():
+    videos = [make_video("a"), make_video("b")]
+    assert apply_filters(videos, SearchFilters(), now=NOW) == videos
+
+
+def test_filter_by_duration_and_views():
+    videos = [
+        make_video("short", duration="10m", view_count=50),
+        make_video("medium", duration="30m", view_count=500),
+        make_video("long", duration="2h", view_count=5000),
+    ]
+
+    assert [v.id for v in apply_filters(videos, SearchFilters(duration="medium"), now=NOW)] == ["medium"]
+    assert [v.id for v in apply_filters(videos, SearchFilters(views="more_1000"), now=NOW)] == ["long"]
+
+
+def test_filter_by_date_window():
+    videos = [
+        make_video("today", created_at="2024-03-25T08:00:00Z"),
+        make_video("last_week", created_at="2024-03-20T08:00:00Z"),
+        make_video("last_month", created_at="2024-03-01T08:00:00Z"),
+        make_video("old", created_at="2023-12-01T08:00:00Z"),
+    ]
+
+    assert [v.id for v in apply_filters(videos, SearchFilters(date="today"), now=NOW)] == ["today"]
+    assert [v.id for v in apply_filters(videos, SearchFilters(date="this_week"), now=NOW)] == ["today", "last_week"]
+    assert len(apply_filters(videos, SearchFilters(date="this_month"), now=NOW)) == 3
+
+
+def test_sort_descending():
+    videos = [
+        make_video("a", duration="10m", view_count=5, created_at="2024-03-01T00:00:00Z"),
+        make_video("b", duration="2h", view_count=50, created_at="2024-03-20T00:00:00Z"),
+        make_video("c", duration="1h", view_count=500, created_at="2024-03-10T00:00:00Z"),
+    ]
+
+    assert [v.id for v in apply_filters(videos, SearchFilters(sort="views"), now=NOW)] == ["c", "b", "a"]
+    assert [v.id for v in apply_filters(videos, SearchFilters(sort="duration"), now=NOW)] == ["b", "c", "a"]
+    assert [v.id for v in apply_filters(videos, SearchFilters(sort="date"), now=NOW)] == ["b", "c", "a"]
@@ -0,0 +1,354 @@
+import asyncio
+
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from fastapi import HTTPException
+
+from backend.app.models.records import GameRecord, SearchRecord, VideoRecord
+from backend.app.models.twitch import SearchFilters
+from backend.app.services.twitch.deadline import DeadlineExceeded, deadline
+from backend.app.services.twitch.pagination import cursor_scope, decode_cursor, encode_cursor
+from backend.app.services.twitch.rate_budget import RateBudget
+
+
+def make_videos(start, count):
+    return [
+        VideoRecord(id=str(i), user_name="Streamer", title="Title", thumbnail_url="http://thumb",
+                    view_count=i, type="archive", duration="10m")
+        for i in range(start, start + count)
+    ]
+
+
+def make_record(count, cursor=None, snapshot_id=None, source=None):
+    pagination = {"cursor": cursor}
+    if source is not None or cursor is None:
+        pagination["source"] = source
+    return SearchRecord(
+        game_name="minecraft",
+        game=GameRecord(id="27471", name="Minecraft"),
+        videos=make_videos(0, count),
+        last_updated=datetime.utcnow(),
+        pagination=pagination,
+        snapshot_id=snapshot_id,
+    )
+
+
+def snapshot_cursor(snapshot_id, offset, filters=None):
+    return encode_cursor(snapshot_id, offset, cursor_scope("minecraft", filters or SearchFilters()))
+
+
+@pytest.fixture
+def service():
+    twitch_settings = SimpleNamespace(rate_limit_calls=800, rate_limit_period=60)
+    with patch("backend.app.services.twitch_service.mongodb"), \
+            patch("backend.app.services.twitch_service.get_twitch_settings", return_value=twitch_settings):
+        from backend.app.services.twitch_service import TwitchService
+        service = TwitchService()
+    service.twitch_repository = AsyncMock()
+    service.twitch_repository.get_cached_segments.return_value = {}
+    # Snapshots conservés en mémoire pour les relectures du préchargement
+    snapshots = {}
+
+    async def save_snapshot(result, ttl):
+        snapshots[result.snapshot_id] = result
+
+    service.twitch_repository.save_snapshot.side_effect = save_snapshot
+    service.twitch_repository.get_snapshot.side_effect = lambda snapshot_id: snapshots.get(snapshot_id)
+    service._get_headers = AsyncMock(return_value={})
+    service._find_game = AsyncMock(return_value=GameRecord(id="27471", name="Minecraft"))
+    service._fetch_page = AsyncMock()
+    return service
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("abc123", 40, "scope")
+    assert decode_cursor(cursor) == ("abc123", 40, "scope")
+
+
+def test_helix_cursor_is_not_a_snapshot_cursor():
+    assert decode_cursor("eyJiIjp7IkN1cnNvciI6ImV5SnpJam94TURFNUxqSTRNVGMxTmpZeU5EUXpNelEyTENKa0lqcG1ZV3h6WlN3aWRDSTZkSEoxWlgwPSJ9LCJhIjp7fX0") is None
+    assert decode_cursor("snap_!!!") is None
+
+
+@pytest.mark.asyncio
+async def test_first_page_creates_snapshot_and_cursor(service):
+    service._fetch_page.return_value = (make_videos(0, 100), "helix-next")
+
+    page = await service.search_videos_by_game("minecraft", limit=20, use_cache=True)
+
+    assert [video.id for video in page.videos] == [str(i) for i in range(20)]
+    saved = service.twitch_repository.save_snapshot.await_args.args[0]
+    assert len(saved.videos) == 100
+    assert decode_cursor(page.pagination["cursor"])[:2] == (saved.snapshot_id, 20)
+    # Le segment live est mis en cache et référence le snapshot
+    segment, live = service.twitch_repository.save_cached_segment.await_args.args[1:3]
+    assert segment == "live" and len(live.videos) == 100
+    attached = service.twitch_repository.attach_snapshot.await_args.kwargs
+    assert attached["snapshot_id"] == saved.snapshot_id
+
+
+@pytest.mark.asyncio
+async def test_next_pages_are_served_from_snapshot(service):
+    service.twitch_repository.get_snapshot.side_effect = None
+    service.twitch_repository.get_snapshot.return_value = make_record(50, snapshot_id="snap1")
+
+    page = await service.search_videos_by_game("minecraft", limit=20, cursor=snapshot_cursor("snap1", 20))
+    assert [video.id for video in page.videos] == [str(i) for i in range(20, 40)]
+    assert decode_cursor(page.pagination["cursor"])[:2] == ("snap1", 40)
+
+    last = await service.search_videos_by_game("minecraft", limit=20, cursor=snapshot_cursor("snap1", 40))
+    assert len(last.videos) == 10
+    assert last.pagination["cursor"] is None
+    service._fetch_page.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_extended_past_first_helix_page(service):
+    service.twitch_repository.get_snapshot.side_effect = None
+    service.twitch_repository.get_snapshot.return_value = make_record(
+        100, cursor="streams-2", snapshot_id="snap1", source="streams"
+    )
+    service._fetch_page.side_effect = [(make_videos(100, 30), None), (make_videos(130, 100), "videos-2")]
+
+    page = await service.search_videos_by_game("minecraft", limit=50, cursor=snapshot_cursor("snap1", 100))
+
+    assert [video.id for video in page.videos] == [str(i) for i in range(100, 150)]
+    # Plus de streams en direct : on enchaîne sur les archives
+    sources = [call.kwargs["source"] for call in service._fetch_page.await_args_list[:2]]
+    assert sources == ["streams", "videos"]
+    updated = service.twitch_repository.update_snapshot.await_args.args[0]
+    assert updated.pagination["source"] == "videos"
+    assert decode_cursor(page.pagination["cursor"])[:2] == ("snap1", 150)
+
+
+@pytest.mark.asyncio
+async def test_next_page_is_prefetched_in_background(service):
+    service._fetch_page.side_effect = [(make_videos(0, 100), "streams-2"), (make_videos(100, 100), "streams-3")]
+
+    page = await service.search_videos_by_game("minecraft", limit=60)
+    snapshot_id, _, _ = decode_cursor(page.pagination["cursor"])
+    await service.prefetcher.wait(snapshot_id)
+
+    assert service._fetch_page.await_count == 2
+    updated = service.twitch_repository.update_snapshot.await_args.args[0]
+    assert len(updated.videos) == 200
+
+
+@pytest.mark.asyncio
+async def test_follow_up_page_does_not_wait_on_a_prefetch_past_the_deadline(service):
+    service.twitch_repository.get_snapshot.side_effect = None
+    service.twitch_repository.get_snapshot.return_value = make_record(
+        50, cursor="streams-2", snapshot_id="snap1", source="streams"
+    )
+    service._fetch_page.return_value = (make_videos(50, 20), None)
+    # Préchargement de fond bloqué (derrière les appels interactifs, par exemple)
+    release = asyncio.Event()
+    assert service.prefetcher.schedule("snap1", release.wait)
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    with deadline(0.05):
+        page = await service.search_videos_by_game("minecraft", limit=20, cursor=snapshot_cursor("snap1", 40))
+    elapsed = loop.time() - start
+
+    assert elapsed < 1
+    assert [video.id for video in page.videos] == [str(i) for i in range(40, 60)]
+    release.set()
+    assert await service.prefetcher.wait("snap1")
+
+
+@pytest.mark.asyncio
+async def test_prefetch_is_skipped_without_budget(service):
+    service.prefetcher.budget = RateBudget(calls=1, period=3600)
+    service.prefetcher.budget.try_acquire()
+    service._fetch_page.return_value = (make_videos(0, 100), "streams-2")
+
+    await service.search_videos_by_game("minecraft", limit=60)
+
+    assert service._fetch_page.await_count == 1
+    service.twitch_repository.update_snapshot.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_filters_apply_to_whole_snapshot(service):
+    service.twitch_repository.get_snapshot.side_effect = None
+    service.twitch_repository.get_snapshot.return_value = make_record(50, snapshot_id="snap1")
+
+    page = await service.search_videos_by_game(
+        "minecraft", limit=10, cursor=snapshot_cursor("snap1", 10, SearchFilters(sort="views")), filters=SearchFilters(sort="views")
+    )
+
+    assert [video.view_count for video in page.videos] == list(range(39, 29, -1))
+
+
+@pytest.mark.asyncio
+async def test_cursor_is_rejected_for_another_game_or_other_filters(service):
+    service.twitch_repository.get_snapshot.side_effect = None
+    service.twitch_repository.get_snapshot.return_value = make_record(50, snapshot_id="snap1")
+    cursor = snapshot_cursor("snap1", 10)
+
+    with pytest.raises(HTTPException) as other_game:
+        await service.search_videos_by_game("fortnite", limit=10, cursor=cursor)
+    with pytest.raises(HTTPException) as other_filters:
+        await service.search_videos_by_game("minecraft", limit=10, cursor=cursor, filters=SearchFilters(sort="views"))
+
+    assert other_game.value.status_code == other_filters.value.status_code == 400
+    service.twitch_repository.get_snapshot.assert_not_awaited()
+    # Même recherche, casse différente : le curseur reste valable
+    page = await service.search_videos_by_game("Minecraft", limit=10, cursor=cursor)
+    assert [video.id for video in page.videos] == [str(i) for i in range(10, 20)]
+
+
+@pytest.mark.asyncio
+async def test_expired_snapshot_returns_empty_page(service):
+    service.twitch_repository.get_snapshot.side_effect = None
+    service.twitch_repository.get_snapshot.return_value = None
+
+    page = await service.search_videos_by_game("minecraft", cursor=snapshot_cursor("gone", 20))
+
+    assert page.videos == []
+    assert page.pagination["cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_reuses_snapshot(service):
+    service.twitch_repository.get_cached_segments.return_value = {
+        "live": make_record(30, snapshot_id="snap1"),
+        "archive": make_record(0),
+    }
+
+    page = await service.search_videos_by_game("minecraft", limit=10, use_cache=True)
+
+    assert decode_cursor(page.pagination["cursor"])[:2] == ("snap1", 10)
+    service.twitch_repository.save_snapshot.assert_not_awaited()
+    service._fetch_page.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_cached_archive_waits_until_live_streams_are_exhausted(service):
+    live = make_record(100, cursor="streams-2", source="streams")
+    archive = make_record(0)
+    archive.videos = make_videos(500, 40)
+    archive.pagination = {"cursor": "videos-2"}
+    service.twitch_repository.get_cached_segments.return_value = {"live": live, "archive": archive}
+
+    page = await service.search_videos_by_game("minecraft", limit=100, use_cache=True)
+    stale = service._merge_segments(live, archive)
+
+    # Les streams restants sont lus avant les archives
+    assert [video.id for video in page.videos] == [str(i) for i in range(100)]
+    snapshot = service.twitch_repository.save_snapshot.await_args.args[0]
+    assert snapshot.pagination["source"] == "streams"
+    assert snapshot.pagination["cursor"] == "streams-2"
+    assert len(stale.videos) == 100 and stale.pagination["cursor"] == "streams-2"
+
+
+@pytest.mark.asyncio
+async def test_catalog_games_paginate_past_the_first_page(service):
+    videos = make_videos(0, 150)
+    for video in videos[:30]:
+        video.is_live = True
+    service.twitch_repository.find_game_by_name.return_value = GameRecord(id="27471", name="Minecraft")
+    service.catalog_repository = AsyncMock()
+    service.catalog_repository.find_videos.return_value = videos
+
+    with patch("backend.app.services.twitch_service.settings.INGESTION_ENABLED", True):
+        first = await service.search_videos_by_game("minecraft", limit=100, use_cache=True)
+        second = await service.search_videos_by_game("minecraft", limit=100, cursor=first.pagination["cursor"])
+
+    assert len(first.videos) == 100
+    assert [video.id for video in second.videos] == [str(i) for i in range(100, 150)]
+    assert second.pagination["cursor"] is None
+    service._fetch_page.assert_not_awaited()
+    # Le catalogue alimente le cache : les recherches suivantes n'y retournent pas
+    saved = {call.args[1]: call.args[2] for call in service.twitch_repository.save_cached_segment.await_args_list}
+    assert len(saved["live"].videos) == 30 and len(saved["archive"].videos) == 120
+    assert service.twitch_repository.attach_snapshot.await_args.kwargs["segment"] == "live"
+
+
+@pytest.mark.asyncio
+async def test_expired_live_segment_only_refetches_streams(service):
+    archive = make_record(0)
+    archive.videos = make_videos(100, 40)
+    service.twitch_repository.get_cached_segments.return_value = {"archive": archive}
+    service._fetch_page.return_value = (make_videos(0, 5), None)
+
+    page = await service.search_videos_by_game("minecraft", limit=100, use_cache=True)
+
+    assert [call.kwargs["source"] for call in service._fetch_page.await_args_list] == ["streams"]
+    service._find_game.assert_not_awaited()
+    assert [video.id for video in page.videos] == [str(i) for i in range(5)] + [str(i) for i in range(100, 140)]
+    saved_segments = [call.args[1] for call in service.twitch_repository.save_cached_segment.await_args_list]
+    assert saved_segments == ["live"]
+
+
+@pytest.mark.asyncio
+async def test_archives_are_not_read_while_streams_continue(service):
+    service._fetch_page.return_value = (make_videos(0, 100), "streams-2")
+
+    await service.search_videos_by_game("minecraft", limit=20, use_cache=True)
+
+    assert [call.kwargs["source"] for call in service._fetch_page.await_args_list] == ["streams"]
+
+
+@pytest.mark.asyncio
+async def test_archives_cut_by_the_deadline_give_a_partial_live_result(service):
+    async def fetch_page(source, **kwargs):
+        if source == "streams":
+            return make_videos(0, 10), None
+        await asyncio.sleep(0.05)
+        raise DeadlineExceeded("GET /videos: deadline exceeded")
+
+    service._fetch_page.side_effect = fetch_page
+    with deadline(0.01):
+        result = await service.search_videos_by_game("minecraft", limit=20, use_cache=True)
+
+    assert result.partial
+    assert [video.id for video in result.videos] == [str(i) for i in range(10)]
+    assert result.to_api().partial
+    # Les archives restent lisibles par la pagination
+    assert result.pagination["cursor"] is not None
+
+
+@pytest.mark.asyncio
+async def test_partial_flag_is_per_request(service):
+    calls = []
+
+    async def fetch_page(source, **kwargs):
+        calls.append(source)
+        if source == "streams":
+            return make_videos(0, 10), None
+        if len(calls) <= 3:
+            await asyncio.sleep(0.05)
+            raise DeadlineExceeded("GET /videos: deadline exceeded")
+        return make_videos(100, 20), None
+
+    service._fetch_page.side_effect = fetch_page
+    with deadline(0.01):
+        first = await service.search_videos_by_game("minecraft", limit=5, use_cache=True)
+        cut = await service.search_videos_by_game("minecraft", limit=20, cursor=first.pagination["cursor"])
+    # Archives coupées, mais la première page est complète avec les streams
+    assert not first.partial
+    assert cut.partial
+
+    # Le snapshot partagé ne garde pas le drapeau de la requête précédente
+    snapshot_id, _, _ = decode_cursor(first.pagination["cursor"])
+    assert not (await service.twitch_repository.get_snapshot(snapshot_id)).partial
+    with deadline(5):
+        later = await service.search_videos_by_game("minecraft", limit=20, cursor=first.pagination["cursor"])
+    assert not later.partial
+    assert len(later.videos) == 20
+
+
+@pytest.mark.asyncio
+async def test_game_lookup_cut_by_the_deadline_is_partial_not_missing(service):
+    service._find_game.side_effect = DeadlineExceeded("GET /search/categories: deadline exceeded")
+
+    with deadline(0.01):
+        result = await service.search_videos_by_game("minecraft", limit=20, use_cache=True)
+
+    assert result.partial
+    assert result.videos == []
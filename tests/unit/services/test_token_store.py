@@ -0,0 +1,179 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from backend.app.cache.singleflight import SingleFlight
+from backend.app.models.twitch import TwitchToken
+from backend.app.services.twitch.auth import TwitchAuthService
+from backend.app.services.twitch.client import HelixClient
+from backend.app.services.twitch.token_store import SharedTokenStore
+
+
+class FakeRedis:
+    """Clés/valeurs et scripts de `RedisLease` ; `held_by` simule un autre worker détenant le lease."""
+
+    def __init__(self, held_by=None):
+        self.values = {}
+        self.ttls = {}
+        self.owners = {}
+        self.held_by = held_by
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, px=None):
+        self.values[key] = value
+        self.ttls[key] = px
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+    def register_script(self, script):
+        return self._release if "DEL" in script else self._acquire
+
+    async def _acquire(self, keys, args):
+        owner = self.held_by or self.owners.get(keys[0])
+        if owner and owner != args[0]:
+            return 0
+        self.owners[keys[0]] = args[0]
+        return 1
+
+    async def _release(self, keys, args):
+        self.owners.pop(keys[0], None)
+        return 1
+
+
+def make_token(name="shared", hours=24):
+    return TwitchToken(access_token=name, expires_at=datetime.utcnow() + timedelta(hours=hours))
+
+
+def make_service(redis):
+    repository = MagicMock()
+    repository.get_current_token = AsyncMock(return_value=None)
+    repository.save_token = AsyncMock()
+    settings = SimpleNamespace(
+        client_id="cid", token_refresh_before_expiry=3600, validate_url="https://id.twitch.tv/oauth2/validate"
+    )
+    with patch("backend.app.services.twitch.auth.get_twitch_settings", return_value=settings):
+        service = TwitchAuthService(
+            repository,
+            token_store=SharedTokenStore("cid", client_provider=lambda: redis),
+            flight=SingleFlight(wait_timeout=0.5, poll_interval=0.01, client_provider=lambda: redis)
+        )
+    service._generate_new_token = AsyncMock(return_value=make_token("generated"))
+    service.client = MagicMock()
+    service.client.get = AsyncMock(return_value=SimpleNamespace(status_code=200, text=""))
+    repository.update_last_used = AsyncMock()
+    repository.invalidate_token = AsyncMock()
+    return service
+
+
+@pytest.mark.asyncio
+async def test_publish_expires_with_the_token():
+    redis = FakeRedis()
+    store = SharedTokenStore("cid", client_provider=lambda: redis)
+
+    assert await store.publish(make_token(hours=2))
+    assert (await store.get()).access_token == "shared"
+    assert 7_000_000 < redis.ttls["twitch:app_token:cid"] <= 7_200_000
+    assert not await store.publish(make_token(hours=-1))
+
+
+@pytest.mark.asyncio
+async def test_shared_token_is_used_without_mongo():
+    redis = FakeRedis()
+    await SharedTokenStore("cid", client_provider=lambda: redis).publish(make_token())
+    service = make_service(redis)
+
+    token = await service.get_valid_token()
+
+    assert token.access_token == "shared"
+    service.token_repository.get_current_token.assert_not_awaited()
+    service._generate_new_token.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_fleet_generates_a_single_token():
+    redis = FakeRedis()
+    workers = [make_service(redis) for _ in range(3)]
+
+    tokens = [await worker.get_valid_token() for worker in workers]
+
+    assert {token.access_token for token in tokens} == {"generated"}
+    assert sum(worker._generate_new_token.await_count for worker in workers) == 1
+
+
+@pytest.mark.asyncio
+async def test_token_expiring_soon_is_renewed():
+    redis = FakeRedis()
+    await SharedTokenStore("cid", client_provider=lambda: redis).publish(make_token(hours=0.5))
+    service = make_service(redis)
+
+    assert (await service.get_valid_token()).access_token == "generated"
+    assert "generated" in redis.values["twitch:app_token:cid"]
+
+
+@pytest.mark.asyncio
+async def test_follower_waits_for_the_refreshing_worker():
+    redis = FakeRedis(held_by="other-worker")
+    service = make_service(redis)
+
+    async def other_worker_publishes():
+        await asyncio.sleep(0.05)
+        await SharedTokenStore("cid", client_provider=lambda: redis).publish(make_token())
+
+    token, _ = await asyncio.gather(service.get_valid_token(), other_worker_publishes())
+
+    assert token.access_token == "shared"
+    service._generate_new_token.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_invalidate_only_removes_the_rejected_token():
+    redis = FakeRedis()
+    store = SharedTokenStore("cid", client_provider=lambda: redis)
+    await store.publish(make_token("current"))
+
+    # Déjà remplacé par un autre worker : on ne retire pas le nouveau token
+    assert not await store.invalidate("previous")
+    assert await store.invalidate("current")
+    assert await store.get() is None
+
+
+@pytest.mark.asyncio
+async def test_shared_token_rejected_by_validate_is_replaced():
+    redis = FakeRedis()
+    await SharedTokenStore("cid", client_provider=lambda: redis).publish(make_token("revoked"))
+    service = make_service(redis)
+    service.client.get.return_value = SimpleNamespace(status_code=401, text="invalid access token")
+
+    token = await service.get_valid_token()
+
+    assert token.access_token == "generated"
+    assert "generated" in redis.values["twitch:app_token:cid"]
+    service.token_repository.invalidate_token.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_helix_401_drops_the_cached_token():
+    redis = FakeRedis()
+    await SharedTokenStore("cid", client_provider=lambda: redis).publish(make_token("revoked"))
+    service = make_service(redis)
+    token = await service.get_valid_token()
+    assert token.access_token == "revoked"
+
+    async def on_unauthorized(headers):
+        await service.invalidate_token(headers["Authorization"].removeprefix("Bearer "))
+
+    transport = httpx.MockTransport(lambda request: httpx.Response(401))
+    async with httpx.AsyncClient(transport=transport) as client:
+        helix = HelixClient(client, "https://api.twitch.tv/helix", on_unauthorized=on_unauthorized)
+        response = await helix.get("/streams", {}, {"Authorization": f"Bearer {token.access_token}"})
+    assert response.status_code == 401
+
+    assert "twitch:app_token:cid" not in redis.values
+    assert (await service.get_valid_token()).access_token == "generated"
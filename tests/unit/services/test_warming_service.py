@@ -0,0 +1,80 @@
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from backend.app.cache.popularity import PopularityTracker
+from backend.app.models.records import GameRecord, VideoRecord
+from backend.app.repositories.twitch_repository import segment_key
+from backend.app.services.warming_service import CacheWarmingService
+
+
+@pytest.fixture
+def service():
+    twitch_settings = SimpleNamespace(rate_limit_calls=800, rate_limit_period=60)
+    with patch("backend.app.services.twitch_service.mongodb"), \
+            patch("backend.app.services.twitch_service.get_twitch_settings", return_value=twitch_settings):
+        from backend.app.services.twitch_service import TwitchService
+        service = TwitchService()
+    service.twitch_repository = AsyncMock()
+    service._get_headers = AsyncMock(return_value={})
+    service._find_game = AsyncMock(return_value=GameRecord(id="27471", name="Minecraft"))
+    service._fetch_page = AsyncMock(return_value=([
+        VideoRecord(id="1", user_name="Streamer", title="Title", thumbnail_url="http://thumb", type="live")
+    ], "streams-2"))
+    return service
+
+
+@pytest.mark.asyncio
+async def test_run_once_warms_top_games():
+    tracker = PopularityTracker(k=10)
+    for game, count in (("minecraft", 3), ("fortnite", 2), ("tetris", 1)):
+        for _ in range(count):
+            tracker.record(game, now=0)
+    twitch_service = SimpleNamespace(warm_game=AsyncMock(side_effect=[True, False]))
+    warming = CacheWarmingService(twitch_service, tracker)
+    warming.top_k = 2
+
+    assert await warming.run_once() == 1
+    warmed = [call.args[0] for call in twitch_service.warm_game.await_args_list]
+    assert warmed == ["minecraft", "fortnite"]
+
+
+@pytest.mark.asyncio
+async def test_warm_game_refreshes_only_expiring_segments(service):
+    soon = datetime.utcnow() + timedelta(seconds=5)
+    service.twitch_repository.get_segment_expirations.return_value = {"live": soon}
+    service.twitch_repository.get_cached_segments.return_value = {}
+
+    assert await service.warm_game("minecraft", horizon=30) is True
+
+    service._fetch_page.assert_awaited_once()
+    assert service.twitch_repository.save_cached_segment.await_args.args[1] == "live"
+
+
+@pytest.mark.asyncio
+async def test_warm_game_skips_fresh_segments(service):
+    later = datetime.utcnow() + timedelta(minutes=10)
+    service.twitch_repository.get_segment_expirations.return_value = {"live": later}
+
+    assert await service.warm_game("minecraft", horizon=30) is False
+    service._fetch_page.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_warm_game_failing_to_reach_helix_is_not_counted(service):
+    service.twitch_repository.get_segment_expirations.return_value = {}
+    service.twitch_repository.get_cached_segments.return_value = {}
+    service._fetch_page.side_effect = RuntimeError("Helix unavailable")
+
+    assert await service.warm_game("minecraft", horizon=30) is False
+    service.twitch_repository.save_cached_segment.assert_not_awaited()
+
+
+def test_warmed_game_and_searched_game_share_cache_keys():
+    tracker = PopularityTracker(k=10)
+    tracker.record("  League  of LEGENDS ", now=0)
+    (warmed, _), = tracker.top(1)
+
+    assert segment_key(warmed, None, "live") == segment_key("League of Legends", None, "live")
+    assert segment_key(warmed, None, "live") == segment_key("league  of legends ", None, "live")
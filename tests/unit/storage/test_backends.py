@@ -0,0 +1,149 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from pymongo import ReplaceOne, UpdateOne
+
+from backend.app.locks import StorageLease
+from backend.app.models.records import SearchRecord
+from backend.app.models.twitch import TwitchToken
+from backend.app.repositories.token_repository import TokenRepository
+from backend.app.repositories.twitch_repository import TwitchRepository
+from backend.app.repositories.write_behind import WriteBehindQueue
+from backend.app.storage import Write, open_store, storage_key
+from backend.app.storage.mongo import MongoBackend
+
+
+@pytest_asyncio.fixture(params=["memory", "sqlite"])
+async def store(request, tmp_path):
+    store = await open_store(request.param, path=str(tmp_path / "store.db"))
+    yield store
+    await store.close()
+
+
+def make_result(game_name="zelda", last_updated=None):
+    return SearchRecord(
+        game_name=game_name,
+        game=None,
+        videos=[],
+        last_updated=last_updated or datetime.utcnow(),
+        pagination={"cursor": None},
+    )
+
+
+@pytest.mark.asyncio
+async def test_scan_and_delete_by_prefix(store):
+    for game, video in [("g1", "b"), ("g1", "a"), ("g10", "c"), ("g2", "d")]:
+        await store.put("videos", storage_key(game, video), {"id": video})
+
+    assert [key for key, _ in await store.scan("videos", storage_key("g1", ""))] == ["g1\ta", "g1\tb"]
+    assert await store.get_many("videos", ["g1\ta", "missing"]) == {"g1\ta": {"id": "a"}}
+
+    assert await store.delete_prefix("videos", "g1\t") == 2
+    assert [doc["id"] for _, doc in await store.scan("videos")] == ["c", "d"]
+    assert await store.delete("videos", ["g2\td", "missing"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_versioned_writes_never_overwrite_a_newer_version(store):
+    assert await store.put("search_cache", "zelda", {"generation": 2}, version=2)
+    assert not await store.put("search_cache", "zelda", {"generation": 1}, version=1)
+    assert not await store.update("search_cache", "zelda", {"size": 1}, version=2)
+
+    applied = await store.write("search_cache", [
+        Write("zelda", document={"generation": 3}, version=3),
+        Write("zelda", document={"generation": 1}, version=1),
+        Write("mario", fields={"generation": 1}),
+    ])
+
+    assert applied == 1
+    assert await store.get_many("search_cache", ["zelda", "mario"]) == {"zelda": {"generation": 3}}
+
+
+@pytest.mark.asyncio
+async def test_update_merges_dotted_fields_and_keeps_the_expiry(store):
+    await store.put("search_cache", "zelda", {"result": {"videos": []}}, ttl=0.05)
+    assert await store.update("search_cache", "zelda", {"result.snapshot_id": "s1"})
+    assert await store.update("games", "zelda", {"id": "1"}, upsert=True)
+
+    assert await store.get("search_cache", "zelda") == {"result": {"videos": [], "snapshot_id": "s1"}}
+    assert await store.get("games", "zelda") == {"id": "1"}
+    await asyncio.sleep(0.1)
+    assert await store.get("search_cache", "zelda") is None
+    assert await store.scan("search_cache") == []
+    # Un document expiré ne bloque pas une nouvelle écriture, même de version plus ancienne
+    assert await store.put("search_cache", "zelda", {"generation": 1}, version=1)
+
+
+@pytest.mark.asyncio
+async def test_claim_has_a_single_owner_until_release(store):
+    assert await store.claim("leases", "job", "worker-1", ttl=30)
+    assert await store.claim("leases", "job", "worker-1", ttl=30)
+    assert not await store.claim("leases", "job", "worker-2", ttl=30)
+    await store.release("leases", "job", "worker-2")
+    assert not await store.claim("leases", "job", "worker-2", ttl=30)
+    await store.release("leases", "job", "worker-1")
+    assert await store.claim("leases", "job", "worker-2", ttl=30)
+
+
+@pytest.mark.asyncio
+async def test_repository_round_trip(store):
+    repository = TwitchRepository(store)
+    await repository.initialize()
+    result = make_result()
+
+    assert await repository.save_cached_segment("Zelda", "live", result, ttl=60)
+    assert not await repository.save_cached_segment(
+        "Zelda", "live", make_result(last_updated=result.last_updated - timedelta(seconds=5)), ttl=60
+    )
+    segments = await repository.get_cached_segments("zelda")
+    assert list(segments) == ["live"]
+    assert segments["live"].last_updated == result.last_updated.replace(
+        microsecond=result.last_updated.microsecond // 1000 * 1000
+    )
+
+    assert await repository.invalidate_game_cache("zelda")
+    assert await repository.get_cached_segments("zelda") == {}
+
+
+@pytest.mark.asyncio
+async def test_write_behind_flushes_into_the_store(store):
+    queue = WriteBehindQueue()
+    queue.store = store
+    repository = TwitchRepository(store)
+    for i in range(3):
+        queue.update("games", f"game {i}", {"id": str(i), "name": f"Game {i}"}, upsert=True)
+
+    assert await queue.flush() == 3
+    assert (await repository.find_game_by_name("GAME 2")).id == "2"
+    assert len(await store.scan("games")) == 3
+
+
+@pytest.mark.asyncio
+async def test_token_repository_and_lease(store):
+    tokens = TokenRepository(store)
+    await tokens.save_token(TwitchToken(access_token="a", expires_at=datetime.utcnow() - timedelta(hours=1)))
+    await tokens.save_token(TwitchToken(access_token="b", expires_at=datetime.utcnow() + timedelta(hours=2)))
+    assert (await tokens.get_current_token()).access_token == "b"
+
+    lease = StorageLease(store)
+    assert await lease.acquire("job", "worker-1", ttl=30)
+    assert not await lease.acquire("job", "worker-2", ttl=30)
+    await lease.release("job", "worker-1")
+    assert await lease.acquire("job", "worker-2", ttl=30)
+
+
+def test_mongo_writes_carry_the_version_condition_in_their_filter():
+    backend = MongoBackend(db=None)
+    now = datetime.utcnow()
+
+    replace = backend._operation(Write("zelda", document={"a": 1}, ttl=60, version=2), now)
+    update = backend._operation(Write("zelda", fields={"result.snapshot_id": "s1"}), now)
+
+    assert isinstance(replace, ReplaceOne)
+    assert replace._filter["$and"][0]["$or"][1] == {"version": {"$lt": 2}}
+    assert replace._doc == {"doc": {"a": 1}, "version": 2, "expires": now + timedelta(seconds=60)}
+    assert isinstance(update, UpdateOne)
+    assert update._doc == {"$set": {"doc.result.snapshot_id": "s1"}}
+    assert not update._upsert
@@ -0,0 +1,51 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from pymongo.errors import DuplicateKeyError
+
+from backend.app.locks import LocalLease, StorageLease
+from backend.app.storage import StorageError
+from backend.app.storage.mongo import MongoBackend
+
+
+@pytest.mark.asyncio
+async def test_local_lease_is_exclusive_until_released():
+    lease = LocalLease()
+
+    assert await lease.acquire("job", "a", 60) is True
+    assert await lease.acquire("job", "b", 60) is False
+    await lease.release("job", "b")  # pas le détenteur : sans effet
+    assert await lease.acquire("job", "b", 60) is False
+    await lease.release("job", "a")
+    assert await lease.acquire("job", "b", 60) is True
+
+
+@pytest.mark.asyncio
+async def test_local_lease_expires():
+    lease = LocalLease()
+
+    assert await lease.acquire("job", "a", 0) is True
+    assert await lease.acquire("job", "b", 60) is True
+
+
+@pytest.mark.asyncio
+async def test_mongo_lease_held_by_another_owner_is_refused():
+    collection = MagicMock()
+    collection.find_one_and_update = AsyncMock(side_effect=[None, DuplicateKeyError("taken")])
+    db = MagicMock()
+    db.__getitem__.return_value = collection
+    lease = StorageLease(MongoBackend(db))
+
+    assert await lease.acquire("job", "a", 60) is True
+    assert await lease.acquire("job", "b", 60) is False
+    query = collection.find_one_and_update.await_args.args[0]
+    assert query["_id"] == "job"
+    db.__getitem__.assert_called_with("store_leases")
+
+
+@pytest.mark.asyncio
+async def test_storage_lease_is_refused_when_the_store_fails():
+    store = MagicMock()
+    store.claim = AsyncMock(side_effect=StorageError("down"))
+
+    assert await StorageLease(store).acquire("job", "a", 60) is False
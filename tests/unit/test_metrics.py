@@ -0,0 +1,24 @@
+from fastapi.testclient import TestClient
+
+from backend.app.metrics import MetricsRegistry
+
+
+def test_registry_collects_providers_and_isolates_errors():
+    registry = MetricsRegistry()
+    registry.register("ok", lambda: {"value": 1})
+    registry.register("broken", lambda: 1 / 0)
+
+    collected = registry.collect()
+
+    assert collected["ok"] == {"value": 1}
+    assert "error" in collected["broken"]
+
+
+def test_metrics_endpoint_exposes_ttl_distribution():
+    from backend.app.main import app
+    import backend.app.cache.ttl_policy  # noqa: F401 - enregistre la section cache_ttl
+
+    response = TestClient(app).get("/api/metrics/")
+
+    assert response.status_code == 200
+    assert set(response.json()["cache_ttl"]) == {"live", "archive"}
@@ -0,0 +1,101 @@
+import asyncio
+import pytest
+
+from backend.app.locks import LocalLease
+from backend.app.scheduler import CacheScheduler
+
+
+@pytest.mark.asyncio
+async def test_run_job_records_timing_and_failures():
+    scheduler = CacheScheduler()
+
+    async def ok():
+        await asyncio.sleep(0.01)
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    ok_job = scheduler.add_job("ok", ok, interval=60)
+    broken_job = scheduler.add_job("broken", broken, interval=60)
+
+    assert await scheduler.run_job(ok_job) is True
+    assert await scheduler.run_job(broken_job) is True
+
+    stats = scheduler.stats()["jobs"]
+    assert stats["ok"]["runs"] == 1 and stats["ok"]["last_duration_ms"] >= 10
+    assert stats["broken"]["failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_only_the_lease_holder_runs_leader_jobs():
+    lease = LocalLease()
+    calls = []
+
+    async def job():
+        calls.append(1)
+
+    leader = CacheScheduler(lease=lease, owner="worker-1")
+    follower = CacheScheduler(lease=lease, owner="worker-2")
+    leader_job = leader.add_job("cleanup", job, interval=60)
+    follower_job = follower.add_job("cleanup", job, interval=60)
+
+    assert await leader.run_job(leader_job) is True
+    assert await follower.run_job(follower_job) is False
+    # Le leader prolonge son lease aux ticks suivants
+    assert await leader.run_job(leader_job) is True
+    assert len(calls) == 2
+    assert follower_job.skipped_not_leader == 1
+
+
+@pytest.mark.asyncio
+async def test_lease_errors_are_counted_as_job_failures():
+    class BrokenLease(LocalLease):
+        async def acquire(self, name, owner, ttl):
+            raise ConnectionError("redis down")
+
+    calls = []
+
+    async def job():
+        calls.append(1)
+
+    scheduler = CacheScheduler(lease=BrokenLease())
+    cleanup = scheduler.add_job("cleanup", job, interval=60)
+
+    assert await scheduler.run_job(cleanup) is False
+    assert calls == []
+    assert cleanup.failures == 1
+    assert cleanup.runs == 0 and not cleanup.running
+
+
+@pytest.mark.asyncio
+async def test_jobs_for_every_worker_ignore_the_lease():
+    lease = LocalLease()
+    await lease.acquire("scheduler:sync", "someone-else", 60)
+
+    async def job():
+        pass
+
+    scheduler = CacheScheduler(lease=lease, owner="worker-1")
+    sync_job = scheduler.add_job("sync", job, interval=60, leader_only=False)
+
+    assert await scheduler.run_job(sync_job) is True
+
+
+@pytest.mark.asyncio
+async def test_slow_job_does_not_overlap():
+    release = asyncio.Event()
+    started = []
+
+    async def slow():
+        started.append(1)
+        await release.wait()
+
+    scheduler = CacheScheduler()
+    job = scheduler.add_job("slow", slow, interval=0.01, jitter=0)
+    await scheduler.start()
+    await asyncio.sleep(0.1)
+    release.set()
+    await scheduler.stop()
+
+    assert len(started) == 1
+    assert job.skipped_overlap > 0